@@ -0,0 +1,65 @@
+"""
+Compare snapshot write formats: bytes on disk and write latency.
+
+    python -m benchmarks.bench_file_handler [--rounds N] [--repos N]
+
+`legacy` is the previous format (indent=4 written in place, no fsync);
+the others go through the atomic `save_to_file` path.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from src.api.parsers import parse_strained
+from src.utils.file_handler import save_to_file
+from benchmarks.bench_parsers import load_fixtures
+
+
+def legacy_save(data, filepath):
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=4)
+    return filepath
+
+
+WRITERS = {
+    "legacy": legacy_save,
+    "atomic-indent": lambda data, path: save_to_file(data, path),
+    "atomic-compact": lambda data, path: save_to_file(data, path, compact=True),
+    "atomic-gzip": lambda data, path: save_to_file(data, path, compact=True, compress=True),
+}
+
+
+def sample_snapshot(size: int) -> list:
+    columns = ["author", "url", "stars", "forks", "language"]
+    repos = parse_strained(load_fixtures("daily.html")["daily.html"], limit=None)
+    return [{col: repos[i % len(repos)][col] for col in columns} for i in range(size)]
+
+
+def run(rounds: int = 50, size: int = 25) -> list:
+    data = sample_snapshot(size)
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, writer in WRITERS.items():
+            target = os.path.join(temp_dir, f"{name}.json")
+            start = time.perf_counter()
+            for _ in range(rounds):
+                written = writer(data, target)
+            elapsed = (time.perf_counter() - start) / rounds
+            results.append({"format": name, "bytes": os.path.getsize(written), "ms_per_write": elapsed * 1000})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--repos", type=int, default=25)
+    args = parser.parse_args()
+
+    print(f"{'format':<16}{'bytes':>10}{'ms/write':>12}")
+    for row in run(args.rounds, args.repos):
+        print(f"{row['format']:<16}{row['bytes']:>10}{row['ms_per_write']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
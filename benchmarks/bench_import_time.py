@@ -0,0 +1,61 @@
+"""
+Cold-start import time of each CLI subcommand, measured with `python -X importtime`.
+
+    python -m benchmarks.bench_import_time [--repeat N] [--scale F]
+
+Each subcommand module is imported in a fresh interpreter and the best of
+`--repeat` runs is compared with its budget. Exits non-zero if any subcommand
+goes over budget, so it can run as a CI regression check. `--scale` multiplies
+every budget for slower machines.
+"""
+import argparse
+import subprocess
+import sys
+
+# Budgets in milliseconds of cumulative import time, per subcommand.
+BUDGETS_MS = {
+    "src.cli": 30,
+    "src.cli.export": 120,
+    "src.cli.fetch": 450,
+    "src.cli.send": 450,
+}
+
+
+def import_time_ms(module: str) -> float:
+    """
+    Cumulative import time of `module` (including everything it pulls in) in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def run(repeat: int = 3, scale: float = 1.0) -> list:
+    results = []
+    for module, budget in BUDGETS_MS.items():
+        best = min(import_time_ms(module) for _ in range(repeat))
+        results.append({"module": module, "ms": best, "budget_ms": budget * scale, "ok": best <= budget * scale})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.scale)
+    print(f"{'module':<18}{'ms':>10}{'budget':>10}")
+    for row in results:
+        print(f"{row['module']:<18}{row['ms']:>10.1f}{row['budget_ms']:>10.0f}{'' if row['ok'] else '  OVER BUDGET'}")
+    sys.exit(0 if all(row["ok"] for row in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+"""
+Load test of the Telegram bot against local stand-ins for GitHub and the Bot API.
+
+    python -m benchmarks.bench_load [--users N] [--commands-per-user N] [--think SECONDS]
+                                    [--github-latency SECONDS] [--cold] [--concurrent-updates N]
+                                    [--pool-size N] [--commands "daily,weekly,language python"]
+                                    [--slow-callback SECONDS] [--no-trace] [--out FILE]
+
+Three pieces, none of which leaves the machine:
+
+- `FakeGitHub` serves the recorded pages in tests/fixtures/trending (with
+  ETag/304 support) after a configurable latency.
+- `FakeTelegram` implements the Bot API calls the bot makes (getMe,
+  deleteWebhook, getUpdates, sendMessage). It hands out synthetic command
+  updates through long polling and records every message the bot sends.
+- The driver runs N simulated users. Each sends a command, waits for the
+  bot's two replies ("Fetching..." and the result) and thinks before the
+  next one.
+
+Both fakes run on their own event loop in a background thread, so the bot's
+loop carries only the bot. The bot runs unmodified: python-telegram-bot
+polling, the real command handlers, the fetch service with the response
+cache, the SQLite store and the language registry (fed from
+tests/fixtures/languages.json).
+
+The report gives command latency percentiles (from the update being offered
+to the last reply arriving) and throughput. To show where the event loop
+blocks, it also gives:
+- the loop's scheduling lag, sampled every few milliseconds;
+- with asyncio debug mode, every callback slower than --slow-callback, grouped
+  by where it came from.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+from aiohttp import web
+from src.api import github_api
+from src.api.http_client import close_session
+from src.api.response_cache import TrendingCache
+from src.services import fetch_service
+from src.storage import sqlite_store
+from src.storage.sqlite_store import SnapshotStore
+from src.utils import validator
+from src.utils.language_registry import LanguageRegistry
+from benchmarks.bench_parsers import load_fixtures
+from benchmarks.bench_pipeline import load_languages
+
+TOKEN = "123456:load-test"
+DEFAULT_COMMANDS = "daily,weekly,monthly,language python"
+REPLIES_PER_COMMAND = 2
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 0.50),
+        "p90": percentile(values, 0.90),
+        "p99": percentile(values, 0.99),
+        "max": max(values, default=0.0),
+    }
+
+
+class FakeGitHub:
+    """
+    Serves recorded trending pages after `latency` seconds (+/- `jitter`).
+    """
+
+    def __init__(self, pages: Dict[str, str], latency: float = 0.05, jitter: float = 0.0):
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.not_modified = 0
+
+    async def trending(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        period = request.query.get("since", "daily")
+        html = self.pages.get(period, self.pages["daily"])
+        etag = f'"{period}-{len(html)}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304)
+        return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/trending", self.trending)
+        app.router.add_get("/trending/{language}", self.trending)
+        return app
+
+
+class FakeTelegram:
+    """
+    Minimal Bot API: offers queued command updates to getUpdates long polls and
+    records sendMessage calls, reporting each one to `on_send`.
+    """
+
+    def __init__(self, token: str = TOKEN, on_send: Optional[Callable[[int, str], None]] = None):
+        self.token = token
+        self.on_send = on_send
+        self.sent = 0
+        self._updates: List[Dict] = []
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._arrived: Optional[asyncio.Event] = None
+
+    @staticmethod
+    async def _params(request: web.Request) -> Dict:
+        if request.content_type == "application/json":
+            return await request.json()
+        return dict(await request.post())
+
+    def _message(self, chat_id: int, text: str, from_bot: bool = False) -> Dict:
+        message_id, self._next_message_id = self._next_message_id, self._next_message_id + 1
+        user = {"id": 1 if from_bot else chat_id, "is_bot": from_bot, "first_name": "bot" if from_bot else "user"}
+        return {"message_id": message_id, "date": int(time.time()), "text": text, "from": user,
+                "chat": {"id": chat_id, "type": "private"}}
+
+    def push_command(self, chat_id: int, text: str) -> None:
+        """
+        Queue a command from `chat_id`; safe to call from any thread.
+        """
+        self._loop.call_soon_threadsafe(self._push, chat_id, text)
+
+    def _push(self, chat_id: int, text: str) -> None:
+        message = self._message(chat_id, text)
+        command_length = len(text.split(" ", 1)[0])
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": command_length}]
+        self._updates.append({"update_id": self._next_update_id, "message": message})
+        self._next_update_id += 1
+        self._arrived.set()
+
+    async def _get_updates(self, params: Dict) -> List[Dict]:
+        offset = int(params.get("offset") or 0)
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates:
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:int(params.get("limit") or 100)]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._params(request)
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "bot", "username": "trending_load_bot",
+                      "can_join_groups": False, "can_read_all_group_messages": False,
+                      "supports_inline_queries": False}
+        elif method == "getUpdates":
+            result = await self._get_updates(params)
+        elif method == "sendMessage":
+            chat_id, text = int(params["chat_id"]), params["text"]
+            self.sent += 1
+            if self.on_send is not None:
+                self.on_send(chat_id, text)
+            result = self._message(chat_id, text, from_bot=True)
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    def app(self) -> web.Application:
+        async def bind(app):
+            self._loop = asyncio.get_running_loop()
+            self._arrived = asyncio.Event()
+
+        app = web.Application()
+        app.on_startup.append(bind)
+        app.router.add_post(f"/bot{self.token}/{{method}}", self.handle)
+        return app
+
+
+class ServerThread:
+    """
+    Runs aiohttp applications on their own event loop in a daemon thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._runners: List[web.AppRunner] = []
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def serve(self, app: web.Application) -> str:
+        async def start():
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            self._runners.append(runner)
+            host, port = runner.addresses[0][:2]
+            return f"http://{host}:{port}"
+        return self._call(start())
+
+    def stop(self) -> None:
+        async def cleanup():
+            for runner in self._runners:
+                await runner.cleanup()
+        self._call(cleanup())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class LoopMonitor:
+    """
+    Samples how late the event loop wakes up a task sleeping `interval`
+    seconds, and with asyncio debug mode collects every slow callback.
+    """
+
+    def __init__(self, interval: float = 0.005, slow_callback: float = 0.02, trace: bool = True):
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.trace = trace
+        self.lags: List[float] = []
+        self.slow: List[tuple] = []
+        self._task: Optional[asyncio.Task] = None
+        self._handler: Optional[logging.Handler] = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.trace:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_callback
+            self._handler = _SlowCallbackHandler(self.slow)
+            # Collected for the report instead of printed one by one.
+            logging.getLogger("asyncio").addHandler(self._handler)
+            logging.getLogger("asyncio").propagate = False
+        self._task = loop.create_task(self._sample())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        if self._handler is not None:
+            logging.getLogger("asyncio").removeHandler(self._handler)
+            logging.getLogger("asyncio").propagate = True
+            asyncio.get_running_loop().set_debug(False)
+
+    def report(self, top: int = 10) -> Dict:
+        by_site = defaultdict(list)
+        for description, duration in self.slow:
+            by_site[_callback_site(description)].append(duration)
+        hotspots = sorted(by_site.items(), key=lambda item: sum(item[1]), reverse=True)[:top]
+        return {
+            "lag": summarize(self.lags),
+            "slow_callbacks": len(self.slow),
+            "hotspots": [{"site": site, "count": len(durations), "total": sum(durations), "max": max(durations)}
+                         for site, durations in hotspots],
+        }
+
+
+class _SlowCallbackHandler(logging.Handler):
+    # asyncio's debug mode logs "Executing <handle> took 0.123 seconds".
+    def __init__(self, sink: List[tuple]):
+        super().__init__(logging.WARNING)
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.msg.startswith("Executing") and len(record.args or ()) == 2:
+            self.sink.append((str(record.args[0]), float(record.args[1])))
+
+
+_CREATED_AT = re.compile(r"created at (\S+:\d+)")
+_CORO = re.compile(r"coro=<([\w.<>]+)\(\)")
+
+
+def _callback_site(description: str) -> str:
+    # Prefer the coroutine a slow step belongs to, then where the handle was created.
+    match = _CORO.search(description) or _CREATED_AT.search(description)
+    return match.group(1) if match else description[:120]
+
+
+async def simulate_users(telegram: FakeTelegram, replies: Dict[int, asyncio.Queue], commands: List[str],
+                         users: int, commands_per_user: int, think: float, timeout: float) -> Dict:
+    """
+    Run `users` concurrent users, each issuing `commands_per_user` commands one
+    after another, and time every command until its last reply.
+    """
+    latencies, errors = [], Counter()
+
+    async def user(chat_id: int) -> None:
+        for i in range(commands_per_user):
+            command = commands[(chat_id + i) % len(commands)]
+            started = time.perf_counter()
+            telegram.push_command(chat_id, "/" + command)
+            try:
+                for _ in range(REPLIES_PER_COMMAND):
+                    text = await asyncio.wait_for(replies[chat_id].get(), timeout)
+            except asyncio.TimeoutError:
+                errors["timeout"] += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            if text.startswith(("No ", "GitHub is not")):
+                errors["empty"] += 1
+            if think:
+                await asyncio.sleep(random.uniform(0, 2 * think))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(chat_id) for chat_id in replies))
+    duration = time.perf_counter() - started
+    return {
+        "commands": users * commands_per_user,
+        "completed": len(latencies),
+        "errors": dict(errors),
+        "duration": duration,
+        "throughput": len(latencies) / duration if duration else 0.0,
+        "latency": summarize(latencies),
+    }
+
+
+def isolate_bot_state(work_dir: str, cold: bool) -> SnapshotStore:
+    """
+    Point the bot's process-wide state at throwaway copies: a temp snapshot
+    store, no JSON export, a fresh page cache and the recorded language list.
+    """
+    store = SnapshotStore(os.path.join(work_dir, "trending.db"))
+    sqlite_store.set_snapshot_store(store)
+    fetch_service.JSON_EXPORT = False
+    github_api.trending_cache = TrendingCache(ttls={"daily": 0, "weekly": 0, "monthly": 0} if cold else None)
+    languages = load_languages()
+    validator.language_registry = LanguageRegistry(fetcher=lambda: languages,
+                                                   snapshot_path=os.path.join(work_dir, "languages.json"))
+    return store
+
+
+async def run_load_test(args) -> Dict:
+    from telegram.ext import Application
+    from src.bot.telegram_bot import GithubTrendingBot
+
+    loop = asyncio.get_running_loop()
+    replies = {chat_id: asyncio.Queue() for chat_id in range(1000, 1000 + args.users)}
+
+    def on_send(chat_id: int, text: str) -> None:
+        if chat_id in replies:
+            loop.call_soon_threadsafe(replies[chat_id].put_nowait, text)
+
+    pages = {name.rsplit(".", 1)[0]: html for name, html in load_fixtures().items()}
+    github = FakeGitHub(pages, latency=args.github_latency, jitter=args.github_latency / 2)
+    telegram = FakeTelegram(on_send=on_send)
+    servers = ServerThread()
+    monitor = LoopMonitor(slow_callback=args.slow_callback, trace=not args.no_trace)
+    try:
+        github_api.TRENDING_URL = servers.serve(github.app()) + "/trending"
+        telegram_url = servers.serve(telegram.app())
+
+        builder = Application.builder().token(TOKEN).base_url(f"{telegram_url}/bot")
+        builder = builder.connection_pool_size(args.pool_size).concurrent_updates(args.concurrent_updates or False)
+        bot = GithubTrendingBot(TOKEN, application=builder.build())
+        bot.register_handlers()
+
+        async with bot.app:
+            await bot.app.start()
+            await bot.app.updater.start_polling(poll_interval=0.0, timeout=1)
+            monitor.start()
+            try:
+                report = await simulate_users(telegram, replies, args.commands, args.users,
+                                              args.commands_per_user, args.think, args.timeout)
+            finally:
+                await monitor.stop()
+                await bot.app.updater.stop()
+                await bot.app.stop()
+    finally:
+        await close_session()
+        servers.stop()
+
+    report.update({
+        "users": args.users,
+        "concurrent_updates": args.concurrent_updates,
+        "cold": args.cold,
+        "github_latency": args.github_latency,
+        "github_requests": github.requests,
+        "github_not_modified": github.not_modified,
+        "telegram_sends": telegram.sent,
+        "event_loop": monitor.report(),
+    })
+    return report
+
+
+def format_report(report: Dict) -> List[str]:
+    latency, loop = report["latency"], report["event_loop"]
+    lines = [
+        f"{report['completed']}/{report['commands']} commands from {report['users']} users in "
+        f"{report['duration']:.2f}s: {report['throughput']:.1f} commands/s"
+        + (f", errors: {report['errors']}" if report["errors"] else ""),
+        "latency  " + "  ".join(f"{key} {value * 1000:.1f}ms" for key, value in latency.items()),
+        "loop lag " + "  ".join(f"{key} {value * 1000:.1f}ms" for key, value in loop["lag"].items()),
+        f"GitHub requests {report['github_requests']} ({report['github_not_modified']} not modified), "
+        f"Telegram sends {report['telegram_sends']}",
+    ]
+    if loop["hotspots"]:
+        lines.append(f"{loop['slow_callbacks']} slow callbacks; where the loop blocked:")
+        lines.extend(f"  {spot['total'] * 1000:8.1f}ms total  {spot['count']:4d}x  max {spot['max'] * 1000:.1f}ms  "
+                     f"{spot['site']}" for spot in loop["hotspots"])
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the bot against local GitHub and Telegram stand-ins.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--commands-per-user", type=int, default=5)
+    parser.add_argument("--think", type=float, default=0.05, help="mean pause between a user's commands")
+    parser.add_argument("--commands", type=lambda value: [c.strip() for c in value.split(",") if c.strip()],
+                        default=DEFAULT_COMMANDS.split(","), help="comma-separated commands, without the slash")
+    parser.add_argument("--github-latency", type=float, default=0.1, help="seconds per trending page")
+    parser.add_argument("--cold", action="store_true", help="expire cached pages at once (every command revalidates)")
+    parser.add_argument("--concurrent-updates", type=int, default=0,
+                        help="updates handled at once (0: python-telegram-bot's default, one at a time)")
+    parser.add_argument("--pool-size", type=int, default=1, help="HTTP connections for bot API calls")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for one command's replies")
+    parser.add_argument("--slow-callback", type=float, default=0.02, help="report callbacks slower than this")
+    parser.add_argument("--no-trace", action="store_true", help="skip asyncio debug mode (lower overhead)")
+    parser.add_argument("--out", help="write the report as JSON to FILE")
+    args = parser.parse_args()
+
+    # Per-request and per-fetch INFO lines would drown the report.
+    for name in ("httpx", "telegram", "apscheduler", "src.events"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        store = isolate_bot_state(work_dir, args.cold)
+        try:
+            report = asyncio.run(run_load_test(args))
+        finally:
+            store.close()
+
+    print("\n".join(format_report(report)))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if report["completed"] == report["commands"] else 1)
+
+
+if __name__ == "__main__":
+    main()
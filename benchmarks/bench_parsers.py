@@ -0,0 +1,74 @@
+"""
+Compare the trending-page parser backends on the saved HTML fixtures.
+
+    python -m benchmarks.bench_parsers [--rounds N] [--limit N|all]
+
+Reports the mean parse time per page and the peak traced memory of a single
+parse for every backend registered in `src.api.parsers.PARSERS`. Memory is
+measured with tracemalloc, which does not see libxml2's own C allocations, so
+the lxml figure only covers the Python objects it creates.
+"""
+import argparse
+import glob
+import os
+import time
+import tracemalloc
+from src.api.parsers import PARSERS, MAX_REPOS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "trending")
+
+
+def load_fixtures(pattern: str = "*.html") -> dict:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, pattern))):
+        with open(path, 'r') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def time_parser(parser, html: str, rounds: int, limit) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        list(parser(html, limit))
+    return (time.perf_counter() - start) / rounds
+
+
+def peak_memory(parser, html: str, limit) -> int:
+    tracemalloc.start()
+    try:
+        list(parser(html, limit))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(rounds: int = 20, limit=MAX_REPOS) -> list:
+    results = []
+    for page, html in load_fixtures().items():
+        reference = list(PARSERS["full"](html, limit))
+        for backend, parser in PARSERS.items():
+            if list(parser(html, limit)) != reference:
+                raise AssertionError(f"{backend} output differs from the reference parser on {page}")
+            results.append({
+                "page": page,
+                "backend": backend,
+                "ms_per_page": time_parser(parser, html, rounds, limit) * 1000,
+                "peak_kib": peak_memory(parser, html, limit) / 1024,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", default=str(MAX_REPOS), help="repos to parse per page, or 'all'")
+    args = parser.parse_args()
+    limit = None if args.limit == "all" else int(args.limit)
+
+    print(f"{'page':<14}{'backend':<10}{'ms/page':>10}{'peak KiB':>12}")
+    for row in run(args.rounds, limit):
+        print(f"{row['page']:<14}{row['backend']:<10}{row['ms_per_page']:>10.2f}{row['peak_kib']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Offline benchmark of the fetch -> parse -> validate -> save -> render pipeline.
+
+    python -m benchmarks.bench_pipeline [--rounds N] [--limit N|all] [--out FILE]
+                                        [--baseline FILE] [--save-baseline] [--tolerance F]
+
+Every stage runs on recorded inputs: the trending pages in tests/fixtures/trending
+and the language list in tests/fixtures/languages.json. No request leaves the
+machine. The "fetch" stage is `scrape_github_trending_async` with the download
+replaced by the recorded page, so it covers the streaming and parsing path.
+
+Every stage reports mean and p95 time per run, runs per second, repos per second,
+and the peak memory of one run as traced by tracemalloc. Results can be written as
+JSON with --out and compared against a stored baseline. The exit status is non-zero
+when a stage's mean time exceeds its baseline by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+from src.api import github_api
+from src.api.parsers import MAX_REPOS, default_backend
+from src.bot.render import render_trending
+from src.storage.sqlite_store import SnapshotStore
+from src.utils.file_handler import save_to_file
+from src.utils.language_registry import LanguageRegistry
+from src.utils.validator import validate_trending_data
+from benchmarks.bench_parsers import load_fixtures
+
+LANGUAGES_FIXTURE = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "languages.json")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.json")
+DEFAULT_TOLERANCE = 0.25
+
+
+def load_languages() -> list:
+    with open(LANGUAGES_FIXTURE, 'r') as f:
+        return json.load(f)
+
+
+def scrape_recorded(html: str, since: str, limit):
+    async def fetch_recorded(language="", since="daily", headers=None):
+        return {"status": 200, "html": html, "etag": None, "last_modified": None}
+
+    with patch.object(github_api, "fetch_trending_page", fetch_recorded):
+        return asyncio.run(github_api.scrape_github_trending_async("", since, use_cache=False, limit=limit))
+
+
+def build_stages(pages: dict, languages: list, limit, work_dir: str) -> dict:
+    """
+    Map each stage name to a zero-argument callable running it once over every
+    recorded page. Each callable returns the number of repos it handled.
+    """
+    periods = {name: name.rsplit(".", 1)[0] for name in pages}
+    records = {name: scrape_recorded(html, periods[name], limit) for name, html in pages.items()}
+    registry = LanguageRegistry(fetcher=lambda: languages,
+                                snapshot_path=os.path.join(work_dir, "languages.json"))
+    registry.refresh()
+    store = SnapshotStore(os.path.join(work_dir, "trending.db"))
+    lookups = [entry["name"].upper() for entry in languages] + ["not-a-language"]
+
+    def fetch():
+        return sum(len(scrape_recorded(html, periods[name], limit)) for name, html in pages.items())
+
+    def validate():
+        for repos in records.values():
+            if not validate_trending_data(repos):
+                raise AssertionError("Recorded trending data failed validation")
+        for name in lookups:
+            registry.lookup(name)
+        return sum(len(repos) for repos in records.values())
+
+    def save():
+        for name, repos in records.items():
+            save_to_file(repos, os.path.join(work_dir, periods[name], "all_languages.json"), compact=True)
+        return sum(len(repos) for repos in records.values())
+
+    def store_snapshot():
+        for name, repos in records.items():
+            store.save_snapshot(periods[name], "", "20240101", repos)
+        return sum(len(repos) for repos in records.values())
+
+    def render():
+        for name, repos in records.items():
+            render_trending(periods[name], "", repos, limit)
+        return sum(len(repos) for repos in records.values())
+
+    return {
+        "fetch": fetch,
+        "validate": validate,
+        "save": save,
+        "store": store_snapshot,
+        "render": render,
+    }
+
+
+def measure(stage, rounds: int) -> dict:
+    timings = []
+    repos = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        repos = stage()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+
+    tracemalloc.start()
+    try:
+        stage()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ms_mean": mean * 1000,
+        "ms_p95": timings[int(0.95 * (len(timings) - 1))] * 1000,
+        "runs_per_s": 1 / mean if mean else 0.0,
+        "repos_per_s": repos / mean if mean else 0.0,
+        "repos": repos,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run(rounds: int = 20, limit=MAX_REPOS) -> dict:
+    pages = load_fixtures()
+    with tempfile.TemporaryDirectory() as work_dir:
+        stages = build_stages(pages, load_languages(), limit, work_dir)
+        results = {name: measure(stage, rounds) for name, stage in stages.items()}
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "parser": default_backend(),
+            "pages": sorted(pages),
+            "rounds": rounds,
+            "limit": limit,
+        },
+        "stages": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Compare mean stage times with a baseline run. A stage regresses when it is
+    more than `tolerance` (a fraction) slower than its baseline.
+    """
+    rows = []
+    for name, result in current["stages"].items():
+        reference = baseline.get("stages", {}).get(name)
+        if reference is None or not reference.get("ms_mean"):
+            rows.append({"stage": name, "ms_mean": result["ms_mean"], "baseline_ms": None,
+                         "change": None, "regressed": False})
+            continue
+        change = result["ms_mean"] / reference["ms_mean"] - 1
+        rows.append({"stage": name, "ms_mean": result["ms_mean"], "baseline_ms": reference["ms_mean"],
+                     "change": change, "regressed": change > tolerance})
+    return rows
+
+
+def write_json(results: dict, path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=4)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", default=str(MAX_REPOS), help="repos to parse per page, or 'all'")
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown per stage as a fraction (default 0.25)")
+    args = parser.parse_args()
+    limit = None if args.limit == "all" else int(args.limit)
+
+    results = run(args.rounds, limit)
+    if args.out:
+        write_json(results, args.out)
+
+    print(f"{'stage':<10}{'ms mean':>10}{'ms p95':>10}{'runs/s':>10}{'repos/s':>12}{'peak KiB':>10}")
+    for name, row in results["stages"].items():
+        print(f"{name:<10}{row['ms_mean']:>10.2f}{row['ms_p95']:>10.2f}{row['runs_per_s']:>10.1f}"
+              f"{row['repos_per_s']:>12.0f}{row['peak_kib']:>10.0f}")
+
+    if args.save_baseline:
+        write_json(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("limit") != limit:
+        print(f"Note: baseline was recorded with limit={baseline.get('meta', {}).get('limit')}")
+    rows = compare(results, baseline, args.tolerance)
+    print(f"\n{'stage':<10}{'ms mean':>10}{'baseline':>10}{'change':>10}")
+    for row in rows:
+        if row["baseline_ms"] is None:
+            print(f"{row['stage']:<10}{row['ms_mean']:>10.2f}{'-':>10}{'-':>10}")
+            continue
+        print(f"{row['stage']:<10}{row['ms_mean']:>10.2f}{row['baseline_ms']:>10.2f}{row['change']:>+10.1%}"
+              f"{'  REGRESSED' if row['regressed'] else ''}")
+    sys.exit(1 if any(row["regressed"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Memory and allocations of `TrendingRepo` records vs the previous per-repo dicts.
+
+    python -m benchmarks.bench_records [--snapshots N] [--pages N]
+
+`parse` runs the recorded trending fixtures through the fetch pipeline. `dicts`
+is the pipeline before records: the parser builds a 9-key dict per repo (kept
+by the response cache) and `fetch_and_save_repos` projects a 5-column copy of
+each. `records` is the current one: the parser builds records, and the cache and
+the caller share them.
+
+`archive` loads a synthetic JSON archive of N snapshot files with 25 repos each,
+the shape `fetch_and_save_repos` exports. `dicts` keeps the decoded dicts and
+runs `validate_trending_data` over them, which is what archive readers do.
+`records` converts them to records, which only the cache's disk tier does (one
+page at a time); it is here to show what a bulk conversion would cost.
+
+Retained memory is what the loaded result still holds once loading is done.
+Blocks is the number of live allocations behind it. Both are measured with
+tracemalloc.
+"""
+import argparse
+import gc
+import os
+from contextlib import contextmanager
+import tempfile
+import time
+import tracemalloc
+from src.api import parsers
+from src.api.models import to_records
+from src.api.parsers import parse_strained
+from src.utils.file_handler import read_from_file, save_to_file
+from src.utils.validator import validate_trending_data
+from benchmarks.bench_parsers import load_fixtures
+
+REPOS_PER_SNAPSHOT = 25
+# The export columns before records (DESIRED_COLUMNS in fetch_service).
+LEGACY_COLUMNS = ("author", "url", "stars", "forks", "language")
+
+
+def _legacy_build_repo(full_name, description, language, stars, forks, stars_today):
+    # What the parsers built before records.
+    return {
+        "name": full_name.split("/")[-1],
+        "author": full_name.split("/")[0],
+        "full_name": full_name,
+        "description": description,
+        "language": language,
+        "stars": stars,
+        "forks": forks,
+        "stars_today": stars_today,
+        "url": f"https://github.com/{full_name}"
+    }
+
+
+@contextmanager
+def legacy_parser():
+    build_repo = parsers._build_repo
+    parsers._build_repo = _legacy_build_repo
+    try:
+        yield
+    finally:
+        parsers._build_repo = build_repo
+
+
+def write_archive(root: str, snapshots: int) -> list:
+    repos = parse_strained(load_fixtures("daily.html")["daily.html"], limit=None)
+    paths = []
+    for i in range(snapshots):
+        # Rotate so consecutive snapshots differ like real days do.
+        data = [repos[(i + j) % len(repos)] for j in range(REPOS_PER_SNAPSHOT)]
+        path = os.path.join(root, "daily", "all_languages", f"{20200101 + i}.json")
+        paths.append(save_to_file(data, path, compact=True))
+    return paths
+
+
+def load_dicts(paths: list) -> list:
+    snapshots = [read_from_file(path) for path in paths]
+    for data in snapshots:
+        validate_trending_data(data)
+    return snapshots
+
+
+def load_records(paths: list) -> list:
+    return [to_records(read_from_file(path)) for path in paths]
+
+
+def parse_dicts(pages: list) -> list:
+    snapshots = []
+    with legacy_parser():
+        for html in pages:
+            cached = parse_strained(html, None)
+            # The cache keeps the parsed dicts; the caller gets a projected copy of each.
+            snapshots.append((cached, [{col: repo.get(col) for col in LEGACY_COLUMNS} for repo in cached]))
+    return snapshots
+
+
+def parse_records(pages: list) -> list:
+    return [parse_strained(html, None) for html in pages]
+
+
+def measure(loader, source) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = loader(source)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    repos = sum(len(snapshot[0] if isinstance(snapshot, tuple) else snapshot) for snapshot in result)
+    del result
+    return {
+        "repos": repos,
+        "ms": elapsed * 1000,
+        "retained_kib": retained / 1024,
+        "peak_kib": peak / 1024,
+        "blocks": blocks,
+        "bytes_per_repo": retained / repos if repos else 0.0,
+    }
+
+
+def run(snapshots: int = 2000, pages: int = 40) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        paths = write_archive(root, snapshots)
+        for name, loader in (("dicts", load_dicts), ("records", load_records)):
+            results.append(dict(measure(loader, paths), scenario="archive", pipeline=name))
+    html = list(load_fixtures().values())
+    fixture_pages = [html[i % len(html)] for i in range(pages)]
+    for name, loader in (("dicts", parse_dicts), ("records", parse_records)):
+        results.append(dict(measure(loader, fixture_pages), scenario="parse", pipeline=name))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--snapshots", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<10}{'pipeline':<10}{'repos':>8}{'ms':>10}{'retained KiB':>14}"
+          f"{'peak KiB':>10}{'blocks':>10}{'B/repo':>8}")
+    for row in run(args.snapshots, args.pages):
+        print(f"{row['scenario']:<10}{row['pipeline']:<10}{row['repos']:>8}{row['ms']:>10.1f}"
+              f"{row['retained_kib']:>14.0f}{row['peak_kib']:>10.0f}{row['blocks']:>10}{row['bytes_per_repo']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 import logging
 import asyncio
+import os
 import nest_asyncio
 from src.bot.telegram_bot import GithubTrendingBot
 from src.bot.key import TELEGRAM_TOKEN
+from src.api.http_client import close_session
+from src.utils.validator import language_registry
+from src.bot.scheduler import start_scheduler
+from src.utils.logger import configure_logging
+from src.utils.metrics import metrics, start_metrics_server
 
 # Apply nest_asyncio to allow nested event loops
 nest_asyncio.apply()
@@ -19,9 +25,23 @@ async def main():
     """
     # Initialize logging
     logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.INFO)
+    configure_logging()
+
+    # Expose /metrics when a port is configured
+    metrics_runner = None
+    if os.getenv("TRENDING_METRICS_PORT"):
+        metrics.enable()
+        metrics_runner = await start_metrics_server(port=int(os.getenv("TRENDING_METRICS_PORT")))
+
+    # Warm the language registry (snapshot on disk, refreshed in the background)
+    await language_registry.ensure_fresh_async()
 
     # Initialize and run the Telegram Bot
     bot = GithubTrendingBot(token=TELEGRAM_TOKEN)
+
+    # Scheduled daily/weekly/monthly broadcasts run inside this process
+    scheduler = start_scheduler(bot)
+
     logging.info("Starting Telegram Bot...")
     await bot.run()
 
@@ -31,9 +51,14 @@ async def main():
             await asyncio.sleep(1)
     except KeyboardInterrupt:
         logging.info("KeyboardInterrupt received. Stopping bot...")
+        scheduler.shutdown(wait=False)
         await bot.app.updater.stop()
         await bot.app.stop()
         await bot.app.shutdown()
+        await bot.outbox.close()
+        await close_session()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
         logging.info("Bot stopped successfully.")
 
 if __name__ == "__main__":
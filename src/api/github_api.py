@@ -1,80 +1,186 @@
+import asyncio
+import logging
 import aiohttp
-import requests
-from typing import List, Dict
-from bs4 import BeautifulSoup
-import re
+from itertools import islice
+from typing import AsyncIterator, Iterator, List, Dict, Optional
+from src.api.models import TrendingRepo
+from src.api.parsers import get_parser, MAX_REPOS
+from src.api.http_client import get_session, close_session
+from src.api.resilience import CircuitOpenError, RetryableHTTPError, call_with_retries, check_response
+from src.api.response_cache import DEFAULT_DISK_DIR, TrendingCache
+from src.storage.page_archive import get_page_archive
+from src.utils.logger import log_event
+from src.utils.metrics import metrics
 
 API_LANGUAGES = 'https://api.gitterapp.com/languages'
+TRENDING_URL = "https://github.com/trending"
 
+trending_cache = TrendingCache(disk_dir=DEFAULT_DISK_DIR)
 
-def scrape_github_trending(language: str = "", since: str = "daily") -> List[Dict]:
+
+def trending_url(language: str = "", since: str = "daily") -> str:
+    return f"{TRENDING_URL}/{language}?since={since}" if language else f"{TRENDING_URL}?since={since}"
+
+
+def iter_trending_repos(html: str, limit: Optional[int] = MAX_REPOS,
+                        backend: Optional[str] = None) -> Iterator[TrendingRepo]:
     """
-    Get the trending repositories from GitHub via BeautifulSoup.
+    Lazily parse the trending page HTML, yielding one `TrendingRepo` at a time
+    and stopping after `limit` repositories (all of them when None).
+    `backend` selects a parser from `src.api.parsers.PARSERS` (lxml when available).
+    """
+    return get_parser(backend)(html, limit)
+
+
+def parse_trending_html(html: str, backend: Optional[str] = None,
+                        limit: Optional[int] = MAX_REPOS) -> List[TrendingRepo]:
+    """
+    Parse the trending page HTML into a list of `TrendingRepo` records.
+    """
+    return list(iter_trending_repos(html, limit, backend))
+
+
+async def fetch_trending_page(language: str = "", since: str = "daily",
+                              headers: Optional[Dict[str, str]] = None) -> Dict:
     """
-    base_url = "https://github.com/trending"
-    url = f"{base_url}/{language}?since={since}" if language else f"{base_url}?since={since}"
+    Download the trending page over the shared pooled session, optionally as a
+    conditional request. Returns the status, body and cache validators.
+    429/5xx responses and network errors are retried with backoff behind the
+    github.com circuit breaker (see `src.api.resilience`).
+    """
+    url = trending_url(language, since)
+
+    async def attempt() -> Dict:
+        session = await get_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304:
+                return {"status": 304, "html": "", "etag": None, "last_modified": None}
+            check_response(response.status, response.headers)
+            response.raise_for_status()
+            return {
+                "status": response.status,
+                "html": await response.text(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+
+    return await call_with_retries(url, attempt)
 
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
 
+async def fetch_trending_html(language: str = "", since: str = "daily") -> str:
+    """
+    Download the raw trending page over the shared pooled session.
+    """
+    return (await fetch_trending_page(language, since))["html"]
+
+
+async def _archive_page(since: str, language: str, html: Optional[str] = None) -> None:
+    """
+    Keep the raw page in the optional archive (a cached/304 page is re-indexed
+    under today's date), off the event loop. Archiving never fails a fetch.
+    """
+    archive = get_page_archive()
+    if archive is None:
+        return
     try:
-        res = requests.get(url, headers=headers)
-        res.raise_for_status()
-    except requests.RequestException as e:
-        print(f"Error fetching trending page: {e}")
-        return []
-
-    soup = BeautifulSoup(res.text, "html.parser")
-    repo_list = []
-    cout = 0
-
-    for repo in soup.find_all("article", class_="Box-row"):
-        cout += 1
-        if cout > 10:
-            break
-        full_name = repo.h2.a.get("href").strip("/")  # e.g., torvalds/linux
-        name = full_name.split("/")[-1]
-        author = full_name.split("/")[0]
-        description_tag = repo.find("p")
-        description = description_tag.text.strip() if description_tag else ""
-
-        lang_tag = repo.find("span", itemprop="programmingLanguage")
-        repo_lang = lang_tag.text.strip() if lang_tag else ""
-
-        stars_tag = repo.select_one("a[href$='/stargazers']")
-        stars = stars_tag.text.strip().replace(",", "") if stars_tag else "0"
-
-        forks_tag = repo.select_one("a[href$='/network/members']")
-        forks = forks_tag.text.strip().replace(",", "") if forks_tag else "0"
-
-        star_today_tag = repo.find(string=re.compile("stars today"))
-        stars_today = re.search(r"(\d+)", star_today_tag).group(1) if star_today_tag else "0"
-
-        repo_list.append({
-            "name": name,
-            "author": author,
-            "full_name": full_name,
-            "description": description,
-            "language": repo_lang,
-            "stars": int(stars),
-            "forks": int(forks),
-            "stars_today": int(stars_today),
-            "url": f"https://github.com/{full_name}"
-        })
-
-    return repo_list
+        if html is None:
+            await asyncio.to_thread(archive.touch, since, language)
+        else:
+            await asyncio.to_thread(archive.put, since, language, html)
+    except (OSError, ValueError) as e:
+        log_event("page_archive_failed", logging.WARNING, period=since, language=language or "", error=str(e))
+
+
+async def stream_github_trending(language: str = "", since: str = "daily",
+                                 limit: Optional[int] = MAX_REPOS,
+                                 use_cache: bool = True) -> AsyncIterator[TrendingRepo]:
+    """
+    Yield the trending repositories one at a time, parsing no further than `limit`.
+    Results are served from `trending_cache` while fresh and revalidated with
+    ETag/If-Modified-Since once their period's TTL has expired; when GitHub
+    cannot be reached the expired entry is served instead. Records are
+    immutable, so cached ones are shared rather than copied.
+    """
+    key = trending_cache.make_key(language, since)
+    entry, fresh = await trending_cache.lookup_async(key, limit) if use_cache else (None, False)
+    if use_cache:
+        metrics.inc("trending_cache_total", result="hit" if fresh else "miss")
+    if fresh:
+        await _archive_page(since, language)
+        for repo in islice(entry.repos, limit):
+            yield repo if isinstance(repo, TrendingRepo) else dict(repo)
+        return
+
+    try:
+        with metrics.span("fetch", period=since):
+            page = await fetch_trending_page(language, since, entry.conditional_headers() if entry else None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, RetryableHTTPError, CircuitOpenError) as e:
+        log_event("trending_fetch_failed", logging.WARNING, period=since, language=language or "", error=str(e))
+        # Stale-while-error: the last good result beats an empty answer.
+        stale = entry or await trending_cache.get_async(key)
+        if stale is not None:
+            trending_cache.served_stale()
+            metrics.inc("trending_cache_total", result="stale")
+            for repo in islice(stale.repos, limit):
+                yield repo if isinstance(repo, TrendingRepo) else dict(repo)
+        return
+
+    if page["status"] == 304 and entry is not None:
+        await trending_cache.revalidated_async(key, entry)
+        metrics.inc("trending_cache_total", result="revalidated")
+        await _archive_page(since, language)
+        for repo in islice(entry.repos, limit):
+            yield repo if isinstance(repo, TrendingRepo) else dict(repo)
+        return
+
+    await _archive_page(since, language, page["html"])
+    parsed = []
+    for repo in metrics.timed_iter(iter_trending_repos(page["html"], limit), "parse", period=since):
+        if use_cache:
+            parsed.append(repo)
+        yield repo
+
+    if parsed:
+        complete = limit is None or len(parsed) < limit
+        await trending_cache.put_async(key, parsed, page["etag"], page["last_modified"], complete=complete)
+
+
+async def scrape_github_trending_async(language: str = "", since: str = "daily",
+                                       use_cache: bool = True,
+                                       limit: Optional[int] = MAX_REPOS) -> List[TrendingRepo]:
+    """
+    Get the trending repositories from GitHub without blocking the event loop.
+    """
+    return [repo async for repo in stream_github_trending(language, since, limit, use_cache)]
+
+
+def scrape_github_trending(language: str = "", since: str = "daily",
+                           limit: Optional[int] = MAX_REPOS) -> List[TrendingRepo]:
+    """
+    Get the trending repositories from GitHub via BeautifulSoup.
+    Blocking wrapper around `scrape_github_trending_async` for one-shot scripts.
+    """
+    async def _scrape_once():
+        try:
+            return await scrape_github_trending_async(language, since, limit=limit)
+        finally:
+            await close_session()
+
+    return asyncio.run(_scrape_once())
 
 async def get_languages():
     """
     Fetch the list of available programming languages from the API.
     """
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(API_LANGUAGES) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    raise Exception(f"Failed to fetch languages: {response.status}")
-        except Exception as e:
-            raise RuntimeError(f"Failed to fetch languages: {e}")
+    async def attempt():
+        session = await get_session()
+        async with session.get(API_LANGUAGES) as response:
+            check_response(response.status, response.headers)
+            if response.status == 200:
+                return await response.json()
+            raise RuntimeError(f"Failed to fetch languages: {response.status}")
+
+    try:
+        return await call_with_retries(API_LANGUAGES, attempt)
+    except Exception as e:
+        raise RuntimeError(f"Failed to fetch languages: {e}")
@@ -0,0 +1,100 @@
+import asyncio
+import aiohttp
+from typing import Dict, Optional
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0"
+}
+
+# Connection pool / timeout settings shared by every outbound request.
+HTTP_CONFIG = {
+    "total_timeout": 20.0,
+    "connect_timeout": 5.0,
+    "read_timeout": 15.0,
+    "pool_limit": 20,
+    "pool_limit_per_host": 8,
+    "dns_cache_ttl": 300,
+    "keepalive_timeout": 30.0,
+}
+
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def configure_http(**options) -> None:
+    """
+    Override the pooled session settings (timeouts, pool sizes, DNS cache TTL).
+    Only sessions created after the call pick up the new values.
+    """
+    unknown = set(options) - set(HTTP_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown HTTP options: {', '.join(sorted(unknown))}")
+    HTTP_CONFIG.update(options)
+
+
+def build_timeout(total: Optional[float] = None) -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(
+        total=total if total is not None else HTTP_CONFIG["total_timeout"],
+        connect=HTTP_CONFIG["connect_timeout"],
+        sock_read=HTTP_CONFIG["read_timeout"],
+    )
+
+
+def _build_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_CONFIG["pool_limit"],
+        limit_per_host=HTTP_CONFIG["pool_limit_per_host"],
+        ttl_dns_cache=HTTP_CONFIG["dns_cache_ttl"],
+        use_dns_cache=True,
+        keepalive_timeout=HTTP_CONFIG["keepalive_timeout"],
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=build_timeout(),
+        headers=DEFAULT_HEADERS,
+    )
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Return the pooled keep-alive session for the running event loop,
+    creating it on first use (or after it has been closed).
+    """
+    loop = asyncio.get_running_loop()
+    for stale in [l for l in _sessions if l.is_closed()]:
+        del _sessions[stale]
+
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = _build_session()
+        _sessions[loop] = session
+    return session
+
+
+async def close_session() -> None:
+    """
+    Close the pooled session bound to the running event loop, if any.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.pop(loop, None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host so that at most `rate` of them start per second.
+    """
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, host: str) -> None:
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        # Reserve the slot before sleeping so concurrent callers queue up behind it.
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
@@ -0,0 +1,166 @@
+import sys
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+GITHUB_URL = "https://github.com/"
+
+# Every key a parsed repository exposes, in the order the parsers always produced them.
+FIELDS = ("name", "author", "full_name", "description", "language", "stars", "forks", "stars_today", "url")
+
+# Columns written to the per-day JSON export.
+RECORD_FIELDS = ("author", "url", "stars", "forks", "language")
+
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _check_count(field: str, value) -> int:
+    if type(value) is int and value >= 0:
+        return value
+    if value is None:
+        return 0
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(f"TrendingRepo.{field} must be an int, got {type(value).__name__}")
+    if value < 0:
+        raise ValueError(f"TrendingRepo.{field} must not be negative, got {value}")
+    return value
+
+
+def _check_text(field: str, value) -> str:
+    if type(value) is str:
+        return value
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise TypeError(f"TrendingRepo.{field} must be a str, got {type(value).__name__}")
+    return value
+
+
+def full_name_from_url(url: str) -> str:
+    return url.rstrip("/").split("github.com/", 1)[-1]
+
+
+class TrendingRepo:
+    """
+    One repository of a trending page, typed and validated once at construction.
+
+    Records are immutable, so the parser, the response cache, the snapshot store
+    and the message renderer all share the same object instead of copying dicts.
+    The six scraped values are stored, and `name`, `author` and `url` are derived
+    from `full_name` once, when the record is built, so reading them (as the
+    renderer does for every line) is a plain slot lookup. Read-only mapping
+    access (`repo["stars"]`, `repo.get(...)`, `dict(repo)`) keeps code written
+    against the old dicts working.
+    """
+    __slots__ = ("full_name", "description", "language", "stars", "forks", "stars_today", "author", "name", "url")
+
+    def __init__(self, full_name: str, description: Optional[str] = "", language: Optional[str] = "",
+                 stars: int = 0, forks: int = 0, stars_today: Optional[int] = 0):
+        full_name = _check_text("full_name", full_name).strip("/")
+        owner, _, name = full_name.partition("/")
+        if not owner or not name or "/" in name:
+            raise ValueError(f"TrendingRepo.full_name must look like 'owner/name', got {full_name!r}")
+        # Slot descriptors bypass the immutability guard in __setattr__.
+        _set_full_name(self, full_name)
+        _set_author(self, owner)
+        _set_name(self, name)
+        _set_url(self, GITHUB_URL + full_name)
+        _set_description(self, _check_text("description", description))
+        # Languages repeat across thousands of records in an archive; share one string each.
+        _set_language(self, sys.intern(_check_text("language", language)))
+        _set_stars(self, _check_count("stars", stars))
+        _set_forks(self, _check_count("forks", forks))
+        _set_stars_today(self, _check_count("stars_today", stars_today))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TrendingRepo is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TrendingRepo is immutable")
+
+    def __reduce__(self):
+        return TrendingRepo, self._values()
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TrendingRepo":
+        """
+        Build a record from a parsed-repo dict or an exported JSON record
+        (which carries `url` instead of `full_name`).
+        """
+        if isinstance(data, cls):
+            return data
+        full_name = data.get("full_name") or full_name_from_url(_check_text("url", data.get("url")))
+        return cls(full_name, data.get("description"), data.get("language"),
+                   data.get("stars"), data.get("forks"), data.get("stars_today"))
+
+    def _values(self) -> Tuple:
+        return self.full_name, self.description, self.language, self.stars, self.forks, self.stars_today
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "author": self.author,
+            "full_name": self.full_name,
+            "description": self.description,
+            "language": self.language,
+            "stars": self.stars,
+            "forks": self.forks,
+            "stars_today": self.stars_today,
+            "url": self.url,
+        }
+
+    def to_record(self) -> Dict:
+        return {
+            "author": self.author,
+            "url": self.url,
+            "stars": self.stars,
+            "forks": self.forks,
+            "language": self.language,
+        }
+
+    # Read-only mapping protocol; every field is a slot, so a key is one set check and one attribute read.
+    def __getitem__(self, key: str):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __contains__(self, key) -> bool:
+        return key in FIELDS
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TrendingRepo):
+            return self._values() == other._values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        return f"TrendingRepo({self.full_name!r}, stars={self.stars}, forks={self.forks})"
+
+
+_set_full_name = TrendingRepo.full_name.__set__
+_set_description = TrendingRepo.description.__set__
+_set_language = TrendingRepo.language.__set__
+_set_stars = TrendingRepo.stars.__set__
+_set_forks = TrendingRepo.forks.__set__
+_set_stars_today = TrendingRepo.stars_today.__set__
+_set_author = TrendingRepo.author.__set__
+_set_name = TrendingRepo.name.__set__
+_set_url = TrendingRepo.url.__set__
+
+
+def to_records(repos: Iterable) -> list:
+    """
+    Coerce dicts (e.g. loaded from a JSON archive) to `TrendingRepo`s, leaving records as they are.
+    """
+    return [TrendingRepo.from_dict(repo) for repo in repos]
@@ -0,0 +1,183 @@
+import importlib.util
+import io
+import re
+from typing import Callable, Dict, Iterator, List, Optional
+from src.api.models import TrendingRepo
+
+# bs4 and lxml are imported by the backends that use them, so importing this
+# module stays cheap. lxml is optional; the pure-Python backends cover its absence.
+HAS_LXML = importlib.util.find_spec("lxml") is not None
+
+# Default number of repositories read from a page; pass limit=None for all of them.
+MAX_REPOS = 10
+ARTICLE_CLASS = "Box-row"
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _to_int(text: str) -> int:
+    return int(text.strip().replace(",", "")) if text and text.strip() else 0
+
+
+def _stars_today(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    match = _DIGITS.search(text.replace(",", ""))
+    return int(match.group(1)) if match else 0
+
+
+def _build_repo(full_name: str, description: str, language: str,
+                stars: int, forks: int, stars_today: int) -> TrendingRepo:
+    return TrendingRepo(full_name, description, language, stars, forks, stars_today)
+
+
+def _parse_soup_article(repo) -> TrendingRepo:
+    full_name = repo.h2.a.get("href").strip("/")  # e.g., torvalds/linux
+    description_tag = repo.find("p")
+    lang_tag = repo.find("span", itemprop="programmingLanguage")
+    stars_tag = repo.find("a", href=lambda href: href and href.endswith("/stargazers"))
+    forks_tag = repo.find("a", href=lambda href: href and href.endswith("/network/members"))
+    star_today_tag = repo.find(string=lambda text: "stars today" in text)
+
+    return _build_repo(
+        full_name,
+        description_tag.text.strip() if description_tag else "",
+        lang_tag.text.strip() if lang_tag else "",
+        _to_int(stars_tag.text) if stars_tag else 0,
+        _to_int(forks_tag.text) if forks_tag else 0,
+        _stars_today(star_today_tag),
+    )
+
+
+def iter_full(html: str, limit: Optional[int] = MAX_REPOS) -> Iterator[TrendingRepo]:
+    """
+    Reference backend: build the whole document tree with html.parser.
+    """
+    if limit is not None and limit <= 0:
+        return
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    articles = soup.find_all("article", class_=ARTICLE_CLASS, limit=limit)
+    for repo in articles:
+        yield _parse_soup_article(repo)
+
+
+_ARTICLE_START = re.compile(r"<article\b[^>]*\b" + ARTICLE_CLASS + r"\b[^>]*>", re.IGNORECASE)
+_ARTICLE_END = re.compile(r"</article\s*>", re.IGNORECASE)
+
+
+def iter_strained(html: str, limit: Optional[int] = MAX_REPOS) -> Iterator[TrendingRepo]:
+    """
+    Pure-Python restricted parse: only the `article.Box-row` chunks are handed to
+    html.parser, one at a time, so the page chrome is never materialised and
+    nothing past `limit` is parsed at all.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    strainer = SoupStrainer("article", class_=ARTICLE_CLASS)
+    count = 0
+    position = 0
+    while limit is None or count < limit:
+        start = _ARTICLE_START.search(html, position)
+        if start is None:
+            return
+        end = _ARTICLE_END.search(html, start.end())
+        position = end.end() if end else len(html)
+        repo = BeautifulSoup(html[start.start():position], "html.parser", parse_only=strainer).article
+        if repo is None:
+            continue
+        count += 1
+        yield _parse_soup_article(repo)
+
+
+_XP_IS_ARTICLE = f'contains(concat(" ", normalize-space(@class), " "), " {ARTICLE_CLASS} ")'
+
+
+def _ends_with(suffix: str) -> str:
+    return f"substring(@href, string-length(@href) - {len(suffix) - 1}) = '{suffix}'"
+
+
+def _first_text(repo, path: str) -> Optional[str]:
+    # string() yields "" both for an empty node and a missing one, so test existence first.
+    return repo.xpath(f"string(({path})[1])") if repo.xpath(f"boolean({path})") else None
+
+
+def _parse_lxml_article(repo) -> TrendingRepo:
+    href = repo.xpath("string(((.//h2)[1]//a)[1]/@href)")
+    description = _first_text(repo, ".//p")
+    lang = _first_text(repo, ".//span[@itemprop='programmingLanguage']")
+    stars = _first_text(repo, f".//a[{_ends_with('/stargazers')}]")
+    forks = _first_text(repo, f".//a[{_ends_with('/network/members')}]")
+    star_today = _first_text(repo, ".//text()[contains(., 'stars today')]")
+
+    return _build_repo(
+        href.strip("/"),
+        description.strip() if description is not None else "",
+        lang.strip() if lang is not None else "",
+        _to_int(stars) if stars is not None else 0,
+        _to_int(forks) if forks is not None else 0,
+        _stars_today(star_today),
+    )
+
+
+def iter_lxml(html: str, limit: Optional[int] = MAX_REPOS) -> Iterator[TrendingRepo]:
+    """
+    Fast path: libxml2 parses the page incrementally in C and XPath does the
+    per-article lookups. Parsing stops as soon as `limit` articles were read.
+    """
+    if not HAS_LXML:
+        raise RuntimeError("The lxml parser backend requires the 'lxml' package")
+    import lxml.etree
+
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    source = io.BytesIO(html.encode("utf-8"))
+    for _, element in lxml.etree.iterparse(source, events=("end",), tag="article", html=True,
+                                           encoding="utf-8", recover=True):
+        if not element.xpath(f"boolean(self::*[{_XP_IS_ARTICLE}])"):
+            continue
+        yield _parse_lxml_article(element)
+        element.clear()
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def parse_full(html: str, limit: Optional[int] = MAX_REPOS) -> List[TrendingRepo]:
+    return list(iter_full(html, limit))
+
+
+def parse_strained(html: str, limit: Optional[int] = MAX_REPOS) -> List[TrendingRepo]:
+    return list(iter_strained(html, limit))
+
+
+def parse_lxml(html: str, limit: Optional[int] = MAX_REPOS) -> List[TrendingRepo]:
+    return list(iter_lxml(html, limit))
+
+
+Parser = Callable[[str, Optional[int]], Iterator[TrendingRepo]]
+
+PARSERS: Dict[str, Parser] = {
+    "full": iter_full,
+    "strainer": iter_strained,
+}
+if HAS_LXML:
+    PARSERS["lxml"] = iter_lxml
+
+
+def register_parser(name: str, parser: Parser) -> None:
+    PARSERS[name] = parser
+
+
+def default_backend() -> str:
+    return "lxml" if "lxml" in PARSERS else "strainer"
+
+
+def get_parser(name: Optional[str] = None) -> Parser:
+    backend = name or default_backend()
+    try:
+        return PARSERS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown parser backend: {backend}")
@@ -0,0 +1,250 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+import aiohttp
+from src.utils.metrics import metrics
+
+T = TypeVar("T")
+
+# Retry and circuit-breaker settings shared by every resilient outbound call.
+RESILIENCE_CONFIG = {
+    "max_retries": 3,
+    "base_delay": 0.5,
+    # Longest a caller waits between attempts; a longer Retry-After gives up at once.
+    "max_delay": 10.0,
+    "failure_threshold": 5,
+    "reset_timeout": 60.0,
+}
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryableHTTPError(Exception):
+    """
+    A 429 or 5xx response, optionally carrying the server's Retry-After in seconds.
+    """
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}" + (f" (retry after {retry_after:g}s)" if retry_after is not None else ""))
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a host whose circuit breaker is open.
+    """
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} is unavailable, retrying in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def configure_resilience(**options) -> None:
+    """
+    Override the retry/breaker settings. Breakers created before the call keep
+    their thresholds.
+    """
+    unknown = set(options) - set(RESILIENCE_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown resilience options: {', '.join(sorted(unknown))}")
+    RESILIENCE_CONFIG.update(options)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or an HTTP date).
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def check_response(status: int, headers) -> None:
+    """
+    Raise `RetryableHTTPError` for a 429/5xx response.
+    """
+    if status in RETRYABLE_STATUSES:
+        raise RetryableHTTPError(status, parse_retry_after(headers.get("Retry-After")))
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Delay before retry number `attempt` (0-based): exponential backoff with full
+    jitter, but never shorter than what the server asked for.
+    """
+    ceiling = min(RESILIENCE_CONFIG["max_delay"], RESILIENCE_CONFIG["base_delay"] * 2 ** attempt)
+    delay = random.uniform(0, ceiling)
+    return max(delay, retry_after) if retry_after is not None else delay
+
+
+class CircuitBreaker:
+    """
+    Stops calling a host after `failure_threshold` consecutive failures.
+
+    While open, calls fail fast with `CircuitOpenError` for `reset_timeout`
+    seconds (or as long as a Retry-After asked, if longer). Then one probe call
+    is let through (half-open): success closes the breaker, failure opens it
+    again.
+    """
+
+    def __init__(self, host: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.host = host
+        self.failure_threshold = failure_threshold or RESILIENCE_CONFIG["failure_threshold"]
+        self.reset_timeout = reset_timeout if reset_timeout is not None else RESILIENCE_CONFIG["reset_timeout"]
+        self.failures = 0
+        self.opened_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return "closed"
+        return "open" if time.monotonic() < self.opened_until else "half_open"
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_until - time.monotonic())
+
+    def before_call(self) -> None:
+        """
+        Raise `CircuitOpenError` unless a call may go through now.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return
+        raise CircuitOpenError(self.host, self.retry_in())
+
+    def release_probe(self) -> None:
+        """
+        Give up a half-open probe that ended without an outcome (e.g. it was
+        cancelled), so the next call may probe instead.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.failure_threshold or retry_after and retry_after > RESILIENCE_CONFIG["max_delay"]:
+                self.failures = max(self.failures, self.failure_threshold)
+                self.opened_until = time.monotonic() + max(self.reset_timeout, retry_after or 0.0)
+                metrics.inc("trending_breaker_open_total", host=self.host)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(url_or_host: str) -> CircuitBreaker:
+    """
+    The process-wide breaker for a host (a URL is reduced to its host).
+    """
+    host = urlparse(url_or_host).netloc or url_or_host
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers.setdefault(host, CircuitBreaker(host))
+    return breaker
+
+
+def reset_breakers() -> None:
+    _breakers.clear()
+
+
+def _is_host_failure(error: Exception) -> bool:
+    # A 4xx other than 429 (or a bad body) means the host answered; the request was wrong.
+    if isinstance(error, aiohttp.ClientResponseError) and error.status not in RETRYABLE_STATUSES:
+        return False
+    return isinstance(error, (RetryableHTTPError, aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def _next_delay(attempt: int, error: Exception, breaker: CircuitBreaker) -> Optional[float]:
+    retry_after = getattr(error, "retry_after", None)
+    breaker.record_failure(retry_after)
+    if attempt >= RESILIENCE_CONFIG["max_retries"] or breaker.state != "closed":
+        return None
+    if retry_after is not None and retry_after > RESILIENCE_CONFIG["max_delay"]:
+        return None
+    return backoff_delay(attempt, retry_after)
+
+
+async def call_with_retries(url: str, func: Callable[[], Awaitable[T]]) -> T:
+    """
+    Await `func()` through `url`'s host breaker, retrying network errors and
+    `RetryableHTTPError`s with backoff. Other exceptions propagate at once.
+    """
+    breaker = get_breaker(url)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = await func()
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                # Cancelled or interrupted: no verdict on the host.
+                breaker.release_probe()
+                raise
+            if not _is_host_failure(e):
+                breaker.record_success()
+                raise
+            delay = _next_delay(attempt, e, breaker)
+            if delay is None:
+                raise
+            status = getattr(e, "status", None) or "network"
+        else:
+            breaker.record_success()
+            return result
+        attempt += 1
+        metrics.inc("trending_retries_total", target=breaker.host, status=status)
+        await asyncio.sleep(delay)
+
+
+def call_with_retries_sync(url: str, func: Callable[[], T], retryable=()) -> T:
+    """
+    Blocking counterpart of `call_with_retries`; `retryable` adds exception
+    types (e.g. `requests.ConnectionError`) that count as host failures.
+    """
+    breaker = get_breaker(url)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = func()
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                breaker.release_probe()
+                raise
+            if not _is_host_failure(e) and not isinstance(e, retryable):
+                breaker.record_success()
+                raise
+            delay = _next_delay(attempt, e, breaker)
+            if delay is None:
+                raise
+            status = getattr(e, "status", None) or "network"
+        else:
+            breaker.record_success()
+            return result
+        attempt += 1
+        metrics.inc("trending_retries_total", target=breaker.host, status=status)
+        time.sleep(delay)
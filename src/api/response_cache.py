@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from src.api.models import TrendingRepo
+from src.utils.logger import log_event
+
+# How long a parsed trending page is served without asking GitHub again.
+DEFAULT_TTLS = {
+    "daily": 10 * 60,
+    "weekly": 60 * 60,
+    "monthly": 3 * 60 * 60,
+}
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+# Directory of the on-disk tier, so cached pages and ETags survive a restart (memory only when unset).
+DEFAULT_DISK_DIR = os.getenv("TRENDING_CACHE_DIR") or None
+
+CacheKey = Tuple[str, str]
+
+
+class CacheEntry:
+    __slots__ = ("repos", "complete", "etag", "last_modified", "fetched_at", "size")
+
+    def __init__(self, repos: List[Dict], etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, fetched_at: Optional[float] = None,
+                 complete: bool = True):
+        self.repos = repos
+        # False when parsing stopped at a limit, i.e. the page has more repos than cached.
+        self.complete = complete
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.size = len(json.dumps(self.serialized_repos()))
+
+    def serialized_repos(self) -> List[Dict]:
+        return [repo.to_dict() if isinstance(repo, TrendingRepo) else repo for repo in self.repos]
+
+    def to_dict(self) -> Dict:
+        return {
+            "repos": self.serialized_repos(),
+            "records": all(isinstance(repo, TrendingRepo) for repo in self.repos),
+            "complete": self.complete,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+        }
+
+    def covers(self, limit: Optional[int]) -> bool:
+        return self.complete or (limit is not None and len(self.repos) >= limit)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class TrendingCache:
+    """
+    LRU cache of parsed trending pages keyed by (language, since).
+
+    Entries stay fresh for the TTL of their period; after that they are kept
+    around so the next request can revalidate them with ETag/If-Modified-Since.
+    The in-memory tier is bounded by the serialized size of its entries; the
+    optional disk tier lets cached pages survive a restart. The `*_async`
+    methods read and write the disk tier off the event loop.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 disk_dir: Optional[str] = None):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.stale_hits = 0
+
+    @staticmethod
+    def make_key(language: Optional[str], since: str) -> CacheKey:
+        return ((language or "").lower(), since)
+
+    def _disk_path(self, key: CacheKey) -> str:
+        language, since = key
+        safe_language = "".join(c if c.isalnum() or c in "-_" else f"%{ord(c):02x}" for c in language)
+        return os.path.join(self.disk_dir, f"{since}-{safe_language or 'all_languages'}.json")
+
+    def _load_from_disk(self, key: CacheKey) -> Optional[CacheEntry]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                payload = json.load(f)
+            repos = payload["repos"]
+            if payload.get("records"):
+                repos = [TrendingRepo.from_dict(repo) for repo in repos]
+            return CacheEntry(repos, payload.get("etag"), payload.get("last_modified"),
+                              payload.get("fetched_at"), payload.get("complete", True))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_to_disk(self, key: CacheKey, entry: CacheEntry) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(entry.to_dict(), f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            log_event("cache_write_failed", logging.WARNING, path=path, error=str(e))
+
+    def _store(self, key: CacheKey, entry: CacheEntry) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def _get_from_memory(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """
+        Return the entry for `key` (fresh or not), promoting it in the LRU order.
+        """
+        entry = self._get_from_memory(key)
+        if entry is not None:
+            return entry
+        entry = self._load_from_disk(key)
+        if entry is not None:
+            self._store(key, entry)
+        return entry
+
+    async def get_async(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self._get_from_memory(key)
+        if entry is not None or not self.disk_dir:
+            return entry
+        entry = await asyncio.to_thread(self._load_from_disk, key)
+        # A fetch may have stored a newer entry while the file was being read.
+        current = self._get_from_memory(key)
+        if current is not None:
+            return current
+        if entry is not None:
+            self._store(key, entry)
+        return entry
+
+    def is_fresh(self, key: CacheKey, entry: CacheEntry) -> bool:
+        ttl = self.ttls.get(key[1], 0)
+        return time.time() - entry.fetched_at < ttl
+
+    def lookup(self, key: CacheKey, limit: Optional[int] = None) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Return `(entry, fresh)` and count a hit when the entry can be served as is,
+        i.e. it is within its TTL and holds at least `limit` repos (all when None).
+        An entry that does not cover `limit` is not returned.
+        """
+        return self._counted(key, self.get(key), limit)
+
+    async def lookup_async(self, key: CacheKey, limit: Optional[int] = None) -> Tuple[Optional[CacheEntry], bool]:
+        return self._counted(key, await self.get_async(key), limit)
+
+    def _counted(self, key: CacheKey, entry: Optional[CacheEntry],
+                 limit: Optional[int]) -> Tuple[Optional[CacheEntry], bool]:
+        if entry is not None and not entry.covers(limit):
+            entry = None
+        fresh = entry is not None and self.is_fresh(key, entry)
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry, fresh
+
+    def put(self, key: CacheKey, repos: List[Dict], etag: Optional[str] = None,
+            last_modified: Optional[str] = None, complete: bool = True) -> CacheEntry:
+        entry = CacheEntry(repos, etag, last_modified, complete=complete)
+        self._store(key, entry)
+        self._save_to_disk(key, entry)
+        return entry
+
+    async def put_async(self, key: CacheKey, repos: List[Dict], etag: Optional[str] = None,
+                        last_modified: Optional[str] = None, complete: bool = True) -> CacheEntry:
+        entry = CacheEntry(repos, etag, last_modified, complete=complete)
+        self._store(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._save_to_disk, key, entry)
+        return entry
+
+    def revalidated(self, key: CacheKey, entry: CacheEntry) -> None:
+        """
+        Record a 304 Not Modified: the cached result is fresh again.
+        """
+        self.revalidations += 1
+        entry.fetched_at = time.time()
+        self._save_to_disk(key, entry)
+
+    async def revalidated_async(self, key: CacheKey, entry: CacheEntry) -> None:
+        self.revalidations += 1
+        entry.fetched_at = time.time()
+        if self.disk_dir:
+            await asyncio.to_thread(self._save_to_disk, key, entry)
+
+    def served_stale(self) -> None:
+        """
+        Record that an expired entry was served because GitHub could not be reached.
+        """
+        self.stale_hits += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
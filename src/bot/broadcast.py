@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import sqlite3
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from src.bot.render import render_changes
+from src.bot.subscriptions import SubscriptionRegistry, Topic
+from src.services.diff import diff_with_last_broadcast, record_broadcast
+from src.utils.logger import log_event
+
+
+async def send_update(send: Callable[[str], Awaitable], period: str, language: Optional[str], data: Sequence,
+                      render_full: Callable[[str, Optional[str], Sequence], str], changes_only: bool = False) -> bool:
+    """
+    Send one topic's update through `send(message)`: the full list from
+    `render_full`, or with `changes_only` just what changed since the topic was
+    last sent. Records what was sent. Returns False when there were no changes
+    and nothing was sent.
+    """
+    diff = await diff_with_last_broadcast(period, language, data) if changes_only and data else None
+    if diff is None:
+        await send(render_full(period, language, data))
+    elif diff.is_empty:
+        return False
+    else:
+        await send(render_changes(period, language, diff))
+    if data:
+        await record_broadcast(period, language, data)
+    return True
+
+
+async def broadcast_trending(bot, registry: SubscriptionRegistry, period: Optional[str] = None,
+                             language: Optional[str] = None, concurrency: int = 4,
+                             changes_only: Optional[bool] = None) -> Dict:
+    """
+    Send trending updates to every subscriber.
+
+    `period` and `language` narrow the broadcast to matching subscriptions.
+    Subscribers are grouped by (period, language): each distinct topic is
+    fetched once (through the bot's single-flight fetch) and rendered once, and
+    the message is fanned out concurrently through the bot's outbound queue.
+    When nobody has subscribed yet, the bot's default chat receives the
+    all-languages list so the one-chat setup keeps working.
+
+    Chats in "changes" mode (see `SubscriptionRegistry.subscribe`) get only
+    what changed since the topic was last broadcast, or since the previous
+    stored snapshot before its first broadcast, and nothing at all when nothing
+    changed (counted as `skipped`). The changes message is rendered once per
+    topic. `changes_only` overrides every chat's mode when given.
+    """
+    topics = registry.subscribers(period, language)
+    if not topics and bot.chat_id and not language:
+        for default_period in ([period] if period else ["daily"]):
+            topics[(default_period, "")] = [(bot.chat_id, getattr(bot, "notify_mode", "full"))]
+    if changes_only is not None:
+        mode = "changes" if changes_only else "full"
+        topics = {topic: [(chat_id, mode) for chat_id, _ in chats] for topic, chats in topics.items()}
+
+    semaphore = asyncio.Semaphore(concurrency)
+    report = {"topics": len(topics), "sent": 0, "skipped": 0, "failures": []}
+
+    async def deliver(topic: Topic, chats: List[Tuple[str, str]]) -> None:
+        topic_period, language = topic
+        chat_ids = [chat_id for chat_id, _ in chats]
+        async with semaphore:
+            try:
+                data = await bot.fetch_repos(topic_period, language or None)
+                diff = None
+                if data and any(mode == "changes" for _, mode in chats):
+                    diff = await diff_with_last_broadcast(topic_period, language, data)
+            except Exception as e:
+                report["failures"].extend((chat_id, topic, str(e)) for chat_id in chat_ids)
+                return
+
+        full_message = bot.render_trending(topic_period, language or None, data)
+        changes_message = render_changes(topic_period, language or None, diff) if diff is not None and not diff.is_empty \
+            else None
+        messages = {}
+        for chat_id, mode in chats:
+            if mode != "changes" or diff is None:
+                # Full mode, or nothing stored yet to compare with.
+                messages[chat_id] = full_message
+            elif changes_message is not None:
+                messages[chat_id] = changes_message
+            else:
+                report["skipped"] += 1
+
+        results = await asyncio.gather(
+            *(bot.send_message(message, chat_id=chat_id) for chat_id, message in messages.items()),
+            return_exceptions=True)
+        for chat_id, result in zip(messages, results):
+            if isinstance(result, Exception):
+                report["failures"].append((chat_id, topic, str(result)))
+            else:
+                report["sent"] += 1
+        if data and len(results) > sum(isinstance(result, Exception) for result in results):
+            # The next changes-only update is relative to what subscribers have now seen.
+            try:
+                await record_broadcast(topic_period, language, data)
+            except (sqlite3.Error, OSError) as e:
+                log_event("broadcast_record_failed", logging.ERROR, period=topic_period, language=language,
+                          error=str(e))
+
+    await asyncio.gather(*(deliver(topic, chats) for topic, chats in topics.items()))
+    return report
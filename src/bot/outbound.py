@@ -0,0 +1,187 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import aiohttp
+from src.api.http_client import get_session, HostRateLimiter
+from src.utils.metrics import metrics
+
+TELEGRAM_API = "https://api.telegram.org"
+MAX_MESSAGE_LENGTH = 4096
+
+# Telegram allows roughly 30 messages per second overall and one per second per chat.
+GLOBAL_RATE = 30
+PER_CHAT_RATE = 1
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split `text` into chunks of at most `limit` characters, preferring line breaks.
+    """
+    if len(text) <= limit:
+        return [text]
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TelegramOutbox:
+    """
+    Async outbound queue for Telegram `sendMessage` calls.
+
+    Each chat has its own queue, drained in order by one task while it has
+    messages, so a burst to one chat waits on that chat's rate limit without
+    holding up the others. Sends share the pooled HTTP session, the global rate
+    limit and at most `workers` requests in flight. A 429 is retried after the
+    `retry_after` Telegram asks for; network errors and 5xx responses are
+    retried with exponential backoff. Over-long messages are split, and the
+    parts of one message are always delivered in order.
+    """
+
+    def __init__(self, token: str, api_base: str = TELEGRAM_API, workers: int = 4,
+                 global_rate: Optional[float] = GLOBAL_RATE, per_chat_rate: Optional[float] = PER_CHAT_RATE,
+                 max_retries: int = 3, backoff: float = 0.5):
+        self.url = f"{api_base}/bot{token}/sendMessage"
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._global_limiter = HostRateLimiter(global_rate)
+        self._chat_limiter = HostRateLimiter(per_chat_rate)
+        self._chats: Dict[str, Deque[Tuple]] = {}
+        self._drainers: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.latencies: Deque[float] = deque(maxlen=1000)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(pending) for pending in self._chats.values())
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or a new event loop (e.g. a second asyncio.run in a one-shot script).
+        self._loop = loop
+        self._chats = {}
+        self._drainers = {}
+        self._slots = asyncio.Semaphore(self.workers)
+
+    def send_nowait(self, chat_id, text: str, parse_mode: Optional[str] = None) -> asyncio.Future:
+        """
+        Queue a message and return a future resolving to Telegram's responses.
+        `parse_mode` ("MarkdownV2" or "HTML") is sent with every part.
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        chat_id = str(chat_id)
+        self._chats.setdefault(chat_id, deque()).append((split_message(text), parse_mode, future, time.perf_counter()))
+        if chat_id not in self._drainers:
+            self._drainers[chat_id] = self._loop.create_task(self._drain(chat_id))
+        return future
+
+    async def send(self, chat_id, text: str, parse_mode: Optional[str] = None) -> List[Dict]:
+        """
+        Queue a message and wait until every part of it has been delivered.
+        """
+        return await self.send_nowait(chat_id, text, parse_mode)
+
+    async def join(self) -> None:
+        """
+        Wait until everything queued so far has been processed.
+        """
+        while self._drainers:
+            await asyncio.gather(*self._drainers.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.join()
+
+    async def _drain(self, chat_id: str) -> None:
+        pending = self._chats[chat_id]
+        try:
+            while pending:
+                parts, parse_mode, future, enqueued_at = pending.popleft()
+                try:
+                    with metrics.span("send"):
+                        responses = [await self._deliver(chat_id, part, parse_mode) for part in parts]
+                    self.sent += 1
+                    self.latencies.append(time.perf_counter() - enqueued_at)
+                    if not future.done():
+                        future.set_result(responses)
+                except Exception as e:
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+        finally:
+            # Cancelled (e.g. the loop is shutting down): nothing else will send what is left.
+            for _, _, future, _ in pending:
+                future.cancel()
+            del self._chats[chat_id]
+            del self._drainers[chat_id]
+
+    async def _deliver(self, chat_id: str, text: str, parse_mode: Optional[str] = None) -> Dict:
+        attempt = 0
+        while True:
+            # The chat's own pace first, so waiting on it does not hold a global slot.
+            await self._chat_limiter.acquire(chat_id)
+            await self._global_limiter.acquire("global")
+            async with self._slots:
+                try:
+                    session = await get_session()
+                    payload = {"chat_id": chat_id, "text": text}
+                    if parse_mode:
+                        payload["parse_mode"] = parse_mode
+                    async with session.post(self.url, json=payload) as response:
+                        status = response.status
+                        try:
+                            payload = await response.json(content_type=None)
+                        except ValueError:
+                            payload = None
+                    if not isinstance(payload, dict):
+                        payload = {"description": "unexpected response body"}
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    status, payload = None, {"description": str(e)}
+
+            if status == 200:
+                return payload
+            if attempt >= self.max_retries or (status is not None and 400 <= status < 500 and status != 429):
+                raise RuntimeError(f"Failed to send message to {chat_id}: {status} {payload.get('description')}")
+
+            attempt += 1
+            self.retries += 1
+            metrics.inc("trending_retries_total", target="telegram", status=status or "network")
+            if status == 429:
+                delay = payload.get("parameters", {}).get("retry_after", 1)
+            else:
+                delay = self.backoff * 2 ** (attempt - 1)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        return {
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
@@ -0,0 +1,227 @@
+import html
+import os
+import re
+from urllib.parse import unquote
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.api.models import TrendingRepo, full_name_from_url
+from src.api.parsers import MAX_REPOS
+
+DEFAULT_FORMAT = os.getenv("TRENDING_MESSAGE_FORMAT", "plain")
+DEFAULT_MAX_ENTRIES = 512
+MAX_TOPICS = 3
+
+_MARKDOWN_V2_SPECIAL = re.compile(r"([_*\[\]()~`>#+\-=|{}.!\\])")
+_MARKDOWN_V2_URL_SPECIAL = re.compile(r"([)\\])")
+
+
+class MessageFormat:
+    """
+    How one Telegram parse mode escapes text, emphasises the header and
+    writes a link; every message is built from these three pieces.
+    """
+    __slots__ = ("name", "parse_mode", "escape", "bold", "link")
+
+    def __init__(self, name, parse_mode, escape, bold, link):
+        self.name = name
+        self.parse_mode = parse_mode
+        self.escape = escape
+        self.bold = bold
+        self.link = link
+
+
+def _markdown_v2_escape(text: str) -> str:
+    return _MARKDOWN_V2_SPECIAL.sub(r"\\\1", text)
+
+
+def _markdown_v2_link(url: str) -> str:
+    target = _MARKDOWN_V2_URL_SPECIAL.sub(r"\\\1", url)
+    return f"[{_markdown_v2_escape(url)}]({target})"
+
+
+def _html_link(url: str) -> str:
+    return f'<a href="{html.escape(url)}">{html.escape(url, quote=False)}</a>'
+
+
+FORMATS: Dict[str, MessageFormat] = {
+    "plain": MessageFormat("plain", None, str, str, str),
+    "markdown_v2": MessageFormat("markdown_v2", "MarkdownV2", _markdown_v2_escape, lambda text: f"*{text}*",
+                                 _markdown_v2_link),
+    "html": MessageFormat("html", "HTML", lambda text: html.escape(text, quote=False), lambda text: f"<b>{text}</b>",
+                          _html_link),
+}
+
+
+def get_format(name: Optional[str] = None) -> MessageFormat:
+    try:
+        return FORMATS[name or DEFAULT_FORMAT]
+    except KeyError:
+        raise ValueError(f"Unknown message format: {name}")
+
+
+def topic_label(language) -> str:
+    # Canonical languages are URL names, e.g. "c%2B%2B" for C++.
+    return unquote(language) if language else 'all languages'
+
+
+def _full_name(repo) -> str:
+    if type(repo) is TrendingRepo:
+        return repo.full_name
+    return repo.get("full_name") or full_name_from_url(repo["url"])
+
+
+def _details(fields: Optional[Dict]) -> str:
+    # " [MIT; cli, python; pushed 2026-10-01; 12 open issues]" from enrichment metadata.
+    if not fields:
+        return ""
+    parts = []
+    if fields.get("license"):
+        parts.append(fields["license"])
+    if fields.get("topics"):
+        parts.append(", ".join(fields["topics"][:MAX_TOPICS]))
+    if fields.get("pushed_at"):
+        parts.append(f"pushed {fields['pushed_at'][:10]}")
+    if fields.get("open_issues") is not None:
+        parts.append(f"{fields['open_issues']} open issues")
+    return f" [{'; '.join(parts)}]" if parts else ""
+
+
+def render_trending(period: str, language, data, limit=MAX_REPOS, fmt: Optional[str] = None,
+                    metadata: Optional[Dict[str, Dict]] = None) -> str:
+    """
+    Build the trending-list message (the reply to a command and the scheduled
+    update alike). Kept free of telegram imports so one-shot sends load quickly.
+
+    `metadata` maps full names to enrichment fields, shown after each repository
+    that has some.
+    """
+    f = get_format(fmt)
+    if not data:
+        return f.escape(f"No {period} trending repositories found for {topic_label(language)}.")
+    header = f.bold(f.escape(f"{period.capitalize()} GitHub Trending for {topic_label(language)}:"))
+    if metadata:
+        lines = (f.escape(f"{repo['author']} - ") + f.link(repo['url'])
+                 + f.escape(f" (Stars: {repo['stars']})" + _details(metadata.get(_full_name(repo))))
+                 for repo in islice(data, limit))
+    elif f.parse_mode is None:
+        # Nothing to escape: skip the per-piece calls, and read records' slots directly.
+        lines = (f"{repo.author} - {repo.url} (Stars: {repo.stars})" if type(repo) is TrendingRepo
+                 else f"{repo['author']} - {repo['url']} (Stars: {repo['stars']})" for repo in islice(data, limit))
+    else:
+        lines = (f.escape(f"{repo['author']} - ") + f.link(repo['url']) + f.escape(f" (Stars: {repo['stars']})")
+                 for repo in islice(data, limit))
+    return header + "\n" + "\n".join(lines)
+
+
+def render_changes(period: str, language, diff, fmt: Optional[str] = None) -> str:
+    """
+    Build the changes-only message for a non-empty `SnapshotDiff`.
+    """
+    f = get_format(fmt)
+    lines = [f.bold(f.escape(f"{period.capitalize()} GitHub Trending changes for {topic_label(language)}:"))]
+    for entry in diff.entered:
+        repo = entry["repo"]
+        lines.append(f.escape(f"New #{entry['rank']}: {repo['author']} - ") + f.link(repo["url"])
+                     + f.escape(f" (Stars: {repo['stars']})"))
+    for entry in diff.moved:
+        arrow = "up" if entry["rank"] < entry["old_rank"] else "down"
+        lines.append(f.escape(f"{arrow.capitalize()} #{entry['old_rank']} -> #{entry['rank']}: ")
+                     + f.link(entry["repo"]["url"]))
+    for entry in diff.star_jumps:
+        lines.append(f.escape(f"+{entry['delta']} stars: ") + f.link(entry["repo"]["url"])
+                     + f.escape(f" (Stars: {entry['stars']})"))
+    for entry in diff.dropped:
+        lines.append(f.escape(f"Dropped (was #{entry['rank']}): ") + f.link(entry["repo"]["url"]))
+    return "\n".join(lines)
+
+
+RenderKey = Tuple[str, str, str, str]
+
+
+def _line_ends(text: str) -> List[int]:
+    # Where the message ends after the header and each repository line.
+    ends = []
+    position = text.find("\n")
+    while position != -1:
+        ends.append(position)
+        position = text.find("\n", position + 1)
+    ends.append(len(text))
+    return ends
+
+
+class RenderCache:
+    """
+    LRU cache of rendered trending messages keyed by
+    (period, language, date, format).
+
+    Each entry is the whole list as rendered, and remembers the records it was
+    rendered from. Records are immutable and shared through the response cache,
+    so a hot command compares a handful of identical objects and cuts the stored
+    string at its `limit`-th line without any formatting work; a changed list
+    re-renders and replaces the entry.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[RenderKey, Tuple[tuple, str, List[int]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(period: str, language, date: Optional[str], fmt: Optional[str]) -> RenderKey:
+        return (period, language or "", date or datetime.now().strftime('%Y%m%d'), fmt or DEFAULT_FORMAT)
+
+    def render(self, period: str, language, data: Iterable, limit=MAX_REPOS, fmt: Optional[str] = None,
+               date: Optional[str] = None, metadata: Optional[Dict[str, Dict]] = None) -> str:
+        key = self.make_key(period, language, date, fmt)
+        repos = tuple(data or ())
+        # Newly arrived metadata changes the message, so it is part of what the entry was rendered from.
+        source = (repos, tuple(metadata.get(_full_name(repo)) for repo in repos) if metadata else None)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == source:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            text = render_trending(period, language, repos, None, fmt, metadata)
+            entry = (source, text, _line_ends(text) if repos else [len(text)])
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        _, text, ends = entry
+        if limit is None or limit + 1 >= len(ends):
+            return text
+        return text[:ends[limit]]
+
+    def prerender(self, period: str, language, data: Iterable, date: Optional[str] = None,
+                  formats: Optional[Iterable[str]] = None, metadata: Optional[Dict[str, Dict]] = None) -> None:
+        """
+        Render a freshly produced snapshot up front, in the configured format
+        unless `formats` says otherwise.
+        """
+        data = list(data)
+        for fmt in formats or (DEFAULT_FORMAT,):
+            self.render(period, language, data, None, fmt, date, metadata)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._entries)}
+
+
+_render_cache = RenderCache()
+
+
+def get_render_cache() -> RenderCache:
+    return _render_cache
+
+
+def set_render_cache(cache: RenderCache) -> None:
+    global _render_cache
+    _render_cache = cache
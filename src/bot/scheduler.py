@@ -0,0 +1,90 @@
+import logging
+import os
+from typing import Dict, List, Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.triggers.cron import CronTrigger
+from src.utils.logger import log_event
+
+# Same times (UTC) as the former GitHub Actions cron jobs. `language` narrows a
+# job to one language's subscribers; None sends every subscribed topic of the period.
+DEFAULT_SCHEDULES: List[Dict] = [
+    {"period": "daily", "language": None, "cron": {"hour": 14, "minute": 0}},
+    {"period": "weekly", "language": None, "cron": {"day_of_week": "mon", "hour": 10, "minute": 30}},
+    {"period": "monthly", "language": None, "cron": {"day": 1, "hour": 5, "minute": 0}},
+]
+JOBSTORE_URL = os.getenv("SCHEDULER_DB_URL", "sqlite:///" + os.path.join("repos", "scheduler.db"))
+DEFAULT_JITTER = 120
+DEFAULT_MISFIRE_GRACE = 6 * 60 * 60
+
+# Persisted jobs reference their target by import path, so the live bot is looked up here at run time.
+_bot = None
+
+
+async def run_scheduled_broadcast(period: str, language: Optional[str] = None):
+    """
+    Job target: broadcast one period (optionally one language) to its subscribers.
+    """
+    if _bot is None:
+        log_event("broadcast_skipped", logging.ERROR, period=period, language=language or "", reason="no bot registered")
+        return None
+    report = await _bot.broadcast(period, language)
+    log_event("broadcast_finished", period=period, language=language or "", sent=report["sent"],
+              skipped=report["skipped"], failed=len(report["failures"]))
+    return report
+
+
+def job_id(schedule: Dict) -> str:
+    return f"trending:{schedule['period']}:{schedule.get('language') or '*'}"
+
+
+def build_trigger(schedule: Dict, jitter: Optional[int] = DEFAULT_JITTER) -> CronTrigger:
+    return CronTrigger(timezone="UTC", jitter=jitter, **schedule["cron"])
+
+
+def start_scheduler(bot, schedules: List[Dict] = DEFAULT_SCHEDULES, jobstore_url: str = JOBSTORE_URL,
+                    jitter: Optional[int] = DEFAULT_JITTER,
+                    misfire_grace_time: int = DEFAULT_MISFIRE_GRACE) -> AsyncIOScheduler:
+    """
+    Start the in-process scheduler for the bot's trending broadcasts.
+
+    Jobs live in a persistent job store. Jobs that already exist keep their
+    stored next run time, so runs missed while the process was down are caught
+    up on start (coalesced into one run, within `misfire_grace_time`). Only a
+    changed schedule is rescheduled, and jobs no longer configured are removed.
+    Each run gets up to `jitter` seconds of random delay so jobs don't all hit
+    GitHub at the same second. Must be called from inside the running event loop.
+    """
+    global _bot
+    _bot = bot
+
+    directory = os.path.dirname(jobstore_url.replace("sqlite:///", "", 1)) if jobstore_url.startswith("sqlite:///") else ""
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    scheduler = AsyncIOScheduler(
+        jobstores={"default": SQLAlchemyJobStore(url=jobstore_url)},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": misfire_grace_time},
+        timezone="UTC",
+    )
+    # Start paused so stored jobs can be reconciled before any of them fire.
+    scheduler.start(paused=True)
+
+    wanted = {job_id(schedule): schedule for schedule in schedules}
+    for job in scheduler.get_jobs():
+        if job.id.startswith("trending:") and job.id not in wanted:
+            job.remove()
+
+    for identifier, schedule in wanted.items():
+        trigger = build_trigger(schedule, jitter)
+        args = [schedule["period"], schedule.get("language")]
+        existing = scheduler.get_job(identifier)
+        if existing is None:
+            scheduler.add_job(run_scheduled_broadcast, trigger, args=args, id=identifier,
+                              name=f"{schedule['period']} trending")
+        elif str(existing.trigger) != str(trigger) or existing.trigger.jitter != jitter or list(existing.args) != args:
+            existing.modify(args=args)
+            existing.reschedule(trigger)
+
+    scheduler.resume()
+    return scheduler
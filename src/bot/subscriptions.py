@@ -0,0 +1,93 @@
+from typing import Dict, List, Optional, Tuple
+from src.storage.sqlite_store import SnapshotStore, get_snapshot_store
+
+PERIODS = ("daily", "weekly", "monthly")
+# "full" sends the whole list every run; "changes" only sends what changed since the previous snapshot.
+MODES = ("full", "changes")
+
+Topic = Tuple[str, str]
+
+
+class SubscriptionRegistry:
+    """
+    Per-chat (period, language) subscriptions, kept in the snapshot database.
+    An empty language means "all languages"; any other is kept exactly as
+    given, so callers pass the canonical name snapshots are stored under (see
+    `validator.resolve_language`). Each subscription has a notification mode
+    (see `MODES`).
+    """
+
+    def __init__(self, store: Optional[SnapshotStore] = None):
+        self.store = store
+
+    def _store(self) -> SnapshotStore:
+        return self.store or get_snapshot_store()
+
+    def subscribe(self, chat_id, period: str, language: Optional[str] = "", mode: str = "full") -> bool:
+        """
+        Subscribe a chat to a topic, or change the mode of an existing
+        subscription. Returns False if it was already subscribed.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Invalid Period: {period}")
+        if mode not in MODES:
+            raise ValueError(f"Invalid Mode: {mode}")
+        params = (str(chat_id), period, language or "")
+        if self._store().execute(
+            "INSERT OR IGNORE INTO subscriptions (chat_id, period, language, mode) VALUES (?, ?, ?, ?)",
+            params + (mode,),
+        ) > 0:
+            return True
+        self._store().execute(
+            "UPDATE subscriptions SET mode = ? WHERE chat_id = ? AND period = ? AND language = ?", (mode,) + params)
+        return False
+
+    def unsubscribe(self, chat_id, period: Optional[str] = None, language: Optional[str] = None) -> int:
+        """
+        Remove a chat's subscriptions, optionally only for one period and/or language.
+        Returns how many were removed.
+        """
+        sql = "DELETE FROM subscriptions WHERE chat_id = ?"
+        params = [str(chat_id)]
+        if period is not None:
+            sql += " AND period = ?"
+            params.append(period)
+        if language is not None:
+            sql += " AND language = ?"
+            params.append(language)
+        return self._store().execute(sql, params)
+
+    def for_chat(self, chat_id) -> List[Topic]:
+        rows = self._store().query(
+            "SELECT period, language FROM subscriptions WHERE chat_id = ? ORDER BY period, language",
+            (str(chat_id),),
+        )
+        return [(row["period"], row["language"]) for row in rows]
+
+    def subscribers(self, period: Optional[str] = None,
+                    language: Optional[str] = None) -> Dict[Topic, List[Tuple[str, str]]]:
+        """
+        Group (chat_id, mode) pairs by (period, language), optionally for one
+        period and/or language only.
+        """
+        clauses, params = [], []
+        if period is not None:
+            clauses.append("period = ?")
+            params.append(period)
+        if language is not None:
+            clauses.append("language = ?")
+            params.append(language)
+        sql = "SELECT chat_id, period, language, mode FROM subscriptions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        grouped: Dict[Topic, List[Tuple[str, str]]] = {}
+        for row in self._store().query(sql + " ORDER BY period, language, chat_id", params):
+            grouped.setdefault((row["period"], row["language"]), []).append((row["chat_id"], row["mode"]))
+        return grouped
+
+    def topics(self, period: Optional[str] = None, language: Optional[str] = None) -> Dict[Topic, List[str]]:
+        """
+        Group subscribers by (period, language), optionally for one period and/or language only.
+        """
+        return {topic: [chat_id for chat_id, _ in chats]
+                for topic, chats in self.subscribers(period, language).items()}
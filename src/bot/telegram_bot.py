@@ -1,38 +1,160 @@
-from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
-from src.services.fetch_service import fetch_and_save_repos
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import Application, CommandHandler, ContextTypes, InlineQueryHandler
+from src.services.fetch_service import fetch_and_save_repos, known_metadata
+from src.services.single_flight import SingleFlight
+from src.bot.outbound import TelegramOutbox
+from src.bot.subscriptions import MODES, PERIODS, SubscriptionRegistry
+from src.bot.broadcast import broadcast_trending, send_update
+from src.bot.render import get_format, get_render_cache, topic_label
+from src.api.parsers import MAX_REPOS
+from src.api.github_api import TRENDING_URL
+from src.api.resilience import get_breaker
+from src.utils.metrics import metrics, COMMAND_SECONDS
+from src.utils import validator
+from typing import Optional
 import os
-import requests
+
+# How many languages an inline query suggests, and how long Telegram may cache the answer.
+INLINE_RESULTS = 10
+INLINE_CACHE_TIME = 300
+
+SUBSCRIBE_USAGE = "Usage: /subscribe <daily|weekly|monthly> [language] [full|changes]"
+UNSUBSCRIBE_USAGE = "Usage: /unsubscribe [daily|weekly|monthly] [language]"
 
 class GithubTrendingBot:
-    def __init__(self, token):
-        self.app = Application.builder().token(token).build()
+    def __init__(self, token, application: Optional[Application] = None):
+        # A prebuilt application (e.g. pointed at a local Bot API) replaces the default one.
+        self.app = application or Application.builder().token(token).build()
         self.token = token
         self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        self.inflight = SingleFlight()
+        self.outbox = TelegramOutbox(token)
+        self.subscriptions = SubscriptionRegistry()
+        # Mode for the default chat when nobody has subscribed: "full" or "changes".
+        # Subscribed chats pick their own with `/subscribe <period> [language] changes`.
+        self.notify_mode = os.getenv("TRENDING_NOTIFY_MODE", "full")
+
+    async def fetch_repos(self, period: str, language=None, limit=MAX_REPOS):
+        """
+        Fetch and save trending data, sharing one in-flight fetch between
+        concurrent requests for the same period and language. Every request
+        fetches (and stores) the whole trending page; each caller gets its own
+        `limit` of it (all of it when None). Raises ValueError for an unknown
+        language.
+        """
+        language = await validator.require_language_async(language) if language else ""
+        data = await self.inflight.do((period, language), self._fetch_and_render, period, language)
+        return data if limit is None else data[:limit]
+
+    @staticmethod
+    async def _fetch_and_render(period: str, language: str):
+        data = await fetch_and_save_repos(period, language, limit=None)
+        # Render each snapshot once; every reply (at any limit) and broadcast of it reuses the text.
+        with metrics.span("render", period=period):
+            get_render_cache().prerender(period, language, data, metadata=known_metadata(data))
+        return data
+
+    @staticmethod
+    def limit_from_args(args, default=MAX_REPOS):
+        """
+        Read an optional repository count (e.g. `/daily 3`) from the command arguments.
+        """
+        for arg in args or []:
+            if isinstance(arg, str) and arg.isdigit():
+                return max(1, int(arg))
+        return default
+
+    @staticmethod
+    def subscription_from_args(args):
+        """
+        Read (period, language, mode) from `/subscribe` or `/unsubscribe`
+        arguments, e.g. `daily python changes`; each part may be left out.
+        """
+        period = language = mode = None
+        for arg in args or []:
+            if not isinstance(arg, str):
+                continue
+            if period is None and arg.lower() in PERIODS:
+                period = arg.lower()
+            elif mode is None and arg.lower() in MODES:
+                mode = arg.lower()
+            elif language is None:
+                language = arg
+            else:
+                raise ValueError(f"Unexpected argument: {arg}")
+        return period, language, mode
+
+    async def handle_subscribe(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handle /subscribe: send this chat the period's list (or, in "changes" mode,
+        only what changed) for a language, or all languages, on every scheduled run.
+        """
+        try:
+            period, language, mode = self.subscription_from_args(context.args)
+            if period is None:
+                raise ValueError(SUBSCRIBE_USAGE)
+            language = await validator.require_language_async(language) if language else ""
+            added = self.subscriptions.subscribe(update.effective_chat.id, period, language, mode or "full")
+        except ValueError as e:
+            await update.message.reply_text(str(e))
+            return
+        action = "Subscribed to" if added else "Updated subscription to"
+        await update.message.reply_text(f"{action} {period} GitHub trending for {topic_label(language)} ({mode or 'full'}).")
+
+    async def handle_unsubscribe(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handle /unsubscribe: stop this chat's updates, all of them or only those
+        of one period and/or language.
+        """
+        try:
+            period, language, mode = self.subscription_from_args(context.args)
+            if mode is not None:
+                raise ValueError(UNSUBSCRIBE_USAGE)
+        except ValueError as e:
+            await update.message.reply_text(str(e))
+            return
+        if language:
+            # Subscriptions are stored under the canonical name; an unknown name can only match itself.
+            language = await validator.resolve_language_async(language) or language
+        removed = self.subscriptions.unsubscribe(update.effective_chat.id, period, language)
+        await update.message.reply_text(f"Removed {removed} subscription{'' if removed == 1 else 's'}.")
 
-    async def handle_trending(self, update: Update, context: ContextTypes.DEFAULT_TYPE, period: str, language=None):
+    async def handle_trending(self, update: Update, context: ContextTypes.DEFAULT_TYPE, period: str, language=None,
+                              limit=MAX_REPOS):
         """
         Handle trending command to fetch, send, and save GitHub trending data for the specified period and language.
         """
-        await update.message.reply_text(f"Fetching {period} GitHub trending repositories for {language if language else 'all languages'}...")
-        
-        # Fetch and save the trending repositories
-        data = await fetch_and_save_repos(period, language)
-
-        if data:
-            # Construct the message to send to Telegram
-            message = f"{period.capitalize()} GitHub Trending for {language if language else 'all languages'}:\n" + '\n'.join(
-                [f"{repo['author']} - {repo['url']} (🌟: {repo['stars']})" for repo in data[:10]]
-            )
-            await update.message.reply_text(message)
-        else:
-            await update.message.reply_text(f"No {period} trending repositories found for {language if language else 'all languages'}.")
+        with metrics.timer(COMMAND_SECONDS, command="language" if language else period):
+            try:
+                # Reply and render under the canonical name, so a typo is not echoed and hits the cache.
+                language = await validator.require_language_async(language) if language else None
+                await update.message.reply_text(f"Fetching {period} GitHub trending repositories for {topic_label(language)}...")
 
-    async def run(self):
-        self.app.add_handler(CommandHandler('daily', lambda u, c: self.handle_trending(u, c, 'daily')))
-        self.app.add_handler(CommandHandler('weekly', lambda u, c: self.handle_trending(u, c, 'weekly')))
-        self.app.add_handler(CommandHandler('monthly', lambda u, c: self.handle_trending(u, c, 'monthly')))
+                # Fetch and save the trending repositories
+                data = await self.fetch_repos(period, language, None)
+            except ValueError as e:
+                await update.message.reply_text(str(e))
+                return
+
+            if not data and get_breaker(TRENDING_URL).state != "closed":
+                await update.message.reply_text(
+                    f"GitHub is not responding right now, please try again in {get_breaker(TRENDING_URL).retry_in():.0f} seconds.")
+            else:
+                # Usually already rendered when the snapshot was fetched.
+                message = get_render_cache().render(period, language, data, limit, metadata=known_metadata(data))
+                await update.message.reply_text(message, **self.parse_mode_kwargs())
+
+    def register_handlers(self):
+        self.app.add_handler(CommandHandler('daily', lambda u, c: self.handle_trending(u, c, 'daily', limit=self.limit_from_args(c.args))))
+        self.app.add_handler(CommandHandler('weekly', lambda u, c: self.handle_trending(u, c, 'weekly', limit=self.limit_from_args(c.args))))
+        self.app.add_handler(CommandHandler('monthly', lambda u, c: self.handle_trending(u, c, 'monthly', limit=self.limit_from_args(c.args))))
         self.app.add_handler(CommandHandler('language', self.handle_language))
+        self.app.add_handler(CommandHandler('subscribe', self.handle_subscribe))
+        self.app.add_handler(CommandHandler('unsubscribe', self.handle_unsubscribe))
+        self.app.add_handler(InlineQueryHandler(self.handle_inline_query))
+
+    async def run(self):
+        self.register_handlers()
         await self.app.run_polling()
 
     async def handle_language(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -41,33 +163,58 @@ class GithubTrendingBot:
         """
         if context.args:
             language = context.args[0]
-            await self.handle_trending(update, context, 'daily', language)
+            await self.handle_trending(update, context, 'daily', language, limit=self.limit_from_args(context.args[1:]))
         else:
             await self.handle_trending(update, context, 'daily')  # Fetch for all languages if not specified
 
-    async def send_trending_to_telegram(self, period: str, language=None):
+    async def handle_inline_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Suggest languages as the user types `@bot <language>`; picking one sends `/language <language>`.
+        """
+        index = await validator.language_registry.language_index_async()
+        results = []
+        for entry in index.complete(update.inline_query.query, INLINE_RESULTS):
+            language = entry.get("urlParam") or entry["name"]
+            results.append(InlineQueryResultArticle(
+                id=language[:64], title=entry["name"],
+                input_message_content=InputTextMessageContent(f"/language {language}")))
+        await update.inline_query.answer(results, cache_time=INLINE_CACHE_TIME)
+
+    @staticmethod
+    def render_trending(period: str, language, data) -> str:
+        """
+        Build the scheduled-update message for a fetched trending list.
+        """
+        return get_render_cache().render(period, language, data, metadata=known_metadata(data))
+
+    @staticmethod
+    def parse_mode_kwargs() -> dict:
+        """
+        The `parse_mode` argument for the configured message format (none for plain text).
+        """
+        parse_mode = get_format().parse_mode
+        return {"parse_mode": parse_mode} if parse_mode else {}
+
+    async def send_trending_to_telegram(self, period: str, language=None, changes_only=False) -> bool:
         """
         Fetch, send, and save GitHub trending data for a specified period, without needing `update` or `context`.
+        With `changes_only`, send only what changed since the topic was last sent, and nothing if nothing did.
+        Returns whether a message was sent.
         """
-        # Fetch and save the trending repositories
-        data = await fetch_and_save_repos(period, language)
+        # Diff and record under the canonical name the snapshots are stored under
+        language = await validator.require_language_async(language) if language else None
+        data = await self.fetch_repos(period, language)
+        return await send_update(self.send_message, period, language, data, self.render_trending, changes_only)
 
-        if data:
-            # Construct the message to send to Telegram
-            message = f"{period.capitalize()} GitHub Trending for {language if language else 'all languages'}:\n" + '\n'.join(
-                [f"{repo['author']} - {repo['url']} (Stars: {repo['stars']})" for repo in data[:10]]
-            )
-            self.send_message(message)
-        else:
-            self.send_message(f"No {period} trending repositories found for {language if language else 'all languages'}.")
+    async def broadcast(self, period=None, language=None, changes_only=None):
+        """
+        Send trending updates to every subscribed chat, one fetch per distinct topic.
+        """
+        return await broadcast_trending(self, self.subscriptions, period, language, changes_only=changes_only)
 
-    def send_message(self, message):
+    async def send_message(self, message, chat_id=None):
         """
-        Helper method to send a message to the configured Telegram chat.
+        Helper method to send a message to the configured Telegram chat
+        through the rate-limited outbound queue.
         """
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        payload = {
-            "chat_id": self.chat_id,
-            "text": message
-        }
-        requests.post(url, data=payload)
+        return await self.outbox.send(chat_id or self.chat_id, message, **self.parse_mode_kwargs())
@@ -0,0 +1,85 @@
+"""
+Command line entry point for one-shot jobs and the long-running bot.
+
+    python -m src.cli fetch  --period daily --language python
+    python -m src.cli send   --period weekly
+    python -m src.cli export --period daily --date 20241102 --out daily.json
+    python -m src.cli subscribe --period daily --language python --mode changes
+    python -m src.cli unsubscribe --period daily
+    python -m src.cli serve
+
+Only argparse is imported up front. Each subcommand lives in its own module
+under `src.cli` and is imported when it runs, so a `send` never loads the
+telegram stack and an `export` never loads the HTTP or HTML parsing stack.
+"""
+import argparse
+import importlib
+import sys
+
+PERIODS = ("daily", "weekly", "monthly")
+MODES = ("full", "changes")
+
+# Subcommand name -> module implementing `run(args)`.
+COMMANDS = {
+    "fetch": "src.cli.fetch",
+    "send": "src.cli.send",
+    "export": "src.cli.export",
+    "serve": "src.cli.serve",
+    "subscribe": "src.cli.subscribe",
+    "unsubscribe": "src.cli.subscribe",
+}
+
+
+def _limit(value: str):
+    return None if value == "all" else int(value)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="GitHub trending scraper and bot.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch = subparsers.add_parser("fetch", help="Fetch and save trending snapshots.")
+    fetch.add_argument("--period", nargs="+", choices=PERIODS, default=["daily"])
+    fetch.add_argument("--language", nargs="+", default=[""], help="languages to fetch ('' for all languages)")
+    fetch.add_argument("--limit", type=_limit, default=10, help="repositories per page, or 'all'")
+    fetch.add_argument("--concurrency", type=int, default=4)
+
+    send = subparsers.add_parser("send", help="Fetch trending repositories and send them to a Telegram chat.")
+    send.add_argument("--period", choices=PERIODS, default="daily")
+    send.add_argument("--language", default="")
+    send.add_argument("--chat-id", help="defaults to $TELEGRAM_CHAT_ID")
+    send.add_argument("--changes-only", action="store_true",
+                      help="send only what changed since the last send (nothing if unchanged)")
+
+    export = subparsers.add_parser("export", help="Export a stored snapshot as JSON.")
+    export.add_argument("--period", choices=PERIODS, default="daily")
+    export.add_argument("--language", default="")
+    export.add_argument("--date", help="YYYYMMDD, defaults to today")
+    export.add_argument("--out", help="defaults to repos/{period}/{language}/{date}.json")
+    export.add_argument("--pretty", action="store_true", help="indent the JSON output")
+    export.add_argument("--gzip", action="store_true", help="gzip the JSON output")
+
+    subscribe = subparsers.add_parser("subscribe", help="Subscribe a Telegram chat to scheduled updates.")
+    subscribe.add_argument("--period", choices=PERIODS, default="daily")
+    subscribe.add_argument("--language", default="", help="'' for all languages")
+    subscribe.add_argument("--mode", choices=MODES, default="full",
+                           help="send the whole list, or only what changed since the last update")
+    subscribe.add_argument("--chat-id", help="defaults to $TELEGRAM_CHAT_ID")
+
+    unsubscribe = subparsers.add_parser("unsubscribe", help="Remove a Telegram chat's subscriptions.")
+    unsubscribe.add_argument("--period", choices=PERIODS, help="defaults to every period")
+    unsubscribe.add_argument("--language", help="defaults to every language ('' for all languages only)")
+    unsubscribe.add_argument("--chat-id", help="defaults to $TELEGRAM_CHAT_ID")
+
+    subparsers.add_parser("serve", help="Run the Telegram bot with its scheduler.")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    command = importlib.import_module(COMMANDS[args.command])
+    return command.run(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
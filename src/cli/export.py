@@ -0,0 +1,25 @@
+from datetime import datetime
+from src.storage.sqlite_store import get_snapshot_store, ALL_LANGUAGES
+from src.utils.file_handler import save_to_file
+
+
+def _language(language: str) -> str:
+    # Snapshots are stored under the canonical name; one no longer listed can only match itself.
+    if not language:
+        return ""
+    from src.utils.validator import resolve_language
+    return resolve_language(language) or language
+
+
+def run(args) -> int:
+    date = args.date or datetime.now().strftime('%Y%m%d')
+    language = _language(args.language)
+    data = get_snapshot_store().load_snapshot(args.period, language, date)
+    if not data:
+        print(f"No {args.period} snapshot for {language or 'all languages'} on {date}")
+        return 1
+
+    out = args.out or f"repos/{args.period}/{language or ALL_LANGUAGES}/{date}.json"
+    written = save_to_file(data, out, compact=not args.pretty, compress=args.gzip)
+    print(f"Exported {len(data)} repositories to {written}")
+    return 0
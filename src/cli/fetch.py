@@ -0,0 +1,21 @@
+import asyncio
+from src.api.http_client import close_session
+from src.services.fetch_service import fetch_and_save_repos, bulk_fetch_and_summarize, wait_for_enrichment
+
+
+async def _fetch(args) -> int:
+    try:
+        if len(args.period) * len(args.language) == 1:
+            data = await fetch_and_save_repos(args.period[0], args.language[0], limit=args.limit)
+            return 0 if data else 1
+        summary = await bulk_fetch_and_summarize(args.period, args.language, concurrency=args.concurrency,
+                                                 limit=args.limit)
+        print(summary.report())
+        return 1 if summary.failures else 0
+    finally:
+        await wait_for_enrichment()
+        await close_session()
+
+
+def run(args) -> int:
+    return asyncio.run(_fetch(args))
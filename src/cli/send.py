@@ -0,0 +1,45 @@
+import asyncio
+import os
+from src.api.http_client import close_session
+from src.bot.broadcast import send_update
+from src.bot.outbound import TelegramOutbox
+from src.bot.render import get_format, get_render_cache, topic_label
+from src.services.fetch_service import fetch_and_save_repos, known_metadata, wait_for_enrichment
+
+
+def _render_full(period, language, data) -> str:
+    return get_render_cache().render(period, language, data, metadata=known_metadata(data))
+
+
+async def _send(args) -> int:
+    token = os.getenv("TELEGRAM_TOKEN")
+    chat_id = args.chat_id or os.getenv("TELEGRAM_CHAT_ID")
+    if not token or not chat_id:
+        print("TELEGRAM_TOKEN and a chat id (--chat-id or TELEGRAM_CHAT_ID) are required")
+        return 2
+
+    from src.utils.validator import require_language_async
+
+    outbox = TelegramOutbox(token)
+    parse_mode = get_format().parse_mode
+    try:
+        try:
+            # Snapshots, broadcasts and cached messages are all keyed by the canonical name.
+            language = await require_language_async(args.language) if args.language else ""
+        except ValueError as e:
+            print(e)
+            return 1
+        data = await fetch_and_save_repos(args.period, language)
+        sent = await send_update(lambda message: outbox.send(chat_id, message, parse_mode),
+                                 args.period, language, data, _render_full, args.changes_only)
+        if not sent:
+            print(f"No changes in {args.period} trending for {topic_label(language)}; nothing sent")
+        return 0
+    finally:
+        await outbox.close()
+        await wait_for_enrichment()
+        await close_session()
+
+
+def run(args) -> int:
+    return asyncio.run(_send(args))
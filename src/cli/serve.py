@@ -0,0 +1,8 @@
+import asyncio
+
+
+def run(args) -> int:
+    import main
+
+    asyncio.run(main.main())
+    return 0
@@ -0,0 +1,36 @@
+import os
+from src.bot.subscriptions import SubscriptionRegistry
+
+
+def _language(language: str, required: bool) -> str:
+    # Store subscriptions under the canonical name the bot fetches with.
+    if not language:
+        return ""
+    from src.utils.validator import resolve_language
+    resolved = resolve_language(language)
+    if resolved is None and required:
+        raise ValueError(f"Invalid Language: {language}")
+    return resolved or language
+
+
+def run(args) -> int:
+    chat_id = args.chat_id or os.getenv("TELEGRAM_CHAT_ID")
+    if not chat_id:
+        print("A chat id (--chat-id or TELEGRAM_CHAT_ID) is required")
+        return 2
+
+    registry = SubscriptionRegistry()
+    try:
+        if args.command == "subscribe":
+            language = _language(args.language, required=True)
+            added = registry.subscribe(chat_id, args.period, language, args.mode)
+            print(f"{'Subscribed' if added else 'Updated subscription of'} {chat_id} to {args.period} trending "
+                  f"for {language or 'all languages'} ({args.mode})")
+        else:
+            language = _language(args.language, required=False) if args.language is not None else None
+            removed = registry.unsubscribe(chat_id, args.period, language)
+            print(f"Removed {removed} subscription{'' if removed == 1 else 's'} of {chat_id}")
+    except ValueError as e:
+        print(e)
+        return 1
+    return 0
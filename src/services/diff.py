@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from src.storage.sqlite_store import SnapshotStore, full_name_from, get_snapshot_store
+
+# Stars gained between two snapshots before a repository counts as a "star jump".
+DEFAULT_MIN_STAR_JUMP = 100
+
+
+class SnapshotDiff:
+    """
+    What changed between two rankings of the same (period, language).
+    Ranks are 1-based; each list is ordered by the current (or, for drop-outs,
+    the previous) rank.
+    """
+    __slots__ = ("entered", "dropped", "moved", "star_jumps")
+
+    def __init__(self):
+        self.entered: List[Dict] = []
+        self.dropped: List[Dict] = []
+        self.moved: List[Dict] = []
+        self.star_jumps: List[Dict] = []
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.entered or self.dropped or self.moved or self.star_jumps)
+
+    def to_dict(self) -> Dict:
+        return {
+            "entered": [{"full_name": full_name_from(e["repo"]), "rank": e["rank"]} for e in self.entered],
+            "dropped": [{"full_name": full_name_from(e["repo"]), "rank": e["rank"]} for e in self.dropped],
+            "moved": [{"full_name": full_name_from(e["repo"]), "old_rank": e["old_rank"], "rank": e["rank"]}
+                      for e in self.moved],
+            "star_jumps": [{"full_name": full_name_from(e["repo"]), "stars": e["stars"], "delta": e["delta"]}
+                           for e in self.star_jumps],
+        }
+
+
+def diff_snapshots(previous: Sequence, current: Sequence, min_star_jump: int = DEFAULT_MIN_STAR_JUMP,
+                   min_rank_move: int = 1) -> SnapshotDiff:
+    """
+    Compare two ranked lists of repositories (records or dicts) in O(n) by
+    indexing the previous one on full_name.
+
+    Only the top `len(current)` of `previous` is compared, so a previous fetch
+    with a higher limit does not report phantom drop-outs.
+    """
+    previous = previous[:len(current)]
+    before = {}
+    for rank, repo in enumerate(previous, start=1):
+        before.setdefault(full_name_from(repo), (rank, repo))
+
+    diff = SnapshotDiff()
+    seen = set()
+    for rank, repo in enumerate(current, start=1):
+        name = full_name_from(repo)
+        if name in seen:
+            continue
+        seen.add(name)
+        old = before.get(name)
+        if old is None:
+            diff.entered.append({"repo": repo, "rank": rank})
+            continue
+        old_rank, old_repo = old
+        if abs(old_rank - rank) >= min_rank_move:
+            diff.moved.append({"repo": repo, "old_rank": old_rank, "rank": rank})
+        delta = repo["stars"] - old_repo["stars"]
+        if delta >= min_star_jump:
+            diff.star_jumps.append({"repo": repo, "stars": repo["stars"], "delta": delta})
+    diff.dropped = [{"repo": repo, "rank": rank} for name, (rank, repo) in before.items() if name not in seen]
+    return diff
+
+
+def load_previous_snapshot(period: str, language: Optional[str], before: Optional[str] = None,
+                           store: Optional[SnapshotStore] = None) -> Optional[List]:
+    """
+    The latest stored snapshot strictly before `before` (today by default), or
+    None when there is none to compare with.
+    """
+    store = store or get_snapshot_store()
+    before = before or datetime.now().strftime('%Y%m%d')
+    date = store.previous_snapshot_date(period, language, before)
+    if date is None:
+        return None
+    return store.load_records(period, language, date)
+
+
+async def diff_with_previous(period: str, language: Optional[str], current: Sequence,
+                             min_star_jump: int = DEFAULT_MIN_STAR_JUMP) -> Optional[SnapshotDiff]:
+    """
+    Diff `current` against the previous stored snapshot, reading the store off
+    the event loop. Returns None when there is no earlier snapshot.
+    """
+    previous = await asyncio.to_thread(load_previous_snapshot, period, language)
+    if previous is None:
+        return None
+    return diff_snapshots(previous, current, min_star_jump)
+
+
+def load_last_broadcast(period: str, language: Optional[str],
+                        store: Optional[SnapshotStore] = None) -> Optional[List]:
+    """
+    The list last sent for (period, language), or, before anything was sent,
+    the previous stored snapshot; None when there is neither.
+    """
+    store = store or get_snapshot_store()
+    sent = store.load_broadcast(period, language)
+    return sent if sent is not None else load_previous_snapshot(period, language, store=store)
+
+
+async def diff_with_last_broadcast(period: str, language: Optional[str], current: Sequence,
+                                   min_star_jump: int = DEFAULT_MIN_STAR_JUMP) -> Optional[SnapshotDiff]:
+    """
+    Diff `current` against what was last sent for the topic, so a second send
+    on the same day only reports what changed since the first. Returns None
+    when there is nothing to compare with.
+    """
+    previous = await asyncio.to_thread(load_last_broadcast, period, language)
+    if previous is None:
+        return None
+    return diff_snapshots(previous, current, min_star_jump)
+
+
+async def record_broadcast(period: str, language: Optional[str], sent: Sequence) -> None:
+    """
+    Remember `sent` as the topic's last broadcast, off the event loop.
+    """
+    await asyncio.to_thread(get_snapshot_store().save_broadcast, period, language, list(sent))
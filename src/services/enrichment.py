@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+from src.api.http_client import get_session
+from src.api.resilience import RetryableHTTPError, call_with_retries, check_response
+from src.storage.sqlite_store import SnapshotStore, full_name_from, get_snapshot_store
+from src.utils.logger import log_event
+from src.utils.metrics import metrics
+
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+DEFAULT_BATCH_SIZE = 50
+# Repositories whose latest metadata is kept in memory for rendering.
+DEFAULT_MAX_KNOWN = 4096
+
+# How long each field is trusted before it is looked up again.
+FIELD_TTLS = {
+    "topics": 7 * 24 * 60 * 60,
+    "license": 30 * 24 * 60 * 60,
+    "pushed_at": 6 * 60 * 60,
+    "open_issues": 6 * 60 * 60,
+}
+
+# GraphQL selection for each field, and how to read it back from a repository node.
+FIELD_QUERIES = {
+    "topics": "repositoryTopics(first: 20) { nodes { topic { name } } }",
+    "license": "licenseInfo { spdxId }",
+    "pushed_at": "pushedAt",
+    "open_issues": "issues(states: OPEN) { totalCount }",
+}
+FIELD_READERS = {
+    "topics": lambda node: [item["topic"]["name"] for item in node["repositoryTopics"]["nodes"]],
+    "license": lambda node: (node.get("licenseInfo") or {}).get("spdxId"),
+    "pushed_at": lambda node: node.get("pushedAt"),
+    "open_issues": lambda node: node["issues"]["totalCount"],
+}
+
+_OWNER_NAME = re.compile(r"^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$")
+
+
+def build_query(requests: Dict[str, Set[str]]) -> str:
+    """
+    One GraphQL query looking up several repositories at once, each under its
+    own alias (`r0`, `r1`, ...) and asking only for the fields it needs.
+    """
+    parts = []
+    for index, (full_name, fields) in enumerate(requests.items()):
+        owner, name = full_name.split("/", 1)
+        selection = " ".join(FIELD_QUERIES[field] for field in sorted(fields))
+        parts.append(f"r{index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ {selection} }}")
+    return "query { " + " ".join(parts) + " }"
+
+
+class MetadataEnricher:
+    """
+    Adds topics, license, last push and open-issue count to trending repositories.
+
+    Lookups are batched, many repositories per GraphQL query. Results go to a
+    persistent cache in the snapshot store, and each field has its own TTL, so
+    a repository is only asked for the fields that have gone stale. The same
+    repository trending under several periods and languages is looked up once:
+    the cache covers later calls, and a repository already being looked up by a
+    concurrent call is awaited, not queried again. When the API is unavailable,
+    the last cached values are returned.
+
+    The latest values of recently enriched repositories are also kept in
+    memory, so the renderer can add them to a message (`known`) without
+    waiting on the database or the API.
+    """
+
+    def __init__(self, token: Optional[str] = None, api_url: str = GITHUB_GRAPHQL_URL,
+                 store: Optional[SnapshotStore] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 ttls: Optional[Dict[str, float]] = None, max_known: int = DEFAULT_MAX_KNOWN):
+        self.token = token if token is not None else os.getenv("GITHUB_TOKEN")
+        self.api_url = api_url
+        self._store = store
+        self.batch_size = batch_size
+        self.ttls = dict(FIELD_TTLS, **(ttls or {}))
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.max_known = max_known
+        self._known: "OrderedDict[str, Dict]" = OrderedDict()
+        self.queries = 0
+        self.looked_up = 0
+
+    @property
+    def store(self) -> SnapshotStore:
+        return self._store or get_snapshot_store()
+
+    def _stale_fields(self, cached: Dict[str, tuple], now: float) -> Set[str]:
+        return {field for field, ttl in self.ttls.items()
+                if field not in cached or now - cached[field][1] >= ttl}
+
+    async def enrich(self, repos: Iterable) -> Dict[str, Dict]:
+        """
+        Return {full_name: {field: value}} for `repos` (records, dicts or
+        "owner/name" strings), looking up only what is missing or stale.
+        """
+        names = list(dict.fromkeys(
+            full_name for full_name in (repo if isinstance(repo, str) else full_name_from(repo) for repo in repos)
+            if _OWNER_NAME.match(full_name)))
+        cached = await asyncio.to_thread(self.store.load_metadata, names)
+
+        now = time.time()
+        mine: Dict[str, Set[str]] = {}
+        waiting = []
+        for full_name in names:
+            if full_name in self._inflight:
+                waiting.append(self._inflight[full_name])
+                continue
+            stale = self._stale_fields(cached.get(full_name, {}), now)
+            if stale:
+                mine[full_name] = stale
+                self._inflight[full_name] = asyncio.get_running_loop().create_future()
+
+        if mine:
+            try:
+                await self._look_up(mine, cached)
+            finally:
+                for full_name in mine:
+                    future = self._inflight.pop(full_name)
+                    if not future.done():
+                        future.set_result(None)
+        if waiting:
+            await asyncio.gather(*waiting)
+            cached.update(await asyncio.to_thread(self.store.load_metadata, [
+                full_name for full_name in names if full_name not in mine]))
+
+        metadata = {full_name: {field: value for field, (value, _) in cached.get(full_name, {}).items()}
+                    for full_name in names}
+        self._remember(metadata)
+        return metadata
+
+    def _remember(self, metadata: Dict[str, Dict]) -> None:
+        for full_name, fields in metadata.items():
+            if not fields:
+                continue
+            # Keep the old dict when nothing changed, so renders of it still compare equal by identity.
+            if self._known.get(full_name) != fields:
+                self._known[full_name] = fields
+            self._known.move_to_end(full_name)
+        while len(self._known) > self.max_known:
+            self._known.popitem(last=False)
+
+    def known(self, repos: Iterable) -> Dict[str, Dict]:
+        """
+        The metadata already in memory for `repos`, without any lookup.
+        """
+        found = {}
+        for repo in repos:
+            full_name = repo if isinstance(repo, str) else full_name_from(repo)
+            fields = self._known.get(full_name)
+            if fields is not None:
+                found[full_name] = fields
+        return found
+
+    async def _look_up(self, requests: Dict[str, Set[str]], cached: Dict[str, Dict]) -> None:
+        names = list(requests)
+        for start in range(0, len(names), self.batch_size):
+            batch = {full_name: requests[full_name] for full_name in names[start:start + self.batch_size]}
+            try:
+                with metrics.span("enrich"):
+                    nodes = await self._query(batch)
+            except Exception as e:
+                # Keep serving whatever is cached; the stale fields are retried next time.
+                log_event("enrich_failed", logging.WARNING, repos=len(batch), error=str(e))
+                continue
+            fetched_at = time.time()
+            rows, partial = [], 0
+            for index, (full_name, fields) in enumerate(batch.items()):
+                node = nodes.get(f"r{index}")
+                for field in fields:
+                    # A missing repository is cached as empty, so it is not asked for again until the TTL runs out.
+                    try:
+                        value = FIELD_READERS[field](node) if node else None
+                    except (KeyError, TypeError, AttributeError):
+                        # A partial node: leave the field uncached so the next enrichment asks again.
+                        partial += 1
+                        continue
+                    rows.append((full_name, field, value, fetched_at))
+                    cached.setdefault(full_name, {})[field] = (value, fetched_at)
+            if partial:
+                log_event("enrich_partial", logging.WARNING, repos=len(batch), fields=partial)
+            await asyncio.to_thread(self.store.save_metadata, rows)
+            self.looked_up += len(batch)
+
+    async def _query(self, batch: Dict[str, Set[str]]) -> Dict[str, Optional[Dict]]:
+        if not self.token:
+            raise RuntimeError("GITHUB_TOKEN is not set")
+        body = {"query": build_query(batch)}
+        headers = {"Authorization": f"bearer {self.token}"}
+
+        async def attempt() -> Dict:
+            session = await get_session()
+            async with session.post(self.api_url, json=body, headers=headers) as response:
+                check_response(response.status, response.headers)
+                if response.status == 403 and response.headers.get("X-RateLimit-Remaining") == "0":
+                    reset = float(response.headers.get("X-RateLimit-Reset") or 0)
+                    raise RetryableHTTPError(403, max(0.0, reset - time.time()))
+                response.raise_for_status()
+                return await response.json()
+
+        self.queries += 1
+        payload = await call_with_retries(self.api_url, attempt)
+        data = payload.get("data") or {}
+        # NOT_FOUND errors come with a null node and are expected; anything else without data is a failure.
+        errors = [error for error in payload.get("errors") or [] if error.get("type") != "NOT_FOUND"]
+        if errors and not data:
+            raise RuntimeError(errors[0].get("message", "GraphQL error"))
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        return {"queries": self.queries, "looked_up": self.looked_up, "inflight": len(self._inflight)}
+
+
+_enricher: Optional[MetadataEnricher] = None
+
+
+def get_enricher() -> MetadataEnricher:
+    """
+    Return the process-wide enricher, creating it on first use.
+    """
+    global _enricher
+    if _enricher is None:
+        _enricher = MetadataEnricher()
+    return _enricher
+
+
+def set_enricher(enricher: Optional[MetadataEnricher]) -> None:
+    global _enricher
+    _enricher = enricher
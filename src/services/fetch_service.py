@@ -1,45 +1,231 @@
-from typing import Optional, List
-from src.api.github_api import scrape_github_trending
+from typing import AsyncIterator, Dict, Iterable, Optional, List
+from urllib.parse import urlparse
+from src.api.github_api import stream_github_trending, trending_url
+from src.api.models import RECORD_FIELDS, TrendingRepo
+from src.api.parsers import MAX_REPOS
+from src.api.http_client import HostRateLimiter
 from src.utils.file_handler import save_to_file
+from src.storage.sqlite_store import get_snapshot_store
+from src.services.enrichment import get_enricher
+from src.utils.metrics import metrics
+from src.utils.logger import log_event
 from datetime import datetime
+import asyncio
+import logging
 import os
+import sqlite3
+import time
 
-DESIRED_COLUMNS = ["author", "url", "stars", "forks", "language"]
+# Columns of the JSON export; `TrendingRepo.to_record` writes exactly these.
+DESIRED_COLUMNS = list(RECORD_FIELDS)
 
-async def fetch_and_save_repos(period: str, language: Optional[str] = "", bot=None) -> List[dict]:
+# Snapshots always go to the SQLite store; the per-day JSON files are an optional export.
+JSON_EXPORT = os.getenv("TRENDING_JSON_EXPORT", "1") != "0"
+
+# Look up topics/license/last push/open issues for every fetched repo (needs GITHUB_TOKEN).
+ENRICH = os.getenv("TRENDING_ENRICH", "0") == "1"
+
+# Enrichment runs in the background, so a reply never waits on the GraphQL API.
+_enrichment_tasks: "set[asyncio.Task]" = set()
+
+
+async def _enrich(data: List[TrendingRepo], period: str, language: str) -> None:
+    try:
+        await get_enricher().enrich(data)
+    except Exception as e:
+        # Nothing awaits this task, so whatever went wrong is only seen here.
+        log_event("enrich_failed", logging.ERROR, period=period, language=language or "", error=str(e))
+
+
+def _enrich_in_background(data: List[TrendingRepo], period: str, language: str) -> None:
+    task = asyncio.create_task(_enrich(data, period, language))
+    # The event loop only keeps weak references to tasks
+    _enrichment_tasks.add(task)
+    task.add_done_callback(_enrichment_tasks.discard)
+
+
+def known_metadata(data: Iterable) -> Optional[Dict[str, Dict]]:
+    """
+    Enrichment metadata already at hand for `data`, by full name, for the
+    renderer; None when enrichment is off. Never waits for a lookup.
+    """
+    return get_enricher().known(data) if ENRICH else None
+
+
+async def wait_for_enrichment() -> None:
+    """
+    Wait for the background enrichment started by earlier fetches, e.g. before
+    a one-shot command closes the shared session.
+    """
+    while _enrichment_tasks:
+        await asyncio.gather(*_enrichment_tasks, return_exceptions=True)
+
+
+async def fetch_and_save_repos(period: str, language: Optional[str] = "", bot=None,
+                               limit: Optional[int] = MAX_REPOS) -> List[TrendingRepo]:
     """
     Fetch GitHub trending repositories for the given period and language,
-    and save the results to a file.
+    and save the results to a file. Returns at most `limit` repositories (all
+    of them when None).
+
+    The stored snapshot always holds at least the default `MAX_REPOS`, however
+    small `limit` is: a display limit such as `/daily 3` must not replace the
+    day's snapshot with a truncated one.
     """
-    from src.utils.validator import is_valid_language
+    from src.utils.validator import require_language_async
 
-    if language and not is_valid_language(language):
-        raise ValueError(f"Invalid Language: {language}")
+    with metrics.span("resolve", period=period):
+        if language:
+            language = await require_language_async(language)
 
-    if period not in ("daily", "weekly", "monthly"):
-        raise ValueError(f"Invalid Period: {period}")
+        if period not in ("daily", "weekly", "monthly"):
+            raise ValueError(f"Invalid Period: {period}")
 
-    repos = scrape_github_trending(language, period)
+    # Records are immutable and go to storage and the export as they are;
+    # `from_dict` returns them unchanged and only converts plain dicts.
+    fetch_limit = None if limit is None else max(limit, MAX_REPOS)
+    data = [TrendingRepo.from_dict(repo) async for repo in stream_github_trending(language, period, fetch_limit)]
 
-    if not repos:
-        print(f"No repositories found for {period} ({language if language else 'all languages'}).")
+    if not data:
+        log_event("trending_empty", logging.WARNING, period=period, language=language or "")
         return []
 
-    data = [
-        {col: repo.get(col) for col in DESIRED_COLUMNS}
-        for repo in repos
-    ]
-
-    # Construct the filename and ensure the directory exists
-    filename = f"repos/{period}/{language if language else 'all_languages'}/{datetime.now().strftime('%Y%m%d')}.json"
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    date = datetime.now().strftime('%Y%m%d')
 
-    # Save the data to the file
+    # Store the snapshot in one transaction, off the event loop
     try:
-        save_to_file(data, filename)
-        print(f"{period.capitalize()} trending data for {language if language else 'all languages'} saved to {filename}")
-    except Exception as e:
-        print(f"Failed to save data to {filename}: {e}")
+        with metrics.span("store", period=period):
+            await asyncio.to_thread(get_snapshot_store().save_snapshot, period, language, date, data)
+    except (sqlite3.Error, OSError) as e:
+        log_event("snapshot_store_failed", logging.ERROR, period=period, language=language or "", error=str(e))
+
+    if ENRICH:
+        _enrich_in_background(data, period, language)
+
+    if JSON_EXPORT:
+        # Construct the filename and ensure the directory exists
+        filename = f"repos/{period}/{language if language else 'all_languages'}/{date}.json"
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        # Save the data to the file atomically, off the event loop
+        try:
+            with metrics.span("save", period=period):
+                await asyncio.to_thread(save_to_file, data, filename, compact=True)
+            log_event("trending_exported", period=period, language=language or "", path=filename)
+        except Exception as e:
+            log_event("trending_export_failed", logging.ERROR, path=filename, error=str(e))
+
+    log_event("trending_fetched", period=period, language=language or "", repos=len(data))
 
     # Return the data (optional, if needed by the caller)
-    return data
+    return data if limit is None else data[:limit]
+
+
+class BulkFetchSummary:
+    """
+    Collects per-target latency and outcome of a bulk fetch.
+    """
+
+    def __init__(self):
+        self.results: List[Dict] = []
+
+    def record(self, result: Dict) -> None:
+        self.results.append(result)
+
+    @property
+    def failures(self) -> List[Dict]:
+        return [result for result in self.results if result["status"] == "error"]
+
+    @property
+    def empty(self) -> List[Dict]:
+        return [result for result in self.results if result["status"] == "empty"]
+
+    def latency_stats(self) -> Dict[str, float]:
+        latencies = sorted(result["latency"] for result in self.results)
+        if not latencies:
+            return {"min": 0.0, "mean": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "min": latencies[0],
+            "mean": sum(latencies) / len(latencies),
+            "p95": latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))],
+            "max": latencies[-1],
+        }
+
+    def report(self) -> str:
+        stats = self.latency_stats()
+        lines = [
+            f"Fetched {len(self.results)} targets: "
+            f"{len(self.results) - len(self.failures) - len(self.empty)} ok, "
+            f"{len(self.empty)} empty, {len(self.failures)} failed "
+            f"(latency min {stats['min']:.2f}s / mean {stats['mean']:.2f}s / "
+            f"p95 {stats['p95']:.2f}s / max {stats['max']:.2f}s)"
+        ]
+        for result in sorted(self.results, key=lambda r: (r["period"], r["language"] or "")):
+            target = f"{result['period']}/{result['language'] if result['language'] else 'all_languages'}"
+            line = f"  {target:<32} {result['status']:<6} {result['latency']:.2f}s"
+            if result["error"]:
+                line += f" {result['error']}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+async def bulk_fetch_repos(periods: Iterable[str], languages: Iterable[Optional[str]],
+                           concurrency: int = 4, rate_per_host: Optional[float] = 2.0,
+                           summary: Optional[BulkFetchSummary] = None,
+                           limit: Optional[int] = MAX_REPOS) -> AsyncIterator[Dict]:
+    """
+    Fetch and save every (period, language) pair of the matrix concurrently,
+    yielding each result as soon as it completes.
+
+    At most `concurrency` fetches run at once and at most `rate_per_host`
+    requests per second start against the same host. Each snapshot is saved by
+    `fetch_and_save_repos`, so the `repos/{period}/{language}/{date}.json`
+    layout is unchanged. `limit` is passed on to every fetch (None for whole pages).
+    Pass a `BulkFetchSummary` to collect latencies and failures.
+    """
+    languages = list(languages)
+    targets = [(period, language) for period in periods for language in languages]
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(rate_per_host)
+
+    async def run(period: str, language: Optional[str]) -> Dict:
+        async with semaphore:
+            await limiter.acquire(urlparse(trending_url(language or "", period)).netloc)
+            start = time.perf_counter()
+            error = None
+            try:
+                data = await fetch_and_save_repos(period, language, limit=limit)
+            except Exception as e:
+                data = []
+                error = str(e)
+            return {
+                "period": period,
+                "language": language,
+                "data": data,
+                "status": "error" if error else ("ok" if data else "empty"),
+                "error": error,
+                "latency": time.perf_counter() - start,
+            }
+
+    tasks = [asyncio.ensure_future(run(period, language)) for period, language in targets]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if summary is not None:
+                summary.record(result)
+            yield result
+    finally:
+        # The consumer may stop iterating early; don't leave fetches running.
+        for task in tasks:
+            task.cancel()
+
+
+async def bulk_fetch_and_summarize(periods: Iterable[str], languages: Iterable[Optional[str]],
+                                   **options) -> BulkFetchSummary:
+    """
+    Run `bulk_fetch_repos` to completion and return its summary.
+    """
+    summary = BulkFetchSummary()
+    async for _ in bulk_fetch_repos(periods, languages, summary=summary, **options):
+        pass
+    return summary
@@ -0,0 +1,90 @@
+from datetime import date as date_cls, datetime, timedelta
+from typing import Dict, List, Optional
+from src.storage.sqlite_store import SnapshotStore, get_snapshot_store, ALL_LANGUAGES
+
+DATE_FORMAT = "%Y%m%d"
+
+
+def _cutoff(days: Optional[int], today: Optional[date_cls] = None) -> str:
+    if days is None:
+        return ""
+    today = today or datetime.now().date()
+    return (today - timedelta(days=days)).strftime(DATE_FORMAT)
+
+
+def _filters(period: Optional[str], language: Optional[str]):
+    clauses, params = [], []
+    if period:
+        clauses.append("h.period = ?")
+        params.append(period)
+    if language is not None:
+        clauses.append("h.language = ?")
+        params.append(language or ALL_LANGUAGES)
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+class StarHistory:
+    """
+    Queries over archived trending snapshots, answered from the store's
+    `repo_history` index (updated with every saved snapshot) rather than by
+    scanning the archive.
+    """
+
+    def __init__(self, store: Optional[SnapshotStore] = None):
+        self.store = store
+
+    def _store(self) -> SnapshotStore:
+        return self.store or get_snapshot_store()
+
+    def time_series(self, full_name: str, days: Optional[int] = 90, period: Optional[str] = None,
+                    language: Optional[str] = None, today: Optional[date_cls] = None) -> List[Dict]:
+        """
+        Every appearance of `full_name` in the last `days` days, oldest first.
+        """
+        extra, params = _filters(period, language)
+        return self._store().query(
+            "SELECT h.date, h.period, h.language, h.rank, h.stars, h.forks FROM repos r "
+            "JOIN repo_history h ON h.repo_id = r.id "
+            f"WHERE r.full_name = ? AND h.date >= ?{extra} ORDER BY h.date, h.period, h.language",
+            [full_name, _cutoff(days, today)] + params,
+        )
+
+    def rank_history(self, full_name: str, period: str = "daily", language: Optional[str] = "",
+                     days: Optional[int] = 90, today: Optional[date_cls] = None) -> List[Dict]:
+        """
+        The repo's rank on one trending list over time.
+        """
+        return [
+            {"date": row["date"], "rank": row["rank"]}
+            for row in self.time_series(full_name, days, period, language, today)
+        ]
+
+    def star_delta(self, full_name: str, days: Optional[int] = 30, period: Optional[str] = None,
+                   language: Optional[str] = None, today: Optional[date_cls] = None) -> int:
+        """
+        Stars gained between the first and last appearance in the window.
+        """
+        series = self.time_series(full_name, days, period, language, today)
+        return series[-1]["stars"] - series[0]["stars"] if series else 0
+
+    def top_gainers(self, days: int = 30, period: Optional[str] = None, language: Optional[str] = None,
+                    limit: int = 10, today: Optional[date_cls] = None) -> List[Dict]:
+        """
+        Repositories with the biggest star gain across their appearances in the window.
+        """
+        extra, params = _filters(period, language)
+        return self._store().query(
+            "SELECT r.full_name, g.first_date, g.last_date, g.start_stars, g.end_stars, "
+            "g.end_stars - g.start_stars AS delta, g.appearances FROM ("
+            "  SELECT h.repo_id, h.date, "
+            "    FIRST_VALUE(h.date) OVER w AS first_date, LAST_VALUE(h.date) OVER w AS last_date, "
+            "    FIRST_VALUE(h.stars) OVER w AS start_stars, LAST_VALUE(h.stars) OVER w AS end_stars, "
+            "    COUNT(*) OVER w AS appearances, "
+            "    ROW_NUMBER() OVER (PARTITION BY h.repo_id ORDER BY h.date) AS rn "
+            f"  FROM repo_history h WHERE h.date >= ?{extra} "
+            "  WINDOW w AS (PARTITION BY h.repo_id ORDER BY h.date, h.stars "
+            "    ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)"
+            ") g JOIN repos r ON r.id = g.repo_id WHERE g.rn = 1 "
+            "ORDER BY delta DESC, r.full_name LIMIT ?",
+            [_cutoff(days, today)] + params + [limit],
+        )
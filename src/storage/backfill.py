@@ -0,0 +1,131 @@
+"""
+Rebuild stored snapshots by re-parsing the raw page archive, e.g. after a
+parser fix or to fill in a newly stored field.
+
+    python -m src.storage.backfill --archive DIR [--db repos/trending.db] [--workers N]
+                                   [--parser full|strainer|lxml] [--period daily]
+
+Each (period, language, date) is rebuilt from the last page fetched that day.
+An unchanged page is often served for many days and topics, so every distinct
+page is parsed only once, in a worker process. The parsed records are sent back
+to the parent, which writes each batch of snapshots in one transaction; the
+SQLite database only ever has one writer.
+"""
+import argparse
+import os
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.api.models import TrendingRepo
+from src.api.parsers import MAX_REPOS, get_parser
+from src.storage.page_archive import RAW_ARCHIVE_DIR, PageArchive
+from src.storage.sqlite_store import DEFAULT_DB_PATH, SnapshotStore
+
+BATCH_SIZE = 32
+
+Snapshot = Tuple[str, str, str]
+
+
+def plan_backfill(archive: PageArchive, period: Optional[str] = None) -> Dict[str, List[Snapshot]]:
+    """
+    Map each archived page digest to the (period, language, date) snapshots it
+    should rebuild.
+    """
+    plan = defaultdict(list)
+    for (entry_period, language, date), entry in sorted(archive.latest_per_day().items()):
+        if period is None or entry_period == period:
+            plan[entry["digest"]].append((entry_period, language, date))
+    return dict(plan)
+
+
+def parse_pages(root: str, digests: List[str], backend: Optional[str] = None,
+                limit: Optional[int] = MAX_REPOS) -> List[Tuple[str, Optional[List[TrendingRepo]], Optional[str]]]:
+    """
+    Parse archived pages; returns (digest, records, error) for each.
+    """
+    archive = PageArchive(root)
+    parse = get_parser(backend)
+    results = []
+    for digest in digests:
+        try:
+            results.append((digest, list(parse(archive.get(digest), limit)), None))
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            results.append((digest, None, str(e)))
+    return results
+
+
+def _parsed_pages(root: str, digests: List[str], workers: int, backend: Optional[str], limit: Optional[int],
+                  batch_size: int) -> Iterator[Tuple[str, Optional[List[TrendingRepo]], Optional[str]]]:
+    parse = partial(parse_pages, root, backend=backend, limit=limit)
+    batches = (digests[i:i + batch_size] for i in range(0, len(digests), batch_size))
+    if workers == 1:
+        for batch in batches:
+            yield from parse(batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while True:
+            batch = next(batches, None)
+            if batch:
+                pending.add(pool.submit(parse, batch))
+            if pending and (not batch or len(pending) >= workers * 2):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            if not batch and not pending:
+                return
+
+
+def backfill(archive: PageArchive, store: SnapshotStore, workers: Optional[int] = None,
+             backend: Optional[str] = None, period: Optional[str] = None, limit: Optional[int] = MAX_REPOS,
+             batch_size: int = BATCH_SIZE) -> Dict:
+    """
+    Re-parse the archive and replace the matching snapshots in `store`.
+    Returns how many distinct pages were parsed, how many snapshots were
+    written and which pages failed.
+    """
+    plan = plan_backfill(archive, period)
+    report = {"pages": 0, "snapshots": 0, "failed": []}
+    workers = workers or os.cpu_count() or 1
+
+    snapshots = []
+    for digest, records, error in _parsed_pages(archive.root, list(plan), workers, backend, limit, batch_size):
+        if error is not None:
+            report["failed"].append((digest, error))
+            continue
+        report["pages"] += 1
+        snapshots.extend((snapshot_period, language, date, records)
+                         for snapshot_period, language, date in plan[digest])
+        if len(snapshots) >= batch_size:
+            report["snapshots"] += store.save_snapshots(snapshots)
+            snapshots = []
+    if snapshots:
+        report["snapshots"] += store.save_snapshots(snapshots)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild SQLite snapshots from the raw page archive.")
+    parser.add_argument("--archive", default=RAW_ARCHIVE_DIR, required=RAW_ARCHIVE_DIR is None)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--parser", default=None, help="parser backend (default: the fastest available)")
+    parser.add_argument("--period", default=None, help="only rebuild this period")
+    parser.add_argument("--limit", type=int, default=MAX_REPOS, help="repositories kept per page")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.db)
+    try:
+        report = backfill(PageArchive(args.archive), store, args.workers, args.parser, args.period, args.limit)
+    finally:
+        store.close()
+
+    print(f"Parsed {report['pages']} pages into {report['snapshots']} snapshots in {args.db}")
+    for digest, error in report["failed"]:
+        print(f"Failed to parse page {digest}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Import the existing `repos/{period}/{language}/{date}.json` tree into the SQLite store.
+
+    python -m src.storage.migrate [--root repos] [--db repos/trending.db]
+"""
+import argparse
+import os
+from typing import Iterator, Tuple
+from src.storage.sqlite_store import SnapshotStore, DEFAULT_DB_PATH
+from src.utils.file_handler import read_from_file
+
+
+def _sorted_entries(directory: str):
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(entries, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+
+def snapshot_date(filename: str) -> str:
+    return filename.split(".", 1)[0]
+
+
+def iter_json_snapshots(root: str) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Yield (path, period, language, date) for every snapshot file under `root`
+    (`.json` or `.json.gz`), walking one directory at a time.
+    """
+    for period_dir in _sorted_entries(root):
+        if not period_dir.is_dir():
+            continue
+        for language_dir in _sorted_entries(period_dir.path):
+            if not language_dir.is_dir():
+                continue
+            for entry in _sorted_entries(language_dir.path):
+                if entry.is_file() and entry.name.endswith((".json", ".json.gz")):
+                    yield entry.path, period_dir.name, language_dir.name, snapshot_date(entry.name)
+
+
+def import_json_tree(store: SnapshotStore, root: str = "repos") -> dict:
+    """
+    Import every JSON snapshot under `root`; re-running replaces rather than duplicates.
+    """
+    report = {"imported": 0, "failed": []}
+    for path, period, language, date in iter_json_snapshots(root):
+        try:
+            store.save_snapshot(period, language, date, read_from_file(path))
+            report["imported"] += 1
+        except (IOError, KeyError, TypeError) as e:
+            report["failed"].append((path, str(e)))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON trending snapshots into SQLite.")
+    parser.add_argument("--root", default="repos")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.db)
+    try:
+        report = import_json_tree(store, args.root)
+    finally:
+        store.close()
+
+    print(f"Imported {report['imported']} snapshots into {args.db}")
+    for path, error in report["failed"]:
+        print(f"Failed to import {path}: {error}")
+
+
+if __name__ == "__main__":
+    main()
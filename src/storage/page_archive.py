@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+# Set to a directory to keep every downloaded trending page (off by default).
+RAW_ARCHIVE_DIR = os.getenv("TRENDING_RAW_ARCHIVE")
+INDEX_FILE = "index.jsonl"
+
+
+class PageArchive:
+    """
+    Content-addressed store of raw trending pages.
+
+    Each distinct page body is kept once, gzipped, under `objects/<sha256>`;
+    an unchanged page costs one index line and no new blob. The append-only
+    `index.jsonl` records which page was served for every (period, language)
+    fetch, so a later parser can be re-run over the whole history.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self._lock = threading.Lock()
+        # (period, language) -> last indexed entry, loaded from the index on first use.
+        self._last: Optional[Dict[tuple, Dict]] = None
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:] + ".html.gz")
+
+    def put_blob(self, html: str) -> str:
+        """
+        Store `html` unless an identical page is already archived; returns its digest.
+        """
+        payload = html.encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(payload, compresslevel=6))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return digest
+
+    def _last_entries(self) -> Dict[tuple, Dict]:
+        if self._last is None:
+            self._last = {(entry["period"], entry["language"]): entry for entry in self.entries()}
+        return self._last
+
+    def _index(self, period: str, language: str, digest: str, fetched_at: float) -> bool:
+        entry = {
+            "period": period,
+            "language": language,
+            "date": datetime.fromtimestamp(fetched_at).strftime('%Y%m%d'),
+            "fetched_at": fetched_at,
+            "digest": digest,
+        }
+        with self._lock:
+            last = self._last_entries().get((period, language))
+            if last is not None and last["digest"] == digest and last["date"] == entry["date"]:
+                return False
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.index_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+            self._last[(period, language)] = entry
+        return True
+
+    def put(self, period: str, language: Optional[str], html: str, fetched_at: Optional[float] = None) -> str:
+        """
+        Archive one fetched page and index it under its (period, language, date).
+        Refetching an unchanged page on the same day adds nothing.
+        """
+        digest = self.put_blob(html)
+        self._index(period, language or "", digest, fetched_at if fetched_at is not None else time.time())
+        return digest
+
+    def touch(self, period: str, language: Optional[str], fetched_at: Optional[float] = None) -> Optional[str]:
+        """
+        Record that the last archived page for (period, language) was served
+        again (a 304 or a cache hit), so that day is indexed too. Returns its
+        digest, or None when nothing was archived for it yet.
+        """
+        with self._lock:
+            last = self._last_entries().get((period, language or ""))
+        if last is None:
+            return None
+        self._index(period, last["language"], last["digest"], fetched_at if fetched_at is not None else time.time())
+        return last["digest"]
+
+    def get(self, digest: str) -> str:
+        with gzip.open(self.blob_path(digest), 'rt', encoding="utf-8") as f:
+            return f.read()
+
+    def entries(self) -> Iterator[Dict]:
+        """
+        Yield every index entry in fetch order, skipping a torn last line.
+        """
+        try:
+            f = open(self.index_path, 'r')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def latest_per_day(self) -> Dict[tuple, Dict]:
+        """
+        The last page fetched for each (period, language, date), i.e. the one
+        the stored snapshot of that day was parsed from.
+        """
+        latest = {}
+        for entry in self.entries():
+            latest[(entry["period"], entry["language"], entry["date"])] = entry
+        return latest
+
+
+_archive: Optional[PageArchive] = PageArchive(RAW_ARCHIVE_DIR) if RAW_ARCHIVE_DIR else None
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """
+    The process-wide raw page archive, or None when archiving is disabled.
+    """
+    return _archive
+
+
+def set_page_archive(archive: Optional[PageArchive]) -> None:
+    global _archive
+    _archive = archive
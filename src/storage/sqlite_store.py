@@ -0,0 +1,309 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.api.models import TrendingRepo, full_name_from_url
+
+DEFAULT_DB_PATH = os.getenv("TRENDING_DB_PATH", os.path.join("repos", "trending.db"))
+ALL_LANGUAGES = "all_languages"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL UNIQUE,
+    author TEXT NOT NULL,
+    url TEXT NOT NULL,
+    language TEXT,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    period TEXT NOT NULL,
+    language TEXT NOT NULL,
+    date TEXT NOT NULL,
+    UNIQUE (period, language, date)
+);
+CREATE TABLE IF NOT EXISTS snapshot_entries (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    repo_id INTEGER NOT NULL REFERENCES repos(id),
+    stars INTEGER NOT NULL,
+    forks INTEGER NOT NULL,
+    stars_today INTEGER,
+    PRIMARY KEY (snapshot_id, rank)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots(date);
+CREATE INDEX IF NOT EXISTS idx_snapshots_language ON snapshots(language, period, date);
+CREATE INDEX IF NOT EXISTS idx_entries_repo ON snapshot_entries(repo_id, snapshot_id);
+CREATE TABLE IF NOT EXISTS repo_history (
+    repo_id INTEGER NOT NULL REFERENCES repos(id),
+    date TEXT NOT NULL,
+    period TEXT NOT NULL,
+    language TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    stars INTEGER NOT NULL,
+    forks INTEGER NOT NULL,
+    PRIMARY KEY (repo_id, date, period, language)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_history_date ON repo_history(date, period, language);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    chat_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    language TEXT NOT NULL,
+    mode TEXT NOT NULL DEFAULT 'full',
+    PRIMARY KEY (chat_id, period, language)
+);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_topic ON subscriptions(period, language);
+CREATE TABLE IF NOT EXISTS repo_metadata (
+    full_name TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (full_name, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS last_broadcast (
+    period TEXT NOT NULL,
+    language TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    full_name TEXT NOT NULL,
+    stars INTEGER NOT NULL,
+    forks INTEGER,
+    PRIMARY KEY (period, language, rank)
+) WITHOUT ROWID;
+"""
+
+
+def full_name_from(repo: Dict) -> str:
+    if repo.get("full_name"):
+        return repo["full_name"]
+    return full_name_from_url(repo["url"])
+
+
+class SnapshotStore:
+    """
+    Embedded SQLite store for trending snapshots.
+
+    Repositories are stored once in `repos` (unique on full_name); every fetch is
+    a row in `snapshots` keyed by (period, language, date) with its ranked
+    entries in `snapshot_entries`. The database runs in WAL mode so readers are
+    not blocked while a snapshot is being written.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def _upsert_repos(self, repos: List[Dict]) -> Dict[str, int]:
+        rows = [(full_name_from(repo), repo["author"], repo["url"], repo.get("language"), repo.get("description"))
+                for repo in repos]
+        self.conn.executemany(
+            "INSERT INTO repos (full_name, author, url, language, description) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(full_name) DO UPDATE SET author = excluded.author, url = excluded.url, "
+            "language = COALESCE(NULLIF(excluded.language, ''), repos.language), "
+            "description = COALESCE(NULLIF(excluded.description, ''), repos.description)",
+            rows,
+        )
+        names = [row[0] for row in rows]
+        placeholders = ",".join("?" * len(names))
+        return {
+            row["full_name"]: row["id"]
+            for row in self.conn.execute(f"SELECT id, full_name FROM repos WHERE full_name IN ({placeholders})", names)
+        }
+
+    def _replace_snapshot(self, period: str, language: str, date: str, repos: List[Dict]) -> int:
+        self.conn.execute(
+            "DELETE FROM snapshots WHERE period = ? AND language = ? AND date = ?", (period, language, date))
+        self.conn.execute(
+            "DELETE FROM repo_history WHERE period = ? AND language = ? AND date = ?", (period, language, date))
+        snapshot_id = self.conn.execute(
+            "INSERT INTO snapshots (period, language, date) VALUES (?, ?, ?)", (period, language, date)).lastrowid
+        if repos:
+            repo_ids = self._upsert_repos(repos)
+            entries = [
+                (rank, repo_ids[full_name_from(repo)], repo["stars"], repo["forks"], repo.get("stars_today"))
+                for rank, repo in enumerate(repos, start=1)
+            ]
+            self.conn.executemany(
+                "INSERT INTO snapshot_entries (snapshot_id, rank, repo_id, stars, forks, stars_today) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(snapshot_id,) + entry for entry in entries],
+            )
+            # A repo listed twice in one snapshot keeps its best (first) rank.
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO repo_history (repo_id, date, period, language, rank, stars, forks) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(repo_id, date, period, language, rank, stars, forks)
+                 for rank, repo_id, stars, forks, _ in entries],
+            )
+        return snapshot_id
+
+    def save_snapshot(self, period: str, language: Optional[str], date: str, repos: List[Dict]) -> int:
+        """
+        Store one fetch in a single transaction, replacing any earlier snapshot
+        for the same (period, language, date).
+        """
+        with self._lock, self.conn:
+            return self._replace_snapshot(period, language or ALL_LANGUAGES, date, repos)
+
+    def save_snapshots(self, snapshots: Iterable[Tuple[str, Optional[str], str, List[Dict]]]) -> int:
+        """
+        Store many (period, language, date, repos) snapshots in one transaction,
+        e.g. a backfill. Returns how many were written.
+        """
+        count = 0
+        with self._lock, self.conn:
+            for period, language, date, repos in snapshots:
+                self._replace_snapshot(period, language or ALL_LANGUAGES, date, repos)
+                count += 1
+        return count
+
+    def load_snapshot(self, period: str, language: Optional[str], date: str) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT r.author, r.url, e.stars, e.forks, r.language FROM snapshots s "
+                "JOIN snapshot_entries e ON e.snapshot_id = s.id JOIN repos r ON r.id = e.repo_id "
+                "WHERE s.period = ? AND s.language = ? AND s.date = ? ORDER BY e.rank",
+                (period, language or ALL_LANGUAGES, date),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load_records(self, period: str, language: Optional[str], date: str) -> List[TrendingRepo]:
+        """
+        Like `load_snapshot`, but as `TrendingRepo` records. Descriptions are the
+        latest seen for each repository.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT r.full_name, r.description, r.language, e.stars, e.forks, e.stars_today FROM snapshots s "
+                "JOIN snapshot_entries e ON e.snapshot_id = s.id JOIN repos r ON r.id = e.repo_id "
+                "WHERE s.period = ? AND s.language = ? AND s.date = ? ORDER BY e.rank",
+                (period, language or ALL_LANGUAGES, date),
+            ).fetchall()
+        return [TrendingRepo(full_name, description, language, stars, forks, stars_today)
+                for full_name, description, language, stars, forks, stars_today in rows]
+
+    def previous_snapshot_date(self, period: str, language: Optional[str], before: str) -> Optional[str]:
+        """
+        The most recent snapshot date strictly before `before`, if any.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MAX(date) AS date FROM snapshots WHERE period = ? AND language = ? AND date < ?",
+                (period, language or ALL_LANGUAGES, before),
+            ).fetchone()
+        return row["date"]
+
+    def snapshot_dates(self, period: str, language: Optional[str]) -> List[str]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT date FROM snapshots WHERE period = ? AND language = ? ORDER BY date",
+                (period, language or ALL_LANGUAGES),
+            ).fetchall()
+        return [row["date"] for row in rows]
+
+    def save_broadcast(self, period: str, language: Optional[str], repos: List[Dict]) -> None:
+        """
+        Remember the list last sent for (period, language), replacing the one before.
+        """
+        language = language or ALL_LANGUAGES
+        rows = [(period, language, rank, full_name_from(repo), repo["stars"], repo.get("forks"))
+                for rank, repo in enumerate(repos, start=1)]
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM last_broadcast WHERE period = ? AND language = ?", (period, language))
+            self.conn.executemany(
+                "INSERT INTO last_broadcast (period, language, rank, full_name, stars, forks) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def load_broadcast(self, period: str, language: Optional[str]) -> Optional[List[TrendingRepo]]:
+        """
+        The list last sent for (period, language) as records, or None if nothing was sent yet.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT full_name, stars, forks FROM last_broadcast WHERE period = ? AND language = ? ORDER BY rank",
+                (period, language or ALL_LANGUAGES),
+            ).fetchall()
+        if not rows:
+            return None
+        return [TrendingRepo(full_name, None, None, stars, forks, None) for full_name, stars, forks in rows]
+
+    def load_metadata(self, full_names: Iterable[str]) -> Dict[str, Dict[str, Tuple[object, float]]]:
+        """
+        Cached enrichment fields as {full_name: {field: (value, fetched_at)}}.
+        """
+        names = list(dict.fromkeys(full_names))
+        metadata: Dict[str, Dict[str, Tuple[object, float]]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for row in self.conn.execute(
+                        f"SELECT full_name, field, value, fetched_at FROM repo_metadata "
+                        f"WHERE full_name IN ({placeholders})", chunk):
+                    metadata.setdefault(row["full_name"], {})[row["field"]] = (
+                        json.loads(row["value"]), row["fetched_at"])
+        return metadata
+
+    def save_metadata(self, rows: Iterable[Tuple[str, str, object, float]]) -> int:
+        """
+        Store (full_name, field, value, fetched_at) rows in one transaction.
+        """
+        rows = [(full_name, field, json.dumps(value), fetched_at) for full_name, field, value, fetched_at in rows]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO repo_metadata (full_name, field, value, fetched_at) VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def query(self, sql: str, params=()) -> List[Dict]:
+        """
+        Run a read-only query and return the rows as dicts.
+        """
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def execute(self, sql: str, params=()) -> int:
+        """
+        Run one write statement in its own transaction; returns the affected row count.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params).rowcount
+
+    def count(self, table: str) -> int:
+        if table not in ("repos", "snapshots", "snapshot_entries", "repo_history", "subscriptions", "repo_metadata",
+                         "last_broadcast"):
+            raise ValueError(f"Unknown table: {table}")
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+_store: Optional[SnapshotStore] = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """
+    Return the process-wide store, opening it on first use.
+    """
+    global _store
+    if _store is None:
+        _store = SnapshotStore()
+    return _store
+
+
+def set_snapshot_store(store: Optional[SnapshotStore]) -> None:
+    global _store
+    _store = store
@@ -0,0 +1,325 @@
+"""
+Check every snapshot under `repos/` and report each bad record precisely. It can
+also repair or quarantine corrupt snapshots.
+
+    python -m src.storage.validate_archive [--root repos] [--workers N] [--repair]
+                                           [--quarantine DIR] [--report FILE]
+
+Files are decoded incrementally, one record at a time, and checked in parallel
+worker processes. A worker holds one chunk of one file and at most
+`--max-errors` error entries, so memory per worker does not grow with the size
+of the archive. Only `--repair` keeps a file's records, because it has to write
+them back.
+
+A repairable file is rewritten in place, atomically. The tool can:
+- keep the complete records before a truncation;
+- turn "1,234" star/fork strings into ints;
+- derive a missing author/url from the other field;
+- drop records it cannot fix.
+
+Files with nothing to salvage are moved to the quarantine directory, keeping
+their relative path.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.api.models import GITHUB_URL, full_name_from_url
+from src.storage.migrate import iter_json_snapshots
+from src.utils.file_handler import save_to_file
+from src.utils.validator import record_errors
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_ERRORS = 50
+BATCH_SIZE = 64
+
+_WHITESPACE = re.compile(r"\s*")
+_COUNT = re.compile(r"^\s*\d{1,3}(,\d{3})*\s*$|^\s*\d+\s*$")
+
+
+class CorruptSnapshot(ValueError):
+    """
+    The file stopped being valid JSON after `records` complete records.
+    """
+
+    def __init__(self, message: str, records: int, truncated: bool):
+        super().__init__(message)
+        self.records = records
+        self.truncated = truncated
+
+
+def _open(path: str):
+    return gzip.open(path, 'rt', encoding="utf-8") if path.endswith(".gz") else open(path, 'r', encoding="utf-8")
+
+
+def iter_json_array(f, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Yield the elements of the JSON array in file object `f` one at a time,
+    holding at most one chunk plus one element in memory. Raises
+    `CorruptSnapshot` (carrying the count of complete elements) when the text is
+    truncated or stops being valid JSON.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size)
+    eof = not buffer
+    pos = 0
+    count = 0
+    need_comma = False
+    started = False
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if eof:
+                raise CorruptSnapshot(f"truncated after {count} records" if started else "empty file",
+                                      count, truncated=True)
+            chunk = f.read(chunk_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise CorruptSnapshot("not a JSON array", 0, truncated=False)
+            started = True
+            pos += 1
+            continue
+        if char == "]" and (need_comma or count == 0):
+            if _WHITESPACE.match(buffer, pos + 1).end() < len(buffer) or f.read(chunk_size).strip():
+                raise CorruptSnapshot(f"unexpected data after the array ({count} records)", count, truncated=False)
+            return
+        if need_comma:
+            if char != ",":
+                raise CorruptSnapshot(f"expected ',' after record {count - 1}", count, truncated=False)
+            need_comma = False
+            pos += 1
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                truncated = e.pos >= len(buffer) - 1 or e.msg.startswith("Unterminated")
+                raise CorruptSnapshot(f"{'truncated' if truncated else 'invalid JSON'} in record {count}",
+                                      count, truncated=truncated)
+            chunk = f.read(chunk_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+        if end >= len(buffer) and not eof:
+            # A number at the very end of the buffer may continue in the next chunk.
+            chunk = f.read(chunk_size)
+            if chunk:
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            eof = True
+        yield item
+        count += 1
+        need_comma = True
+        pos = end
+
+
+def repair_record(item) -> Tuple[Optional[Dict], List[str]]:
+    """
+    Return a fixed copy of `item` and the fixes applied, or (None, reasons) when
+    the record cannot be salvaged.
+    """
+    if not isinstance(item, dict):
+        return None, [f"dropped non-object record ({type(item).__name__})"]
+    fixed = dict(item)
+    fixes = []
+    for field in ("stars", "forks"):
+        value = fixed.get(field)
+        if isinstance(value, str) and _COUNT.match(value):
+            fixed[field] = int(value.replace(",", ""))
+            fixes.append(f"{field}: parsed {value!r}")
+        elif isinstance(value, float) and value.is_integer() and value >= 0:
+            fixed[field] = int(value)
+            fixes.append(f"{field}: {value!r} -> {int(value)}")
+    url, author = fixed.get("url"), fixed.get("author")
+    full_name = fixed.get("full_name") if isinstance(fixed.get("full_name"), str) else None
+    if not isinstance(url, str) and full_name:
+        fixed["url"] = GITHUB_URL + full_name
+        fixes.append("url: derived from full_name")
+    if not isinstance(author, str) and isinstance(fixed.get("url"), str) and "github.com/" in fixed["url"]:
+        fixed["author"] = full_name_from_url(fixed["url"]).split("/", 1)[0]
+        fixes.append("author: derived from url")
+    if fixed.get("language") is not None and not isinstance(fixed.get("language"), str):
+        fixes.append(f"language: cleared {fixed['language']!r}")
+        fixed["language"] = None
+    remaining = record_errors(fixed)
+    if remaining:
+        return None, [f"dropped record: {field} {message}" for field, message in remaining]
+    return fixed, fixes
+
+
+def _quarantine(path: str, root: str, quarantine_dir: str) -> str:
+    target = os.path.join(quarantine_dir, os.path.relpath(path, root))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(path, target)
+    return target
+
+
+def check_snapshot(path: str, root: str = "repos", repair: bool = False, quarantine_dir: Optional[str] = None,
+                   max_errors: int = DEFAULT_MAX_ERRORS) -> Dict:
+    """
+    Validate one snapshot file record by record. Returns a JSON-serializable
+    result with the first `max_errors` problems, and repairs or quarantines the
+    file when asked to.
+    """
+    result = {"path": path, "status": "ok", "records": 0, "error_count": 0, "errors": [], "file_error": None,
+              "fixes": []}
+    kept = [] if repair else None
+    changed = False
+
+    def report(record, field, message):
+        result["error_count"] += 1
+        if len(result["errors"]) < max_errors:
+            result["errors"].append({"record": record, "field": field, "error": message})
+
+    try:
+        with _open(path) as f:
+            for index, item in enumerate(iter_json_array(f)):
+                result["records"] += 1
+                errors = record_errors(item)
+                for field, message in errors:
+                    report(index, field, message)
+                if repair:
+                    if not errors:
+                        kept.append(item)
+                        continue
+                    fixed, notes = repair_record(item)
+                    changed = True
+                    result["fixes"].extend(f"record {index}: {note}" for note in notes)
+                    del result["fixes"][max_errors:]
+                    if fixed is not None:
+                        kept.append(fixed)
+    except CorruptSnapshot as e:
+        result["file_error"] = str(e)
+        result["truncated"] = e.truncated
+        changed = True
+    except (OSError, UnicodeDecodeError, EOFError) as e:
+        result["file_error"] = f"unreadable: {e}"
+        changed = True
+
+    if not result["error_count"] and not result["file_error"]:
+        return result
+    result["status"] = "invalid"
+
+    if repair and kept:
+        if changed:
+            # Same encoding as the reader expects from the name (see `read_from_file`).
+            save_to_file(kept, path, compact=True, compress=path.endswith(".gz"))
+            result["status"] = "repaired"
+            result["kept"] = len(kept)
+        return result
+    if quarantine_dir and (result["file_error"] or repair):
+        result["quarantined_to"] = _quarantine(path, root, quarantine_dir)
+        result["status"] = "quarantined"
+    return result
+
+
+def _check_batch(paths: List[str], **options) -> List[Dict]:
+    return [check_snapshot(path, **options) for path in paths]
+
+
+def validate_archive(root: str = "repos", workers: Optional[int] = None, repair: bool = False,
+                     quarantine_dir: Optional[str] = None, max_errors: int = DEFAULT_MAX_ERRORS,
+                     batch_size: int = BATCH_SIZE) -> Iterator[Dict]:
+    """
+    Check every snapshot under `root` and yield one result per file as it
+    finishes. With more than one worker, files go to a process pool in batches
+    (snapshots are small, so per-file dispatch would cost more than the check),
+    with a bounded number of batches in flight so neither the pending work nor
+    the results pile up in memory.
+    """
+    options = {"root": root, "repair": repair, "quarantine_dir": quarantine_dir, "max_errors": max_errors}
+    paths = (path for path, _, _, _ in iter_json_snapshots(root))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            yield check_snapshot(path, **options)
+        return
+
+    check = partial(_check_batch, **options)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while True:
+            batch = list(islice(paths, batch_size))
+            if batch:
+                pending.add(pool.submit(check, batch))
+            if pending and (not batch or len(pending) >= workers * 2):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            if not batch and not pending:
+                return
+
+
+class ArchiveSummary:
+    """
+    Running totals over the results of `validate_archive`.
+    """
+
+    def __init__(self):
+        self.counts = {"files": 0, "records": 0, "errors": 0, "ok": 0, "invalid": 0, "repaired": 0, "quarantined": 0}
+
+    def record(self, result: Dict) -> None:
+        self.counts["files"] += 1
+        self.counts["records"] += result["records"]
+        self.counts["errors"] += result["error_count"] + (1 if result["file_error"] else 0)
+        self.counts[result["status"]] += 1
+
+    def report(self) -> str:
+        c = self.counts
+        return (f"Checked {c['files']} snapshots ({c['records']} records): {c['ok']} ok, {c['invalid']} invalid, "
+                f"{c['repaired']} repaired, {c['quarantined']} quarantined; {c['errors']} errors")
+
+
+def format_result(result: Dict) -> List[str]:
+    lines = [f"{result['path']}: {result['status']}"]
+    if result["file_error"]:
+        lines.append(f"  file: {result['file_error']}")
+    for error in result["errors"]:
+        lines.append(f"  record {error['record']}: {error['field'] or 'record'}: {error['error']}")
+    for fix in result["fixes"]:
+        lines.append(f"  fixed {fix}")
+    if result["error_count"] > len(result["errors"]):
+        lines.append(f"  ... {result['error_count'] - len(result['errors'])} more")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate (and optionally repair) the JSON snapshot archive.")
+    parser.add_argument("--root", default="repos")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--repair", action="store_true", help="rewrite repairable snapshots in place")
+    parser.add_argument("--quarantine", metavar="DIR", help="move unsalvageable snapshots here")
+    parser.add_argument("--report", metavar="FILE", help="write every result as a JSON line to FILE")
+    parser.add_argument("--max-errors", type=int, default=DEFAULT_MAX_ERRORS, help="errors kept per file")
+    args = parser.parse_args()
+
+    summary = ArchiveSummary()
+    report = open(args.report, 'w') if args.report else None
+    try:
+        for result in validate_archive(args.root, args.workers, args.repair, args.quarantine, args.max_errors):
+            summary.record(result)
+            if report is not None:
+                report.write(json.dumps(result) + "\n")
+            if result["status"] != "ok":
+                print("\n".join(format_result(result)))
+    finally:
+        if report is not None:
+            report.close()
+    print(summary.report())
+    sys.exit(0 if summary.counts["invalid"] + summary.counts["quarantined"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
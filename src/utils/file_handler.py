@@ -1,17 +1,77 @@
+import asyncio
+import gzip
 import json
 import os
+import threading
 
-def save_to_file(data, filepath):
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+def _fsync_directory(directory):
+    # Persist the rename itself; not every platform lets us open a directory.
     try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _json_default(obj):
+    # Typed records (e.g. TrendingRepo) serialize straight to their export columns.
+    to_record = getattr(obj, "to_record", None)
+    if to_record is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_record()
+
+def save_to_file(data, filepath, compact=False, compress=False):
+    """
+    Atomically write `data` as JSON: the payload goes to a temp file in the same
+    directory, is fsynced, then renamed over `filepath`, so readers never see a
+    truncated file. `compact` drops the indentation and `compress` gzips the
+    output (adding a `.gz` suffix). Returns the path written.
+    """
+    if compress and not filepath.endswith(".gz"):
+        filepath = f"{filepath}.gz"
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if compact:
+            payload = json.dumps(data, separators=(",", ":"), default=_json_default).encode("utf-8")
+        else:
+            payload = json.dumps(data, indent=4, default=_json_default).encode("utf-8")
+        if compress:
+            payload = gzip.compress(payload)
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+        _fsync_directory(directory)
     except Exception as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
         raise IOError(f"Failed to save to {filepath}: {e}")
+    return filepath
 
 def read_from_file(filepath):
     try:
+        if filepath.endswith(".gz"):
+            with gzip.open(filepath, 'rt') as f:
+                return json.load(f)
         with open(filepath, 'r') as f:
             return json.load(f)
     except Exception as e:
         raise IOError(f"Failed to read from {filepath}: {e}")
+
+async def save_to_file_async(data, filepath, compact=True, compress=False):
+    """
+    `save_to_file` on a worker thread, so the event loop never blocks on disk I/O.
+    """
+    return await asyncio.to_thread(save_to_file, data, filepath, compact, compress)
+
+async def read_from_file_async(filepath):
+    return await asyncio.to_thread(read_from_file, filepath)
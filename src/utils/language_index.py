@@ -0,0 +1,153 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MAX_DISTANCE = 2
+DEFAULT_LIMIT = 10
+QUERY_CACHE_SIZE = 1024
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def max_distance_for(text: str) -> int:
+    # One typo in a short name already turns it into a different language ("c" vs "d").
+    if len(text) <= 3:
+        return 0
+    return 1 if len(text) <= 5 else MAX_DISTANCE
+
+
+def _deletes(text: str, distance: int) -> Set[str]:
+    """
+    Every string obtained by deleting up to `distance` characters from `text`.
+    """
+    variants, frontier = {text}, {text}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))} - variants
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal-string-alignment distance (a swap of neighbours counts as one
+    edit), or `limit + 1` as soon as it is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class LanguageIndex:
+    """
+    Immutable lookup structure over the language list, built once per registry refresh.
+
+    Every language is keyed by its normalized name and URL parameter. A sorted
+    array of keys answers prefix queries with a binary search. A
+    deletion-neighbourhood index (every key with up to two characters deleted)
+    gives the candidates for a typo, which are then checked with a bounded
+    edit distance, so fuzzy lookups never scan the whole list. Completions are
+    memoized per query, because inline queries repeat as the user types.
+    """
+
+    def __init__(self, entries: Iterable[dict], cache_size: int = QUERY_CACHE_SIZE):
+        self.entries: List[dict] = []
+        self._by_key: Dict[str, int] = {}
+        for entry in entries:
+            name = entry.get("name") if isinstance(entry, dict) else None
+            if not isinstance(name, str) or not name.strip():
+                continue
+            index = len(self.entries)
+            self.entries.append(entry)
+            for key in {normalize(name), normalize(entry.get("urlParam") or "")} - {""}:
+                self._by_key.setdefault(key, index)
+        self._keys = sorted(self._by_key)
+        self._deletes: Dict[str, List[str]] = {}
+        for key in self._keys:
+            for variant in _deletes(key, MAX_DISTANCE):
+                self._deletes.setdefault(variant, []).append(key)
+        self._cache_size = cache_size
+        self._completions: "OrderedDict[Tuple[str, int], List[dict]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def exact(self, name: str) -> Optional[dict]:
+        index = self._by_key.get(normalize(name))
+        return self.entries[index] if index is not None else None
+
+    def prefix(self, text: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+        """
+        Languages with a name or URL parameter starting with `text`, alphabetically.
+        """
+        text = normalize(text)
+        found, seen = [], set()
+        position = bisect_left(self._keys, text)
+        while position < len(self._keys) and len(found) < limit and self._keys[position].startswith(text):
+            index = self._by_key[self._keys[position]]
+            if index not in seen:
+                seen.add(index)
+                found.append(self.entries[index])
+            position += 1
+        return found
+
+    def fuzzy(self, text: str, limit: int = DEFAULT_LIMIT,
+              max_distance: Optional[int] = None) -> List[Tuple[int, dict]]:
+        """
+        (distance, language) pairs within `max_distance` edits of `text`, closest first.
+        """
+        text = normalize(text)
+        bound = max_distance_for(text) if max_distance is None else min(max_distance, MAX_DISTANCE)
+        candidates = {key for variant in _deletes(text, bound) for key in self._deletes.get(variant, ())}
+        best: Dict[int, int] = {}
+        for key in candidates:
+            index = self._by_key[key]
+            distance = edit_distance(text, key, bound)
+            if distance <= bound and distance < best.get(index, bound + 1):
+                best[index] = distance
+        ranked = sorted(best.items(), key=lambda item: (item[1], normalize(self.entries[item[0]]["name"])))
+        return [(distance, self.entries[index]) for index, distance in ranked[:limit]]
+
+    def resolve(self, text: str) -> Optional[dict]:
+        """
+        The language `text` names: an exact match, or the one closest typo
+        match when it is unambiguous.
+        """
+        entry = self.exact(text)
+        if entry is not None:
+            return entry
+        matches = self.fuzzy(text, limit=2)
+        if matches and (len(matches) == 1 or matches[0][0] < matches[1][0]):
+            return matches[0][1]
+        return None
+
+    def complete(self, text: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+        """
+        Autocomplete suggestions: prefix matches first, then typo matches.
+        """
+        key = (normalize(text), limit)
+        cached = self._completions.get(key)
+        if cached is not None:
+            self._completions.move_to_end(key)
+            return cached
+
+        found = self.prefix(key[0], limit)
+        if len(found) < limit and key[0]:
+            seen = {id(entry) for entry in found}
+            found += [entry for _, entry in self.fuzzy(key[0], limit) if id(entry) not in seen][:limit - len(found)]
+        self._completions[key] = found
+        if len(self._completions) > self._cache_size:
+            self._completions.popitem(last=False)
+        return found
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from src.utils.language_index import LanguageIndex
+from src.utils.logger import log_event
+
+DEFAULT_SNAPSHOT_PATH = os.path.join("repos", "languages.json")
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_RETRY_INTERVAL = 60
+
+
+def _entry_name(entry) -> Optional[str]:
+    if isinstance(entry, str):
+        return entry
+    if isinstance(entry, dict) and isinstance(entry.get("name"), str):
+        return entry["name"]
+    return None
+
+
+class LanguageRegistry:
+    """
+    In-memory, lowercased index of the languages GitHub trending accepts.
+
+    Lookups never wait on the network once the index is warm: a stale index keeps
+    serving while a background refresh runs, a failed refresh keeps the last good
+    data, and every successful refresh is written to an on-disk snapshot so that a
+    restarted process starts warm.
+    """
+
+    def __init__(self, fetcher: Callable[[], list], async_fetcher: Optional[Callable] = None,
+                 snapshot_path: str = DEFAULT_SNAPSHOT_PATH, ttl: float = DEFAULT_TTL,
+                 retry_interval: float = DEFAULT_RETRY_INTERVAL):
+        self.fetcher = fetcher
+        self.async_fetcher = async_fetcher
+        self.snapshot_path = snapshot_path
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._index: Dict[str, dict] = {}
+        self._language_index: Optional[LanguageIndex] = None
+        self._indexed: Optional[Dict[str, dict]] = None
+        self._loaded_at = 0.0
+        self._last_attempt = 0.0
+        self._snapshot_checked = False
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() - self._loaded_at > self.ttl
+
+    def _build(self, languages: Iterable, loaded_at: float) -> bool:
+        index = {}
+        for entry in languages or []:
+            name = _entry_name(entry)
+            if name:
+                index[name.lower()] = entry if isinstance(entry, dict) else {"name": name}
+        if not index:
+            return False
+        # Swap the whole dict so readers never observe a half-built index.
+        self._index = index
+        self._loaded_at = loaded_at
+        return True
+
+    def load_snapshot(self) -> bool:
+        """
+        Load the last good language list from disk, regardless of its age.
+        """
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(payload, dict):
+            return False
+        return self._build(payload.get("languages"), payload.get("fetched_at", 0.0))
+
+    def save_snapshot(self) -> None:
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"fetched_at": self._loaded_at, "languages": list(self._index.values())}, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _apply(self, languages) -> bool:
+        if not self._build(languages, time.time()):
+            return False
+        try:
+            self.save_snapshot()
+        except OSError as e:
+            log_event("language_snapshot_failed", logging.WARNING, path=self.snapshot_path, error=str(e))
+        return True
+
+    def refresh(self) -> bool:
+        """
+        Re-fetch the language list synchronously. Returns False (keeping the
+        current index) when the API is unavailable.
+        """
+        self._last_attempt = time.time()
+        try:
+            languages = self.fetcher()
+        except Exception as e:
+            log_event("language_refresh_failed", logging.WARNING, error=str(e))
+            languages = []
+        return self._apply(languages)
+
+    async def refresh_async(self) -> bool:
+        if self.async_fetcher is None:
+            return await asyncio.to_thread(self.refresh)
+        self._last_attempt = time.time()
+        try:
+            languages = await self.async_fetcher()
+        except Exception as e:
+            log_event("language_refresh_failed", logging.WARNING, error=str(e))
+            languages = []
+        return self._apply(languages)
+
+    def _warm_from_snapshot(self) -> None:
+        if not self._index and not self._snapshot_checked:
+            self._snapshot_checked = True
+            self.load_snapshot()
+
+    def _needs_refresh(self) -> bool:
+        return self.is_stale and time.time() - self._last_attempt > self.retry_interval
+
+    def _claim_refresh(self) -> bool:
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def _release_refresh(self) -> None:
+        with self._lock:
+            self._refreshing = False
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self._release_refresh()
+
+    async def _background_refresh_async(self) -> None:
+        try:
+            await self.refresh_async()
+        finally:
+            self._release_refresh()
+
+    def ensure_fresh(self) -> None:
+        """
+        Make sure there is something to serve. Blocks only on a cold start;
+        a stale index is refreshed on a background thread.
+        """
+        self._warm_from_snapshot()
+        if not self._index:
+            self.refresh()
+        elif self._needs_refresh() and self._claim_refresh():
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    async def ensure_fresh_async(self) -> None:
+        self._warm_from_snapshot()
+        if not self._index:
+            await self.refresh_async()
+        elif self._needs_refresh() and self._claim_refresh():
+            self._task = asyncio.get_running_loop().create_task(self._background_refresh_async())
+
+    def lookup(self, name: str) -> Optional[dict]:
+        if not name:
+            return None
+        self.ensure_fresh()
+        return self._index.get(name.lower())
+
+    async def lookup_async(self, name: str) -> Optional[dict]:
+        if not name:
+            return None
+        await self.ensure_fresh_async()
+        return self._index.get(name.lower())
+
+    def _prefix_index(self) -> LanguageIndex:
+        # Built once per refresh: a refresh swaps `_index`, which invalidates this one.
+        index = self._index
+        if self._indexed is not index:
+            self._language_index = LanguageIndex(index.values())
+            self._indexed = index
+        return self._language_index
+
+    def language_index(self) -> LanguageIndex:
+        """
+        The prefix/typo index over the current language list.
+        """
+        self.ensure_fresh()
+        return self._prefix_index()
+
+    async def language_index_async(self) -> LanguageIndex:
+        await self.ensure_fresh_async()
+        return self._prefix_index()
+
+    def names(self) -> List[str]:
+        self.ensure_fresh()
+        return [entry["name"] for entry in self._index.values()]
+
+    def __contains__(self, name) -> bool:
+        return self.lookup(name) is not None
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -1,9 +1,54 @@
+import json
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+_events = logging.getLogger("src.events")
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message and any
+    structured fields passed as `extra={"fields": {...}}`.
+    """
+
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def configure_logging(json_format=None, level=None):
+    """
+    Switch the root handlers to JSON lines (`TRENDING_LOG_FORMAT=json`) and set
+    the level (`TRENDING_LOG_LEVEL`, e.g. DEBUG to see per-stage spans).
+    """
+    if json_format is None:
+        json_format = os.getenv("TRENDING_LOG_FORMAT", "text") == "json"
+    root = logging.getLogger()
+    if json_format:
+        for handler in root.handlers:
+            handler.setFormatter(JsonFormatter())
+    level = level or os.getenv("TRENDING_LOG_LEVEL")
+    if level:
+        root.setLevel(level)
+
 def log_error(message):
     logging.error(message)
 
 def log_info(message):
     logging.info(message)
+
+def log_event(event, level=logging.INFO, **fields):
+    """
+    Log a structured event; the fields become JSON keys under `JsonFormatter`.
+    """
+    _events.log(level, event, extra={"fields": fields})
@@ -0,0 +1,256 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# Seconds; spans from a cache hit (sub-millisecond) up to a slow multi-retry send.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = "trending_stage_seconds"
+COMMAND_SECONDS = "trending_command_seconds"
+FAILURES_TOTAL = "trending_failures_total"
+
+HELP = {
+    STAGE_SECONDS: "Time spent in each pipeline stage.",
+    COMMAND_SECONDS: "End-to-end latency of bot commands.",
+    FAILURES_TOTAL: "Pipeline stages that raised.",
+    "trending_cache_total": "Trending page cache lookups by result.",
+    "trending_retries_total": "Retried outbound requests.",
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_log = logging.getLogger("src.metrics")
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((name, "" if value is None else str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+
+class _NullSpan:
+    """
+    Shared no-op span handed out while instrumentation is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Time a block into a histogram. On an exception the failure counter of the
+    stage is bumped as well; the exception itself propagates.
+    """
+    __slots__ = ("registry", "name", "labels", "log_level", "start")
+
+    def __init__(self, registry: "Metrics", name: str, labels: Dict, log_level: int):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.log_level = log_level
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.registry.observe(self.name, elapsed, **self.labels)
+        if exc_type is not None:
+            self.registry.inc(FAILURES_TOTAL, **self.labels)
+        if _log.isEnabledFor(self.log_level):
+            _log.log(self.log_level, self.name, extra={"fields": dict(
+                self.labels, seconds=round(elapsed, 6), status="error" if exc_type else "ok")})
+        return False
+
+
+class Metrics:
+    """
+    Process-wide counters and latency histograms, exposed in the Prometheus text
+    format by `render`.
+
+    Disabled registries record nothing: `span` returns a shared no-op context
+    manager and `inc`/`observe` return after one attribute check, so call sites
+    can stay instrumented unconditionally.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        # Stages also run on worker threads (asyncio.to_thread), so guard the dicts.
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram.counts[i] += 1
+                    break
+            histogram.sum += value
+            histogram.count += 1
+
+    def timer(self, name: str, log_level: int = logging.INFO, **labels):
+        """
+        Context manager observing the duration of its block into histogram `name`.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, labels, log_level)
+
+    def span(self, stage: str, **labels):
+        """
+        Time one pipeline stage (resolve, fetch, parse, store, render, save, send).
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, STAGE_SECONDS, dict(labels, stage=stage), logging.DEBUG)
+
+    def timed_iter(self, iterable: Iterable, stage: str, **labels) -> Iterator:
+        """
+        Yield from `iterable`, timing only the work done inside it (not the
+        consumer's) and recording the total as one `stage` span when exhausted.
+        """
+        if not self.enabled:
+            return iter(iterable)
+        return self._timed_iter(iter(iterable), stage, labels)
+
+    def _timed_iter(self, iterator: Iterator, stage: str, labels: Dict) -> Iterator:
+        elapsed = 0.0
+        failed = False
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                except Exception:
+                    elapsed += time.perf_counter() - start
+                    failed = True
+                    raise
+                elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.observe(STAGE_SECONDS, elapsed, stage=stage, **labels)
+            if failed:
+                self.inc(FAILURES_TOTAL, stage=stage, **labels)
+
+    def value(self, name: str, **labels) -> float:
+        """
+        Current value of a counter, or the observation count of a histogram.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name].get(key, 0)
+            histogram = self._histograms.get(name, {}).get(key)
+            return histogram.count if histogram else 0
+
+    def render(self) -> str:
+        """
+        Render every series in the Prometheus text exposition format (0.0.4).
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=os.getenv("TRENDING_METRICS", "0") == "1")
+
+
+async def start_metrics_server(host: str = "0.0.0.0", port: int = 9108, registry: Optional[Metrics] = None):
+    """
+    Serve `registry.render()` at `/metrics` and return the aiohttp runner
+    (call `await runner.cleanup()` to stop it).
+    """
+    from aiohttp import web
+
+    registry = registry or metrics
+
+    async def handle_metrics(request):
+        return web.Response(body=registry.render().encode("utf-8"),
+                            headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
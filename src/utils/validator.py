@@ -1,36 +1,118 @@
+from typing import List, Optional
+import logging
 import requests
-from src.api.github_api import API_LANGUAGES
+from src.api.github_api import API_LANGUAGES, get_languages
+from src.api.models import TrendingRepo
+from src.api.resilience import CircuitOpenError, RetryableHTTPError, call_with_retries_sync, check_response
+from src.utils.language_registry import LanguageRegistry, DEFAULT_SNAPSHOT_PATH
+from src.utils.logger import log_event
+
+def record_errors(item):
+    """
+    Return (field, message) for every problem with one snapshot record.
+    """
+    if isinstance(item, TrendingRepo):
+        # Typed and checked when it was built.
+        return []
+    if not isinstance(item, dict):
+        return [(None, f"expected an object, got {type(item).__name__}")]
+    errors = []
+    for field, expected in (("author", str), ("url", str), ("stars", int), ("forks", int)):
+        if not isinstance(item.get(field), expected):
+            errors.append((field, f"expected {expected.__name__}, got {type(item.get(field)).__name__}"))
+    if item.get("language") is not None and not isinstance(item.get("language"), str):
+        errors.append(("language", f"expected str or null, got {type(item.get('language')).__name__}"))
+    return errors
+
+def iter_validation_errors(records):
+    """
+    Yield (index, field, message) for every problem in `records`, which may be
+    any iterable, so an archive can be checked without loading it whole.
+    """
+    for index, item in enumerate(records):
+        for field, message in record_errors(item):
+            yield index, field, message
 
 def validate_trending_data(data):
-    if not (isinstance(data, list) and all(isinstance(item, dict) for item in data)):
+    if not (isinstance(data, list) and all(isinstance(item, (dict, TrendingRepo)) for item in data)):
         return False
-    for item in data:
-        if not isinstance(item.get("author"), str):
-            return False
-        if not isinstance(item.get("url"), str):
-            return False
-        if not isinstance(item.get("stars"), int):
-            return False
-        if not isinstance(item.get("forks"), int):
-            return False
-        if item.get("language") is not None and not isinstance(item.get("language"), str):
-            return False
-
-    return True
+    return next(iter_validation_errors(data), None) is None
 
 
 def languages_list() -> list:
-    try:
+    def attempt():
         response = requests.get(API_LANGUAGES)
+        check_response(response.status_code, response.headers)
         response.raise_for_status()
         return response.json()
-    except requests.RequestException as e:
-        print(f"Error fetching languages: {e}")
+
+    try:
+        return call_with_retries_sync(API_LANGUAGES, attempt, retryable=(requests.ConnectionError, requests.Timeout))
+    except (requests.RequestException, RetryableHTTPError, CircuitOpenError) as e:
+        log_event("language_fetch_failed", logging.WARNING, error=str(e))
         return []
 
+def build_language_registry(snapshot_path: str = DEFAULT_SNAPSHOT_PATH) -> LanguageRegistry:
+    # Resolve the fetchers at call time so they can be swapped out (e.g. in tests).
+    return LanguageRegistry(
+        fetcher=lambda: languages_list(),
+        async_fetcher=lambda: get_languages(),
+        snapshot_path=snapshot_path,
+    )
+
+language_registry = build_language_registry()
+
 def is_valid_language(language: str) -> bool:
     if not language:
         return False
 
-    languages = languages_list()
-    return any(language.lower() == lan["name"].lower() for lan in languages)
+    return language_registry.lookup(language) is not None
+
+async def is_valid_language_async(language: str) -> bool:
+    if not language:
+        return False
+
+    return await language_registry.lookup_async(language) is not None
+
+def _canonical(language: str, index) -> Optional[str]:
+    entry = index.resolve(language)
+    if entry is None:
+        return None
+    # One spelling per language (the one GitHub uses in the trending URL), so
+    # "C++", "c++" and "cpp" typos share snapshots and cache entries.
+    return entry.get("urlParam") or entry["name"].lower()
+
+def resolve_language(language: str) -> Optional[str]:
+    """
+    Return the canonical URL name of `language`, or of the language it is an
+    unambiguous typo of, or None.
+    """
+    if not language:
+        return None
+
+    return _canonical(language, language_registry.language_index())
+
+async def resolve_language_async(language: str) -> Optional[str]:
+    if not language:
+        return None
+
+    return _canonical(language, await language_registry.language_index_async())
+
+async def require_language_async(language: str) -> str:
+    """
+    Like `resolve_language_async`, but raise ValueError, naming the closest
+    known languages, when `language` cannot be resolved.
+    """
+    resolved = await resolve_language_async(language)
+    if resolved is None:
+        suggestions = await suggest_languages_async(language)
+        hint = f". Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+        raise ValueError(f"Invalid Language: {language}{hint}")
+    return resolved
+
+async def suggest_languages_async(language: str, limit: int = 3) -> List[str]:
+    """
+    Names of the known languages closest to `language`, for "did you mean" replies.
+    """
+    index = await language_registry.language_index_async()
+    return [entry["name"] for entry in index.complete(language, limit)]
@@ -0,0 +1,78 @@
+import json
+import os
+import pytest
+from unittest.mock import AsyncMock
+from src.api import github_api, resilience
+from src.api.response_cache import TrendingCache
+from src.bot import render
+from src.storage import sqlite_store
+from src.storage.sqlite_store import SnapshotStore
+from src.utils import validator
+
+
+@pytest.fixture(autouse=True)
+def isolated_language_registry(tmp_path, monkeypatch):
+    """
+    Give every test a cold language registry whose snapshot lives in a temp dir,
+    so tests never read or write the real repos/languages.json.
+    """
+    registry = validator.build_language_registry(str(tmp_path / "languages.json"))
+    monkeypatch.setattr(validator, "language_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def known_languages(isolated_language_registry, monkeypatch):
+    """
+    Serve the recorded language list (tests/fixtures/languages.json) instead
+    of calling the languages API.
+    """
+    with open(os.path.join(os.path.dirname(__file__), "fixtures", "languages.json"), encoding="utf-8") as f:
+        languages = json.load(f)
+    monkeypatch.setattr(isolated_language_registry, "fetcher", lambda: languages)
+    monkeypatch.setattr(isolated_language_registry, "async_fetcher", AsyncMock(return_value=languages))
+    return languages
+
+
+@pytest.fixture(autouse=True)
+def isolated_trending_cache(monkeypatch):
+    """
+    Start every test with an empty, memory-only trending page cache.
+    """
+    cache = TrendingCache()
+    monkeypatch.setattr(github_api, "trending_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_snapshot_store(tmp_path):
+    """
+    Point the process-wide snapshot store at a throwaway database.
+    """
+    store = SnapshotStore(str(tmp_path / "trending.db"))
+    sqlite_store.set_snapshot_store(store)
+    yield store
+    sqlite_store.set_snapshot_store(None)
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit_breakers(monkeypatch):
+    """
+    Start every test with every host's circuit breaker closed, and keep retry
+    backoff short so tests that hit an unreachable host stay fast.
+    """
+    monkeypatch.setitem(resilience.RESILIENCE_CONFIG, "base_delay", 0.01)
+    resilience.reset_breakers()
+    yield
+    resilience.reset_breakers()
+
+
+@pytest.fixture(autouse=True)
+def isolated_render_cache():
+    """
+    Give every test an empty rendered-message cache.
+    """
+    cache = render.RenderCache()
+    render.set_render_cache(cache)
+    return cache
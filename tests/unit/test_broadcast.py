@@ -0,0 +1,152 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.bot.telegram_bot import GithubTrendingBot
+from src.bot import broadcast
+from src.bot.subscriptions import SubscriptionRegistry
+
+pytestmark = pytest.mark.usefixtures("known_languages")
+
+@pytest.fixture
+def bot():
+    bot = GithubTrendingBot(token='test_token')
+    bot.outbox.send = AsyncMock()
+    return bot
+
+def test_subscription_registry(isolated_snapshot_store):
+    registry = SubscriptionRegistry()
+
+    assert registry.subscribe(1, "daily", "python")
+    assert not registry.subscribe(1, "daily", "python"), "Duplicate subscriptions are ignored"
+    registry.subscribe(2, "daily", "python")
+    registry.subscribe(2, "weekly")
+
+    assert registry.for_chat(2) == [("daily", "python"), ("weekly", "")]
+    assert registry.topics() == {("daily", "python"): ["1", "2"], ("weekly", ""): ["2"]}
+    assert registry.topics("weekly") == {("weekly", ""): ["2"]}
+    assert registry.unsubscribe(2, period="daily") == 1
+    assert registry.topics("daily") == {("daily", "python"): ["1"]}
+
+def test_subscribe_rejects_invalid_period():
+    with pytest.raises(ValueError, match="Invalid Period"):
+        SubscriptionRegistry().subscribe(1, "hourly")
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_broadcast_fetches_each_topic_once(mock_fetch, bot):
+    mock_fetch.return_value = [{"author": "a", "url": "http://a.com", "stars": 1}]
+    for chat_id in range(5):
+        bot.subscriptions.subscribe(chat_id, "daily", "python")
+    bot.subscriptions.subscribe(9, "weekly")
+
+    report = await bot.broadcast()
+
+    assert mock_fetch.await_count == 2
+    assert report == {"topics": 2, "sent": 6, "skipped": 0, "failures": []}
+    messages = {call.args[1] for call in bot.outbox.send.await_args_list}
+    assert messages == {
+        "Daily GitHub Trending for python:\na - http://a.com (Stars: 1)",
+        "Weekly GitHub Trending for all languages:\na - http://a.com (Stars: 1)",
+    }
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_broadcast_reports_failures(mock_fetch, bot):
+    mock_fetch.side_effect = ValueError("Invalid Language: nope")
+    bot.subscriptions.subscribe(1, "daily", "nope")
+
+    report = await bot.broadcast("daily")
+
+    assert report["sent"] == 0
+    assert report["failures"] == [("1", ("daily", "nope"), "Invalid Language: nope")]
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_broadcast_falls_back_to_default_chat(mock_fetch, bot):
+    mock_fetch.return_value = []
+    bot.chat_id = "default"
+
+    report = await bot.broadcast("monthly")
+
+    assert report["sent"] == 1
+    bot.outbox.send.assert_awaited_once_with("default", "No monthly trending repositories found for all languages.")
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_broadcast_changes_only_mode(mock_fetch, bot, isolated_snapshot_store):
+    repos = [{"author": "a", "url": "https://github.com/a/x", "stars": 1, "forks": 0}]
+    mock_fetch.return_value = repos
+    bot.subscriptions.subscribe(1, "daily", "python")
+    bot.subscriptions.subscribe(2, "daily", "python", mode="changes")
+
+    # Nothing to compare with yet: the changes-only chat gets the full list.
+    report = await bot.broadcast("daily")
+    assert report["sent"] == 2
+
+    isolated_snapshot_store.save_snapshot("daily", "python", "20000101", repos)
+    bot.outbox.send.reset_mock()
+    report = await bot.broadcast("daily")
+
+    assert report["sent"] == 1 and report["skipped"] == 1
+    bot.outbox.send.assert_awaited_once_with("1", "Daily GitHub Trending for python:\na - https://github.com/a/x (Stars: 1)")
+
+    mock_fetch.return_value = repos + [{"author": "b", "url": "https://github.com/b/y", "stars": 5, "forks": 0}]
+    bot.outbox.send.reset_mock()
+    report = await bot.broadcast("daily", changes_only=True)
+
+    assert report["sent"] == 2
+    message = bot.outbox.send.await_args_list[0].args[1]
+    assert message == "Daily GitHub Trending changes for python:\nNew #2: b - https://github.com/b/y (Stars: 5)"
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_changes_are_relative_to_the_last_broadcast(mock_fetch, bot, isolated_snapshot_store):
+    first = [{"author": "a", "url": "https://github.com/a/x", "stars": 1, "forks": 0}]
+    second = first + [{"author": "b", "url": "https://github.com/b/y", "stars": 5, "forks": 0}]
+    isolated_snapshot_store.save_snapshot("daily", "python", "20000101", first)
+    for chat_id in range(3):
+        bot.subscriptions.subscribe(chat_id, "daily", "python", mode="changes")
+
+    mock_fetch.return_value = second
+    with patch("src.bot.broadcast.render_changes", wraps=broadcast.render_changes) as render_changes:
+        report = await bot.broadcast("daily")
+
+    assert report["sent"] == 3
+    render_changes.assert_called_once()
+    assert isolated_snapshot_store.load_broadcast("daily", "python")[1].full_name == "b/y"
+
+    # A second run the same day compares with what was just sent, not with yesterday's snapshot.
+    bot.outbox.send.reset_mock()
+    report = await bot.broadcast("daily")
+
+    assert report == {"topics": 1, "sent": 0, "skipped": 3, "failures": []}
+    bot.outbox.send.assert_not_awaited()
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_failed_broadcast_is_not_recorded(mock_fetch, bot, isolated_snapshot_store):
+    mock_fetch.return_value = [{"author": "a", "url": "https://github.com/a/x", "stars": 1, "forks": 0}]
+    bot.subscriptions.subscribe(1, "daily", "python", mode="changes")
+    bot.outbox.send.side_effect = RuntimeError("blocked")
+
+    report = await bot.broadcast("daily")
+
+    assert report["sent"] == 0
+    assert isolated_snapshot_store.load_broadcast("daily", "python") is None
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_changes_for_a_canonical_name_with_capitals(mock_fetch, bot, isolated_snapshot_store):
+    previous = [{"author": "a", "url": "https://github.com/a/x", "stars": 1, "forks": 0}]
+    isolated_snapshot_store.save_snapshot("daily", "c%2B%2B", "20000101", previous)
+    update = AsyncMock()
+    update.effective_chat.id = 1
+    await bot.handle_subscribe(update, AsyncMock(args=["daily", "C++", "changes"]))
+
+    mock_fetch.return_value = previous + [{"author": "b", "url": "https://github.com/b/y", "stars": 5, "forks": 0}]
+    report = await bot.broadcast("daily")
+
+    assert report["sent"] == 1
+    mock_fetch.assert_awaited_once_with("daily", "c%2B%2B", limit=None)
+    bot.outbox.send.assert_awaited_once_with(
+        "1", "Daily GitHub Trending changes for c++:\nNew #2: b - https://github.com/b/y (Stars: 5)")
+    assert [repo.full_name for repo in isolated_snapshot_store.load_broadcast("daily", "c%2B%2B")] == ["a/x", "b/y"]
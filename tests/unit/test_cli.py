@@ -0,0 +1,117 @@
+import json
+import subprocess
+import sys
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.cli import main, build_parser
+
+HEAVY_MODULES = ("telegram", "bs4", "aiohttp", "requests", "nest_asyncio", "lxml", "apscheduler", "sqlalchemy")
+
+def loaded_heavy_modules(module):
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+
+@pytest.mark.parametrize("module, allowed", [
+    ("src.cli", []),
+    ("src.cli.export", []),
+    ("src.cli.fetch", ["aiohttp"]),
+    ("src.cli.send", ["aiohttp"]),
+    ("src.cli.subscribe", []),
+])
+def test_subcommands_only_import_what_they_use(module, allowed):
+    assert loaded_heavy_modules(module) == allowed
+
+def test_parser_defaults():
+    args = build_parser().parse_args(["fetch", "--period", "daily", "weekly", "--limit", "all"])
+
+    assert args.period == ["daily", "weekly"]
+    assert args.language == [""]
+    assert args.limit is None
+
+@patch('src.cli.fetch.close_session', new_callable=AsyncMock)
+@patch('src.cli.fetch.fetch_and_save_repos', new_callable=AsyncMock)
+def test_fetch_single_target(mock_fetch, mock_close):
+    mock_fetch.return_value = [{"author": "a"}]
+
+    assert main(["fetch", "--language", "python", "--limit", "3"]) == 0
+    mock_fetch.assert_awaited_once_with("daily", "python", limit=3)
+    mock_close.assert_awaited_once()
+
+@patch('src.cli.fetch.close_session', new_callable=AsyncMock)
+@patch('src.services.fetch_service.fetch_and_save_repos', new_callable=AsyncMock)
+def test_fetch_matrix_passes_limit(mock_fetch, mock_close):
+    mock_fetch.return_value = [{"author": "a"}]
+
+    assert main(["fetch", "--period", "daily", "weekly", "--language", "python", "go", "--limit", "all"]) == 0
+    assert mock_fetch.await_count == 4
+    assert all(call.kwargs == {"limit": None} for call in mock_fetch.await_args_list)
+
+def test_send_requires_credentials(monkeypatch, capsys):
+    monkeypatch.delenv("TELEGRAM_TOKEN", raising=False)
+    monkeypatch.delenv("TELEGRAM_CHAT_ID", raising=False)
+
+    assert main(["send"]) == 2
+    assert "TELEGRAM_TOKEN" in capsys.readouterr().out
+
+@pytest.mark.usefixtures("known_languages")
+@patch('src.cli.send.TelegramOutbox')
+@patch('src.cli.send.fetch_and_save_repos', new_callable=AsyncMock)
+def test_send_changes_only_uses_the_canonical_name(mock_fetch, mock_outbox, isolated_snapshot_store, monkeypatch,
+                                                   capsys):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "token")
+    outbox = mock_outbox.return_value
+    outbox.send, outbox.close = AsyncMock(), AsyncMock()
+    repos = [{"author": "a", "url": "https://github.com/a/x", "stars": 1, "forks": 0}]
+    isolated_snapshot_store.save_snapshot("daily", "c%2B%2B", "20000101", repos)
+    mock_fetch.return_value = repos
+
+    assert main(["send", "--language", "C++", "--chat-id", "5", "--changes-only"]) == 0
+
+    mock_fetch.assert_awaited_once_with("daily", "c%2B%2B")
+    outbox.send.assert_not_awaited()
+    assert "No changes in daily trending for c++" in capsys.readouterr().out
+
+    mock_fetch.return_value = repos + [{"author": "b", "url": "https://github.com/b/y", "stars": 5, "forks": 0}]
+    assert main(["send", "--language", "c++", "--chat-id", "5", "--changes-only"]) == 0
+    outbox.send.assert_awaited_once_with(
+        "5", "Daily GitHub Trending changes for c++:\nNew #2: b - https://github.com/b/y (Stars: 5)", None)
+    assert len(isolated_snapshot_store.load_broadcast("daily", "c%2B%2B")) == 2
+
+def test_export_snapshot(tmp_path, isolated_snapshot_store):
+    repos = [{"author": "octo", "url": "https://github.com/octo/hello", "stars": 1, "forks": 2, "language": "Go"}]
+    isolated_snapshot_store.save_snapshot("weekly", "go", "20241102", repos)
+    out = tmp_path / "export.json"
+
+    assert main(["export", "--period", "weekly", "--language", "go", "--date", "20241102", "--out", str(out)]) == 0
+    assert json.loads(out.read_text()) == repos
+    assert main(["export", "--date", "19990101", "--out", str(out)]) == 1
+
+@pytest.mark.usefixtures("known_languages")
+def test_export_resolves_the_language(tmp_path, isolated_snapshot_store):
+    repos = [{"author": "octo", "url": "https://github.com/octo/hello", "stars": 1, "forks": 2, "language": "C++"}]
+    isolated_snapshot_store.save_snapshot("daily", "c%2B%2B", "20241102", repos)
+    out = tmp_path / "export.json"
+
+    assert main(["export", "--language", "C++", "--date", "20241102", "--out", str(out)]) == 0
+    assert json.loads(out.read_text()) == repos
+
+@pytest.mark.usefixtures("known_languages")
+def test_subscribe_and_unsubscribe(isolated_snapshot_store, monkeypatch, capsys):
+    from src.bot.subscriptions import SubscriptionRegistry
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "7")
+    registry = SubscriptionRegistry()
+
+    assert main(["subscribe", "--period", "weekly", "--language", "Pyhton", "--mode", "changes"]) == 0
+    assert main(["subscribe", "--chat-id", "8"]) == 0
+    assert registry.subscribers() == {("daily", ""): [("8", "full")], ("weekly", "python"): [("7", "changes")]}
+    assert main(["subscribe", "--language", "Rusy"]) == 1
+
+    assert main(["unsubscribe", "--language", "python"]) == 0
+    assert registry.for_chat(7) == []
+    assert "Removed 1 subscription of 7" in capsys.readouterr().out
+
+def test_subscribe_requires_chat_id(monkeypatch, capsys):
+    monkeypatch.delenv("TELEGRAM_CHAT_ID", raising=False)
+
+    assert main(["unsubscribe"]) == 2
+    assert "chat id" in capsys.readouterr().out
@@ -0,0 +1,56 @@
+from src.api.models import TrendingRepo
+from src.services.diff import diff_snapshots, load_last_broadcast, load_previous_snapshot
+
+def repo(name, stars=100):
+    return TrendingRepo(f"octo/{name}", "", "Python", stars, 1, 0)
+
+def names(entries):
+    return [entry["repo"].full_name for entry in entries]
+
+def test_identical_snapshots_have_empty_diff():
+    snapshot = [repo("a"), repo("b"), repo("c")]
+
+    assert diff_snapshots(snapshot, list(snapshot)).is_empty
+
+def test_entrants_dropouts_moves_and_star_jumps():
+    previous = [repo("a"), repo("b"), repo("c", stars=50)]
+    current = [repo("b"), repo("d"), repo("c", stars=500)]
+
+    diff = diff_snapshots(previous, current)
+
+    assert names(diff.entered) == ["octo/d"] and diff.entered[0]["rank"] == 2
+    assert names(diff.dropped) == ["octo/a"] and diff.dropped[0]["rank"] == 1
+    assert [(e["old_rank"], e["rank"]) for e in diff.moved] == [(2, 1)]
+    assert [(e["repo"].full_name, e["delta"]) for e in diff.star_jumps] == [("octo/c", 450)]
+    assert diff.to_dict()["star_jumps"] == [{"full_name": "octo/c", "stars": 500, "delta": 450}]
+
+def test_previous_compared_only_up_to_current_length():
+    previous = [repo(name) for name in "abcdefghij"]
+
+    assert diff_snapshots(previous, previous[:5]).is_empty
+
+def test_accepts_exported_dicts():
+    previous = [{"author": "octo", "url": "https://github.com/octo/a", "stars": 1, "forks": 0}]
+
+    assert diff_snapshots(previous, [repo("a", stars=1)]).is_empty
+
+def test_load_previous_snapshot(isolated_snapshot_store):
+    assert load_previous_snapshot("daily", "python", before="20240103") is None
+    isolated_snapshot_store.save_snapshot("daily", "python", "20240101", [repo("a")])
+    isolated_snapshot_store.save_snapshot("daily", "python", "20240102", [repo("b")])
+    isolated_snapshot_store.save_snapshot("daily", "python", "20240103", [repo("c")])
+
+    previous = load_previous_snapshot("daily", "python", before="20240103")
+
+    assert [r.full_name for r in previous] == ["octo/b"]
+
+def test_load_last_broadcast_falls_back_to_previous_snapshot(isolated_snapshot_store):
+    isolated_snapshot_store.save_snapshot("daily", "python", "20000101", [repo("a")])
+
+    assert [r.full_name for r in load_last_broadcast("daily", "python")] == ["octo/a"]
+
+    isolated_snapshot_store.save_broadcast("daily", "python", [repo("b", stars=7), repo("c")])
+    sent = load_last_broadcast("daily", "python")
+
+    assert [(r.full_name, r.stars) for r in sent] == [("octo/b", 7), ("octo/c", 100)]
+    assert load_last_broadcast("weekly", "python") is None
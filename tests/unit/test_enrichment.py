@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import re
+import time
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.api.http_client import close_session
+from src.api.models import TrendingRepo
+from src.services.enrichment import MetadataEnricher, build_query
+
+ALIAS = re.compile(r'(r\d+): repository\(owner: "([^"]+)", name: "([^"]+)"\)')
+
+
+def parse_aliases(query):
+    # [alias, owner, name, selection, alias, owner, name, selection, ...] after the leading "query {".
+    parts = ALIAS.split(query)[1:]
+    return [tuple(parts[i:i + 4]) for i in range(0, len(parts), 4)]
+
+
+class FakeGraphQL:
+    """
+    Local stand-in for the GitHub GraphQL API answering batched repository lookups.
+    """
+
+    def __init__(self, missing=(), fail_with=None, delay=0.0, drop=None):
+        self.queries = []
+        self.missing = set(missing)
+        # {full_name: node key} left out of the answer, as in a partial response.
+        self.drop = drop or {}
+        self.fail_with = fail_with
+        self.delay = delay
+
+    async def graphql(self, request):
+        assert request.headers["Authorization"] == "bearer test-token"
+        query = (await request.json())["query"]
+        self.queries.append(query)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_with:
+            return web.json_response({"message": "unavailable"}, status=self.fail_with)
+        data, errors = {}, []
+        for alias, owner, name, selection in parse_aliases(query):
+            if f"{owner}/{name}" in self.missing:
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias]})
+                continue
+            node = {}
+            if "repositoryTopics" in selection:
+                node["repositoryTopics"] = {"nodes": [{"topic": {"name": owner}}]}
+            if "licenseInfo" in selection:
+                node["licenseInfo"] = {"spdxId": "MIT"}
+            if "pushedAt" in selection:
+                node["pushedAt"] = "2024-11-02T00:00:00Z"
+            if "issues" in selection:
+                node["issues"] = {"totalCount": len(name)}
+            node.pop(self.drop.get(f"{owner}/{name}"), None)
+            data[alias] = node
+        return web.json_response({"data": data, **({"errors": errors} if errors else {})})
+
+
+@pytest_asyncio.fixture
+async def fake_graphql():
+    async def start(**options):
+        fake = FakeGraphQL(**options)
+        app = web.Application()
+        app.router.add_post("/graphql", fake.graphql)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        return fake, str(server.make_url("/graphql"))
+
+    servers = []
+    yield start
+    for server in servers:
+        await server.close()
+    await close_session()
+
+
+def repos(*names):
+    return [TrendingRepo(name, "", "Python", 1, 1, 1) for name in names]
+
+
+def test_build_query_asks_only_for_needed_fields():
+    query = build_query({"octo/hello": {"license"}, 'a"b/c': {"pushed_at", "open_issues"}})
+
+    assert 'r0: repository(owner: "octo", name: "hello") { licenseInfo { spdxId } }' in query
+    assert 'r1: repository(owner: "a\\"b", name: "c") { issues(states: OPEN) { totalCount } pushedAt }' in query
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_batched(fake_graphql, isolated_snapshot_store):
+    fake, url = await fake_graphql()
+    enricher = MetadataEnricher(token="test-token", api_url=url, batch_size=2)
+
+    metadata = await enricher.enrich(repos("a/one", "b/two", "c/three") + repos("a/one"))
+
+    assert len(fake.queries) == 2
+    assert metadata["c/three"] == {"topics": ["c"], "license": "MIT", "pushed_at": "2024-11-02T00:00:00Z",
+                                   "open_issues": 5}
+    assert isolated_snapshot_store.count("repo_metadata") == 12
+
+
+@pytest.mark.asyncio
+async def test_cache_is_persistent_and_per_field(fake_graphql, isolated_snapshot_store):
+    fake, url = await fake_graphql()
+    await MetadataEnricher(token="test-token", api_url=url).enrich(repos("a/one"))
+    isolated_snapshot_store.execute("UPDATE repo_metadata SET fetched_at = ? WHERE field = 'open_issues'",
+                                    (time.time() - 7 * 60 * 60,))
+
+    # A new enricher (e.g. after a restart) reads the cache and refreshes only the stale field.
+    enricher = MetadataEnricher(token="test-token", api_url=url)
+    metadata = await enricher.enrich(repos("a/one"))
+    await enricher.enrich(repos("a/one"))
+
+    assert len(fake.queries) == 2
+    assert "issues" in fake.queries[1] and "licenseInfo" not in fake.queries[1]
+    assert metadata["a/one"]["license"] == "MIT"
+
+
+@pytest.mark.asyncio
+async def test_overlapping_topics_look_each_repo_up_once(fake_graphql):
+    fake, url = await fake_graphql(delay=0.05)
+    enricher = MetadataEnricher(token="test-token", api_url=url)
+
+    daily, weekly = await asyncio.gather(enricher.enrich(repos("a/one", "b/two")),
+                                         enricher.enrich(repos("b/two", "c/three")))
+
+    assert daily["b/two"] == weekly["b/two"]
+    assert sorted(name for query in fake.queries for _, name in re.findall(r'owner: "(\w+)", name: "(\w+)"', query)) == [
+        "one", "three", "two"]
+    assert enricher.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_repositories_are_cached_as_empty(fake_graphql):
+    fake, url = await fake_graphql(missing={"gone/away"})
+    enricher = MetadataEnricher(token="test-token", api_url=url)
+
+    first = await enricher.enrich(repos("gone/away", "a/one"))
+    await enricher.enrich(repos("gone/away"))
+
+    assert first["gone/away"]["license"] is None
+    assert first["a/one"]["license"] == "MIT"
+    assert len(fake.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_api_failure_serves_cached_values(fake_graphql):
+    fake, url = await fake_graphql()
+    enricher = MetadataEnricher(token="test-token", api_url=url, ttls={"open_issues": 0})
+    await enricher.enrich(repos("a/one"))
+
+    fake.fail_with = 502
+    metadata = await enricher.enrich(repos("a/one", "b/two"))
+
+    assert metadata["a/one"]["open_issues"] == 3
+    assert metadata["b/two"] == {}
+    assert len(fake.queries) > 2  # retried with backoff before giving up
+
+
+@pytest.mark.asyncio
+async def test_url_only_dicts_are_named_from_their_url(fake_graphql):
+    fake, url = await fake_graphql()
+    enricher = MetadataEnricher(token="test-token", api_url=url)
+
+    metadata = await enricher.enrich([{"url": "https://github.com/a/one", "author": "a"}])
+
+    assert metadata["a/one"]["license"] == "MIT"
+    assert enricher.known([{"url": "https://github.com/a/one/"}, "b/two"]) == {"a/one": metadata["a/one"]}
+
+
+@pytest.mark.asyncio
+async def test_api_failure_is_logged(fake_graphql, caplog):
+    fake, url = await fake_graphql(fail_with=400)
+
+    with caplog.at_level(logging.WARNING, logger="src.events"):
+        await MetadataEnricher(token="test-token", api_url=url).enrich(repos("a/one"))
+
+    assert [record.getMessage() for record in caplog.records] == ["enrich_failed"]
+    assert caplog.records[0].fields["repos"] == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_nodes_leave_missing_fields_uncached(fake_graphql, caplog):
+    fake, url = await fake_graphql(drop={"a/one": "issues"})
+    enricher = MetadataEnricher(token="test-token", api_url=url)
+
+    with caplog.at_level(logging.WARNING, logger="src.events"):
+        metadata = await enricher.enrich(repos("a/one", "b/two"))
+    await enricher.enrich(repos("a/one"))
+
+    assert metadata["a/one"]["license"] == "MIT" and "open_issues" not in metadata["a/one"]
+    assert metadata["b/two"]["open_issues"] == 3
+    assert [record.getMessage() for record in caplog.records if record.name == "src.events"] == ["enrich_partial"]
+    assert "totalCount" in fake.queries[1] and "licenseInfo" not in fake.queries[1], "Only the missing field is asked again"
+
+
+@pytest.mark.asyncio
+async def test_background_enrichment_logs_unexpected_errors(monkeypatch, caplog):
+    from src.services import enrichment, fetch_service
+
+    class BrokenEnricher:
+        async def enrich(self, data):
+            raise KeyError("repositoryTopics")
+
+    monkeypatch.setattr(enrichment, "_enricher", BrokenEnricher())
+    with caplog.at_level(logging.WARNING, logger="src.events"):
+        fetch_service._enrich_in_background(repos("a/one"), "daily", "")
+        await fetch_service.wait_for_enrichment()
+
+    assert [record.getMessage() for record in caplog.records] == ["enrich_failed"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_service_enriches_in_the_background(monkeypatch):
+    from src.services import enrichment, fetch_service
+
+    async def stream(*args, **kwargs):
+        for repo in repos("a/one"):
+            yield repo
+
+    class SlowEnricher:
+        def __init__(self):
+            self.release = asyncio.Event()
+            self.enriched = []
+
+        async def enrich(self, data):
+            await self.release.wait()
+            self.enriched.append([repo.full_name for repo in data])
+
+    enricher = SlowEnricher()
+    monkeypatch.setattr(fetch_service, "stream_github_trending", stream)
+    monkeypatch.setattr(fetch_service, "JSON_EXPORT", False)
+    monkeypatch.setattr(fetch_service, "ENRICH", True)
+    monkeypatch.setattr(enrichment, "_enricher", enricher)
+
+    data = await fetch_service.fetch_and_save_repos("daily", "")
+
+    assert [repo.full_name for repo in data] == ["a/one"], "The fetch does not wait for enrichment"
+    assert enricher.enriched == []
+    enricher.release.set()
+    await fetch_service.wait_for_enrichment()
+    assert enricher.enriched == [["a/one"]]
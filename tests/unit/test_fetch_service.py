@@ -1,6 +1,9 @@
+import asyncio
+import logging
 import pytest
 from unittest.mock import patch
-from src.services.fetch_service import fetch_and_save_repos
+from src.api.http_client import HostRateLimiter
+from src.services.fetch_service import fetch_and_save_repos, bulk_fetch_repos, bulk_fetch_and_summarize, BulkFetchSummary
 
 @pytest.mark.asyncio
 @patch('src.services.fetch_service.save_to_file')
@@ -40,19 +43,113 @@ async def test_fetch_and_save_repos_no_data(tmpdir):
 @pytest.mark.asyncio
 @patch('src.services.fetch_service.save_to_file', side_effect=Exception("Mocked exception"))
 @patch('src.services.fetch_service.os.makedirs')
-async def test_fetch_and_save_repos_save_failure(mock_makedirs, mock_save_to_file, capsys):
+async def test_fetch_and_save_repos_save_failure(mock_makedirs, mock_save_to_file, caplog):
     """
     Test abnormal events in data saving
     """
     period = 'daily'
     language = 'python'
     
-    data = await fetch_and_save_repos(period, language)
+    with caplog.at_level(logging.ERROR, logger="src.events"):
+        data = await fetch_and_save_repos(period, language)
     
     assert isinstance(data, list), "Data should be a list"
 
     mock_save_to_file.assert_called_once()
     
-    captured = capsys.readouterr()
-    assert "Failed to save data to" in captured.out
-    assert "Mocked exception" in captured.out
\ No newline at end of file
+    failure = next(record for record in caplog.records if record.getMessage() == "trending_export_failed")
+    assert failure.fields["error"] == "Mocked exception"
+
+
+@pytest.mark.asyncio
+async def test_bulk_fetch_repos_caps_concurrency_and_streams():
+    """
+    Test the bulk fetch runs the whole matrix with at most `concurrency` fetches in flight.
+    """
+    in_flight = 0
+    peak = 0
+
+    async def fake_fetch(period, language, limit=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [{"author": f"{period}-{language}"}]
+
+    with patch('src.services.fetch_service.fetch_and_save_repos', side_effect=fake_fetch):
+        results = [result async for result in bulk_fetch_repos(
+            ["daily", "weekly", "monthly"], ["python", "go", ""], concurrency=2, rate_per_host=None)]
+
+    assert len(results) == 9
+    assert peak == 2, "No more than two fetches should run at once"
+    assert {(r["period"], r["language"]) for r in results} == {
+        (p, l) for p in ["daily", "weekly", "monthly"] for l in ["python", "go", ""]}
+    assert all(r["status"] == "ok" for r in results)
+
+@pytest.mark.asyncio
+async def test_bulk_fetch_and_summarize_reports_failures():
+    async def fake_fetch(period, language, limit=None):
+        if language == "broken":
+            raise ValueError("Invalid Language: broken")
+        if language == "cobol":
+            return []
+        return [{"author": "a"}]
+
+    with patch('src.services.fetch_service.fetch_and_save_repos', side_effect=fake_fetch):
+        summary = await bulk_fetch_and_summarize(["daily"], ["python", "cobol", "broken"], rate_per_host=None)
+
+    assert isinstance(summary, BulkFetchSummary)
+    assert [r["language"] for r in summary.failures] == ["broken"]
+    assert [r["language"] for r in summary.empty] == ["cobol"]
+    report = summary.report()
+    assert "1 ok, 1 empty, 1 failed" in report
+    assert "Invalid Language: broken" in report
+
+@pytest.mark.asyncio
+async def test_host_rate_limiter_spaces_requests():
+    limiter = HostRateLimiter(rate=50)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    await asyncio.gather(*(limiter.acquire("github.com") for _ in range(4)))
+    await limiter.acquire("api.telegram.org")
+
+    assert loop.time() - start >= 3 / 50 - 0.005, "Four requests at 50/s need three intervals"
+
+
+@pytest.mark.asyncio
+@patch('src.services.fetch_service.save_to_file')
+async def test_fetch_and_save_repos_writes_snapshot_store(mock_save_to_file, isolated_snapshot_store):
+    async def fake_stream(language, period, limit):
+        yield {"author": "octo", "url": "https://github.com/octo/hello", "stars": 1, "forks": 2,
+               "language": "Python", "description": "dropped"}
+
+    with patch('src.services.fetch_service.stream_github_trending', fake_stream):
+        data = await fetch_and_save_repos('daily', '')
+
+    assert [repo.to_record() for repo in data] == [
+        {"author": "octo", "url": "https://github.com/octo/hello", "stars": 1, "forks": 2, "language": "Python"}]
+    date = isolated_snapshot_store.snapshot_dates('daily', '')[0]
+    assert isolated_snapshot_store.load_snapshot('daily', '', date) == [repo.to_record() for repo in data]
+    mock_save_to_file.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch('src.services.fetch_service.save_to_file')
+async def test_display_limit_does_not_truncate_stored_snapshot(mock_save_to_file, isolated_snapshot_store):
+    requested = []
+
+    async def fake_stream(language, period, limit):
+        requested.append(limit)
+        for i in range(limit):
+            yield {"author": "octo", "url": f"https://github.com/octo/repo{i}", "stars": i, "forks": 0}
+
+    with patch('src.services.fetch_service.stream_github_trending', fake_stream):
+        data = await fetch_and_save_repos('daily', '', limit=3)
+
+    assert requested == [10]
+    assert [repo.name for repo in data] == ["repo0", "repo1", "repo2"]
+    date = isolated_snapshot_store.snapshot_dates('daily', '')[0]
+    assert len(isolated_snapshot_store.load_snapshot('daily', '', date)) == 10
+    assert len(mock_save_to_file.call_args.args[0]) == 10
@@ -3,7 +3,7 @@ import json
 import pytest
 from unittest.mock import patch
 from tempfile import TemporaryDirectory
-from src.utils.file_handler import save_to_file, read_from_file
+from src.utils.file_handler import save_to_file, read_from_file, save_to_file_async, read_from_file_async
 
 def test_save_to_file_success():
     """
@@ -84,3 +84,42 @@ def test_read_from_file_io_error(mock_open_func):
         # 嘗試讀取文件並捕獲輸出錯誤
         with pytest.raises(IOError, match="Failed to read file"):
             read_from_file(temp_file)
+
+def test_save_to_file_compact_and_gzip():
+    """
+    Test compact and gzip-compressed output can be read back by read_from_file.
+    """
+    data = [{"author": "test_author", "stars": 100}]
+    with TemporaryDirectory() as temp_dir:
+        compact_file = save_to_file(data, os.path.join(temp_dir, "compact.json"), compact=True)
+        gzip_file = save_to_file(data, os.path.join(temp_dir, "packed.json"), compact=True, compress=True)
+
+        with open(compact_file, 'r') as f:
+            assert f.read() == '[{"author":"test_author","stars":100}]'
+        assert gzip_file.endswith("packed.json.gz")
+        assert read_from_file(gzip_file) == data
+
+def test_save_to_file_failure_keeps_previous_file():
+    """
+    Test a failed write neither truncates the existing file nor leaves temp files behind.
+    """
+    with TemporaryDirectory() as temp_dir:
+        temp_file = os.path.join(temp_dir, "test_file.json")
+        save_to_file([{"author": "old"}], temp_file)
+
+        with pytest.raises(IOError, match="Failed to save to"):
+            save_to_file([{"author": object()}], temp_file)
+
+        assert read_from_file(temp_file) == [{"author": "old"}]
+        assert os.listdir(temp_dir) == ["test_file.json"]
+
+@pytest.mark.asyncio
+async def test_save_and_read_async():
+    data = [{"author": "test_author", "stars": 100}]
+    with TemporaryDirectory() as temp_dir:
+        temp_file = os.path.join(temp_dir, "nested", "test_file.json")
+
+        written = await save_to_file_async(data, temp_file)
+
+        assert written == temp_file
+        assert await read_from_file_async(temp_file) == data
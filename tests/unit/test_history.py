@@ -0,0 +1,48 @@
+import pytest
+from datetime import date
+from src.storage.sqlite_store import SnapshotStore
+from src.services.history import StarHistory
+
+TODAY = date(2024, 11, 30)
+
+def repo(name, stars):
+    return {"author": name.split("/")[0], "url": f"https://github.com/{name}", "stars": stars, "forks": 1, "language": "Python"}
+
+@pytest.fixture
+def history(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    store.save_snapshot("daily", "", "20240801", [repo("old/repo", 1), repo("octo/hello", 10)])
+    store.save_snapshot("daily", "", "20241110", [repo("octo/hello", 100), repo("fast/riser", 50)])
+    store.save_snapshot("daily", "", "20241120", [repo("fast/riser", 900), repo("octo/hello", 150)])
+    store.save_snapshot("daily", "python", "20241120", [repo("octo/hello", 150)])
+    yield StarHistory(store)
+    store.close()
+
+def test_time_series_window(history):
+    series = history.time_series("octo/hello", days=90, today=TODAY)
+
+    assert [(row["date"], row["language"]) for row in series] == [
+        ("20241110", "all_languages"), ("20241120", "all_languages"), ("20241120", "python")]
+    assert history.time_series("octo/hello", days=None, today=TODAY)[0]["stars"] == 10
+
+def test_rank_history(history):
+    assert history.rank_history("octo/hello", today=TODAY) == [
+        {"date": "20241110", "rank": 1}, {"date": "20241120", "rank": 2}]
+
+def test_star_delta(history):
+    assert history.star_delta("fast/riser", days=30, today=TODAY) == 850
+    assert history.star_delta("missing/repo", today=TODAY) == 0
+
+def test_top_gainers(history):
+    gainers = history.top_gainers(days=30, period="daily", today=TODAY)
+
+    assert [(g["full_name"], g["delta"]) for g in gainers] == [("fast/riser", 850), ("octo/hello", 50)]
+    assert gainers[1]["appearances"] == 3
+
+def test_history_index_updates_incrementally_and_on_replace(history):
+    store = history.store
+    store.save_snapshot("daily", "", "20241121", [repo("fast/riser", 1000)])
+    store.save_snapshot("daily", "", "20241120", [repo("octo/hello", 160)])
+
+    assert history.star_delta("fast/riser", days=30, today=TODAY) == 950
+    assert [row["stars"] for row in history.time_series("octo/hello", period="daily", language="", today=TODAY)] == [100, 160]
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.api import http_client
+from src.api.http_client import get_session, close_session, configure_http, HTTP_CONFIG
+from src.api.github_api import scrape_github_trending, scrape_github_trending_async, stream_github_trending
+
+SAMPLE_HTML = """
+<article class="Box-row">
+  <h2><a href="/octo/hello">octo / hello</a></h2>
+  <p>Hello world</p>
+  <span itemprop="programmingLanguage">Python</span>
+  <a href="/octo/hello/stargazers">1,234</a>
+  <a href="/octo/hello/network/members">56</a>
+  <span>78 stars today</span>
+</article>
+"""
+
+@pytest.mark.asyncio
+async def test_get_session_is_shared_and_pooled():
+    session = await get_session()
+    try:
+        assert await get_session() is session, "Session should be reused within a loop"
+        assert session.connector.limit == HTTP_CONFIG["pool_limit"]
+        assert session.connector.limit_per_host == HTTP_CONFIG["pool_limit_per_host"]
+    finally:
+        await close_session()
+
+    assert session.closed, "close_session should close the pooled session"
+    new_session = await get_session()
+    assert new_session is not session, "A closed session should be replaced"
+    await close_session()
+
+def test_configure_http_rejects_unknown_option():
+    with pytest.raises(ValueError, match="Unknown HTTP options"):
+        configure_http(not_an_option=1)
+
+@patch('src.api.http_client.HTTP_CONFIG', dict(HTTP_CONFIG))
+def test_configure_http_updates_timeouts():
+    configure_http(total_timeout=3.0)
+    assert http_client.build_timeout().total == 3.0
+
+def page(html, status=200, etag=None):
+    return {"status": status, "html": html, "etag": etag, "last_modified": None}
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_scrape_github_trending_async(mock_fetch):
+    mock_fetch.return_value = page(SAMPLE_HTML)
+
+    repos = await scrape_github_trending_async("python", "daily")
+
+    mock_fetch.assert_awaited_once_with("python", "daily", None)
+    assert repos == [{
+        "name": "hello",
+        "author": "octo",
+        "full_name": "octo/hello",
+        "description": "Hello world",
+        "language": "Python",
+        "stars": 1234,
+        "forks": 56,
+        "stars_today": 78,
+        "url": "https://github.com/octo/hello",
+    }]
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_scrape_github_trending_async_timeout(mock_fetch, caplog):
+    mock_fetch.side_effect = asyncio.TimeoutError()
+
+    with caplog.at_level(logging.WARNING, logger="src.events"):
+        assert await scrape_github_trending_async() == []
+    assert [record.getMessage() for record in caplog.records] == ["trending_fetch_failed"]
+    assert caplog.records[0].fields["period"] == "daily"
+
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+def test_scrape_github_trending_sync_wrapper(mock_fetch):
+    mock_fetch.return_value = page(SAMPLE_HTML)
+
+    repos = scrape_github_trending("python", "weekly")
+
+    mock_fetch.assert_awaited_once_with("python", "weekly", None)
+    assert [repo["full_name"] for repo in repos] == ["octo/hello"]
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_stream_github_trending_stops_at_limit(mock_fetch):
+    mock_fetch.return_value = page(SAMPLE_HTML * 5)
+
+    first = [repo async for repo in stream_github_trending("python", "daily", limit=2)]
+    cached = await scrape_github_trending_async("python", "daily", limit=1)
+    everything = await scrape_github_trending_async("python", "daily", limit=None)
+
+    assert len(first) == 2
+    assert len(cached) == 1
+    assert len(everything) == 5
+    assert mock_fetch.await_count == 2, "The limit-2 cache entry can serve limit 1 but not all repos"
@@ -0,0 +1,78 @@
+import json
+import os
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.utils.language_index import LanguageIndex, edit_distance
+from src.utils.language_registry import LanguageRegistry
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "fixtures", "languages.json")
+
+
+@pytest.fixture(scope="module")
+def index():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return LanguageIndex(json.load(f))
+
+
+def names(entries):
+    return [entry["name"] for entry in entries]
+
+
+def test_exact_matches_name_or_url_param_in_any_case(index):
+    assert index.exact("c++")["name"] == "C++"
+    assert index.exact("C%2b%2b")["name"] == "C++"
+    assert index.exact("jupyter-notebook")["name"] == "Jupyter Notebook"
+    assert index.exact("cobol") is None
+
+
+def test_prefix_lists_each_language_once(index):
+    assert names(index.prefix("java")) == ["Java", "JavaScript"]
+    assert names(index.prefix("PY", limit=1)) == ["Python"]
+    assert index.prefix("zzz") == []
+
+
+def test_edit_distance_counts_swaps_once_and_stops_early():
+    assert edit_distance("pyhton", "python", 2) == 1
+    assert edit_distance("rust", "go", 1) == 2
+
+
+def test_resolve_corrects_unambiguous_typos(index):
+    assert index.resolve("pyhton")["name"] == "Python"
+    assert index.resolve("javascirpt")["name"] == "JavaScript"
+    assert index.resolve("Typescrpt")["name"] == "TypeScript"
+
+
+def test_resolve_rejects_short_and_ambiguous_typos():
+    index = LanguageIndex([{"name": "C"}, {"name": "D"}, {"name": "Rust"}, {"name": "Dart"}, {"name": "Kart"}])
+
+    assert index.resolve("E") is None, "A one-letter name has no room for typos"
+    assert index.resolve("Bart") is None, "Equally close to Dart and Kart"
+    assert index.resolve("Rsut")["name"] == "Rust"
+
+
+def test_complete_puts_prefix_matches_before_typos(index):
+    assert names(index.complete("rub")) == ["Ruby"]
+    assert names(index.complete("pytohn")) == ["Python"]
+    assert len(index.complete("", limit=5)) == 5
+
+
+def test_complete_is_memoized_and_fast(index):
+    index.complete("typescr")
+    start = time.perf_counter()
+    for _ in range(1000):
+        index.complete("typescr")
+    assert (time.perf_counter() - start) / 1000 < 0.001
+
+
+def test_registry_rebuilds_index_only_after_refresh(tmp_path):
+    fetcher = MagicMock(return_value=[{"name": "Python"}])
+    registry = LanguageRegistry(fetcher, snapshot_path=str(tmp_path / "languages.json"))
+
+    first = registry.language_index()
+    assert registry.language_index() is first
+
+    fetcher.return_value = [{"name": "Python"}, {"name": "Rust"}]
+    registry.refresh()
+    assert registry.language_index() is not first
+    assert registry.language_index().exact("rust")["name"] == "Rust"
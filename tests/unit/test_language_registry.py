@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from src.utils.language_registry import LanguageRegistry
+
+LANGUAGES = [{"name": "Python"}, {"name": "C++"}, {"name": "JavaScript"}]
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "languages.json")
+
+def test_lookup_is_case_insensitive_and_cached(snapshot_path):
+    fetcher = MagicMock(return_value=LANGUAGES)
+    registry = LanguageRegistry(fetcher, snapshot_path=snapshot_path)
+
+    assert registry.lookup("python") == {"name": "Python"}
+    assert "c++" in registry
+    assert "cobol" not in registry
+    assert fetcher.call_count == 1, "Warm lookups should not hit the API again"
+
+def test_refresh_writes_snapshot_and_restart_is_warm(snapshot_path):
+    LanguageRegistry(MagicMock(return_value=LANGUAGES), snapshot_path=snapshot_path).refresh()
+
+    with open(snapshot_path) as f:
+        assert len(json.load(f)["languages"]) == 3
+
+    fetcher = MagicMock(return_value=[])
+    restarted = LanguageRegistry(fetcher, snapshot_path=snapshot_path)
+    assert "javascript" in restarted
+    fetcher.assert_not_called()
+
+def test_falls_back_to_stale_snapshot_when_api_down(snapshot_path):
+    with open(snapshot_path, 'w') as f:
+        json.dump({"fetched_at": 0, "languages": LANGUAGES}, f)
+
+    fetcher = MagicMock(side_effect=Exception("API down"))
+    registry = LanguageRegistry(fetcher, snapshot_path=snapshot_path)
+    registry.refresh()
+
+    assert "python" in registry, "Last good snapshot should keep serving"
+
+def test_failed_refresh_keeps_current_index(snapshot_path):
+    fetcher = MagicMock(return_value=LANGUAGES)
+    registry = LanguageRegistry(fetcher, snapshot_path=snapshot_path)
+    registry.refresh()
+
+    fetcher.return_value = []
+    assert not registry.refresh()
+    assert len(registry) == 3
+
+def test_stale_index_refreshes_in_background(snapshot_path):
+    fetcher = MagicMock(return_value=LANGUAGES)
+    registry = LanguageRegistry(fetcher, snapshot_path=snapshot_path, ttl=0, retry_interval=0)
+    registry.refresh()
+
+    release = threading.Event()
+
+    def slow_fetch():
+        release.wait(2)
+        return [{"name": "Rust"}]
+
+    fetcher.side_effect = slow_fetch
+    assert "python" in registry, "Stale data is served while refreshing"
+
+    release.set()
+    deadline = time.time() + 2
+    while "rust" not in registry._index and time.time() < deadline:
+        time.sleep(0.01)
+    assert "rust" in registry._index
+
+@pytest.mark.asyncio
+async def test_lookup_async_uses_async_fetcher(snapshot_path):
+    fetcher = MagicMock()
+    async_fetcher = AsyncMock(return_value=["Python", "Go"])
+    registry = LanguageRegistry(fetcher, async_fetcher=async_fetcher, snapshot_path=snapshot_path)
+
+    assert await registry.lookup_async("GO") == {"name": "Go"}
+    async_fetcher.assert_awaited_once()
+    fetcher.assert_not_called()
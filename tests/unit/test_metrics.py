@@ -0,0 +1,105 @@
+import json
+import logging
+import pytest
+from unittest.mock import AsyncMock, patch
+from aiohttp import ClientSession
+from src.api.github_api import scrape_github_trending_async
+from src.utils import metrics as metrics_module
+from src.utils.logger import JsonFormatter, log_event
+from src.utils.metrics import Metrics, NULL_SPAN, STAGE_SECONDS, FAILURES_TOTAL, start_metrics_server
+
+TRENDING_HTML = """
+<article class="Box-row"><h2><a href="/octo/hello">octo / hello</a></h2>
+<a href="/octo/hello/stargazers">1,234</a><a href="/octo/hello/network/members">56</a></article>
+"""
+
+@pytest.fixture
+def enabled_metrics(monkeypatch):
+    registry = Metrics(enabled=True)
+    for module in ("src.api.github_api", "src.services.fetch_service", "src.bot.outbound"):
+        monkeypatch.setattr(f"{module}.metrics", registry)
+    return registry
+
+def test_disabled_registry_records_nothing():
+    registry = Metrics()
+
+    assert registry.span("fetch") is NULL_SPAN
+    registry.inc("trending_cache_total", result="hit")
+    registry.observe(STAGE_SECONDS, 0.1, stage="fetch")
+    items = [1, 2, 3]
+    assert list(registry.timed_iter(items, "parse")) == items
+    assert registry.render() == "\n"
+
+def test_span_records_histogram_and_failures():
+    registry = Metrics(enabled=True, buckets=(0.5, 1.0))
+
+    with registry.span("save", period="daily"):
+        pass
+    with pytest.raises(OSError):
+        with registry.span("save", period="daily"):
+            raise OSError("disk full")
+
+    assert registry.value(STAGE_SECONDS, stage="save", period="daily") == 2
+    assert registry.value(FAILURES_TOTAL, stage="save", period="daily") == 1
+
+def test_render_prometheus_format():
+    registry = Metrics(enabled=True, buckets=(0.5, 1.0))
+    registry.inc("trending_cache_total", result="hit")
+    registry.inc("trending_cache_total", result="hit")
+    registry.observe(STAGE_SECONDS, 0.7, stage="fetch")
+    registry.observe(STAGE_SECONDS, 3.0, stage="fetch")
+
+    text = registry.render()
+
+    assert "# TYPE trending_cache_total counter" in text
+    assert 'trending_cache_total{result="hit"} 2' in text
+    assert "# TYPE trending_stage_seconds histogram" in text
+    assert 'trending_stage_seconds_bucket{stage="fetch",le="0.5"} 0' in text
+    assert 'trending_stage_seconds_bucket{stage="fetch",le="1.0"} 1' in text
+    assert 'trending_stage_seconds_bucket{stage="fetch",le="+Inf"} 2' in text
+    assert 'trending_stage_seconds_sum{stage="fetch"} 3.7' in text
+    assert 'trending_stage_seconds_count{stage="fetch"} 2' in text
+
+def test_timed_iter_records_one_span():
+    registry = Metrics(enabled=True)
+
+    assert list(registry.timed_iter(iter(range(5)), "parse")) == list(range(5))
+    assert registry.value(STAGE_SECONDS, stage="parse") == 1
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_trending_stream_instrumented(mock_fetch, enabled_metrics):
+    mock_fetch.return_value = {"status": 200, "html": TRENDING_HTML, "etag": None, "last_modified": None}
+
+    await scrape_github_trending_async("", "daily")
+    await scrape_github_trending_async("", "daily")
+
+    assert enabled_metrics.value("trending_cache_total", result="miss") == 1
+    assert enabled_metrics.value("trending_cache_total", result="hit") == 1
+    assert enabled_metrics.value(STAGE_SECONDS, stage="fetch", period="daily") == 1
+    assert enabled_metrics.value(STAGE_SECONDS, stage="parse", period="daily") == 1
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    registry = Metrics(enabled=True)
+    registry.inc("trending_retries_total", target="telegram", status="429")
+    runner = await start_metrics_server("127.0.0.1", 0, registry)
+    try:
+        port = runner.addresses[0][1]
+        async with ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"] == metrics_module.CONTENT_TYPE
+                assert 'trending_retries_total{status="429",target="telegram"} 1' in await response.text()
+    finally:
+        await runner.cleanup()
+
+def test_json_log_lines(caplog):
+    with caplog.at_level(logging.INFO, logger="src.events"):
+        log_event("snapshot_saved", period="daily", repos=10)
+
+    line = json.loads(JsonFormatter().format(caplog.records[-1]))
+    assert line["message"] == "snapshot_saved"
+    assert line["period"] == "daily"
+    assert line["repos"] == 10
+    assert line["level"] == "INFO"
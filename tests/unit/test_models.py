@@ -0,0 +1,68 @@
+import json
+import pickle
+import pytest
+from src.api.models import TrendingRepo, to_records
+from src.utils.file_handler import save_to_file, read_from_file
+from src.utils.validator import validate_trending_data
+
+def make_repo(**overrides):
+    values = dict(full_name="octo/hello", description="Hello", language="Python", stars=10, forks=2, stars_today=3)
+    values.update(overrides)
+    return TrendingRepo(**values)
+
+def test_derived_fields_and_mapping_access():
+    repo = make_repo()
+
+    assert (repo.author, repo.name, repo.url) == ("octo", "hello", "https://github.com/octo/hello")
+    assert repo["stars"] == 10
+    assert repo.get("missing", "default") == "default"
+    assert dict(repo) == repo.to_dict()
+    assert repo == repo.to_dict()
+    assert repo.to_record() == {"author": "octo", "url": "https://github.com/octo/hello",
+                                "stars": 10, "forks": 2, "language": "Python"}
+
+@pytest.mark.parametrize("overrides, error", [
+    ({"full_name": "no-slash"}, ValueError),
+    ({"full_name": "a/b/c"}, ValueError),
+    ({"stars": "10"}, TypeError),
+    ({"forks": True}, TypeError),
+    ({"stars": -1}, ValueError),
+    ({"language": 3}, TypeError),
+])
+def test_validated_at_construction(overrides, error):
+    with pytest.raises(error):
+        make_repo(**overrides)
+
+def test_missing_values_default():
+    repo = make_repo(description=None, language=None, stars_today=None)
+
+    assert (repo.description, repo.language, repo.stars_today) == ("", "", 0)
+
+def test_immutable_and_hashable():
+    repo = make_repo()
+
+    with pytest.raises(AttributeError):
+        repo.stars = 1
+    with pytest.raises(TypeError):
+        repo["stars"] = 1
+    assert len({repo, make_repo()}) == 1
+    assert pickle.loads(pickle.dumps(repo)) == repo
+
+def test_from_dict_accepts_exported_records():
+    exported = {"author": "octo", "url": "https://github.com/octo/hello", "stars": 10, "forks": 2, "language": "Python"}
+
+    repo = TrendingRepo.from_dict(exported)
+
+    assert repo.full_name == "octo/hello"
+    assert TrendingRepo.from_dict(repo) is repo
+    assert to_records([exported, repo]) == [repo, repo]
+
+def test_serializes_to_export_columns(tmp_path):
+    path = save_to_file([make_repo()], str(tmp_path / "daily.json"), compact=True)
+
+    assert read_from_file(path) == [make_repo().to_record()]
+    with pytest.raises(TypeError):
+        json.dumps(make_repo())
+
+def test_validator_accepts_records():
+    assert validate_trending_data([make_repo(), make_repo(full_name="a/b")])
@@ -0,0 +1,138 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.api.http_client import close_session
+from src.bot.outbound import TelegramOutbox, split_message
+
+class FakeTelegram:
+    """
+    Minimal local stand-in for the Bot API `sendMessage` endpoint.
+    """
+
+    def __init__(self, throttle_first=0, fail_with=None):
+        self.received = []
+        self.throttle_first = throttle_first
+        self.fail_with = fail_with
+
+    async def send_message(self, request):
+        body = await request.json()
+        if self.fail_with:
+            return web.json_response({"ok": False, "description": "Bad Request"}, status=self.fail_with)
+        if self.throttle_first > 0:
+            self.throttle_first -= 1
+            return web.json_response(
+                {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.01}}, status=429)
+        self.received.append(body)
+        return web.json_response({"ok": True, "result": {"message_id": len(self.received)}})
+
+@pytest_asyncio.fixture
+async def fake_telegram():
+    async def start(**options):
+        fake = FakeTelegram(**options)
+        app = web.Application()
+        app.router.add_post("/bottest_token/sendMessage", fake.send_message)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        return fake, str(server.make_url("")).rstrip("/")
+
+    servers = []
+    yield start
+    for server in servers:
+        await server.close()
+    await close_session()
+
+def test_split_message_prefers_line_breaks():
+    text = "\n".join(["a" * 6] * 5)
+
+    chunks = split_message(text, limit=14)
+
+    assert chunks == ["aaaaaa\naaaaaa", "aaaaaa\naaaaaa", "aaaaaa"]
+    assert split_message("short") == ["short"]
+    assert split_message("x" * 25, limit=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+@pytest.mark.asyncio
+async def test_outbox_delivers_and_splits_in_order(fake_telegram):
+    fake, base = await fake_telegram()
+    outbox = TelegramOutbox("test_token", api_base=base, per_chat_rate=None, global_rate=None)
+
+    responses = await outbox.send(42, "\n".join(["line"] * 3000))
+    await outbox.close()
+
+    assert len(responses) == len(fake.received) > 1
+    assert all(len(message["text"]) <= 4096 for message in fake.received)
+    assert "\n".join(message["text"] for message in fake.received) == "\n".join(["line"] * 3000)
+    assert outbox.stats()["sent"] == 1
+
+@pytest.mark.asyncio
+async def test_outbox_sends_parse_mode(fake_telegram):
+    fake, base = await fake_telegram()
+    outbox = TelegramOutbox("test_token", api_base=base, per_chat_rate=None, global_rate=None)
+
+    await outbox.send("chat", "<b>hi</b>", parse_mode="HTML")
+    await outbox.send("chat", "plain")
+    await outbox.close()
+
+    assert fake.received[0]["parse_mode"] == "HTML"
+    assert "parse_mode" not in fake.received[1]
+
+@pytest.mark.asyncio
+async def test_outbox_retries_after_429(fake_telegram):
+    fake, base = await fake_telegram(throttle_first=2)
+    outbox = TelegramOutbox("test_token", api_base=base, per_chat_rate=None, global_rate=None)
+
+    await outbox.send("chat", "hello")
+    await outbox.close()
+
+    assert [message["text"] for message in fake.received] == ["hello"]
+    assert outbox.stats()["retries"] == 2
+
+@pytest.mark.asyncio
+async def test_outbox_does_not_retry_client_errors(fake_telegram):
+    fake, base = await fake_telegram(fail_with=400)
+    outbox = TelegramOutbox("test_token", api_base=base)
+
+    with pytest.raises(RuntimeError, match="Failed to send message to chat: 400 Bad Request"):
+        await outbox.send("chat", "hello")
+    await outbox.close()
+
+    assert outbox.stats()["failed"] == 1
+    assert outbox.stats()["retries"] == 0
+
+@pytest.mark.asyncio
+async def test_outbox_respects_per_chat_rate(fake_telegram):
+    fake, base = await fake_telegram()
+    outbox = TelegramOutbox("test_token", api_base=base, per_chat_rate=20, global_rate=None)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    futures = [outbox.send_nowait("chat", f"m{i}") for i in range(3)]
+    assert outbox.queue_depth == 3
+    await asyncio.gather(*futures)
+    await outbox.close()
+
+    assert loop.time() - start >= 2 / 20 - 0.005
+    assert [message["text"] for message in fake.received] == ["m0", "m1", "m2"]
+    stats = outbox.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["latency_max"] >= stats["latency_avg"] > 0
+
+@pytest.mark.asyncio
+async def test_outbox_burst_to_one_chat_does_not_hold_up_others(fake_telegram):
+    fake, base = await fake_telegram()
+    outbox = TelegramOutbox("test_token", api_base=base, workers=2, per_chat_rate=5, global_rate=100)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    burst = [outbox.send_nowait("busy", f"b{i}") for i in range(6)]
+    await outbox.send("quiet", "hello")
+    quiet_done = loop.time() - start
+    await asyncio.gather(*burst)
+    await outbox.close()
+
+    # The burst needs about a second at 5/s; the other chat is not queued behind it.
+    assert quiet_done < 0.5
+    assert [message["text"] for message in fake.received if message["chat_id"] == "busy"] == [f"b{i}" for i in range(6)]
+    assert outbox.stats()["sent"] == 7
@@ -0,0 +1,125 @@
+import gzip
+import os
+import pytest
+from datetime import datetime
+from unittest.mock import patch, AsyncMock
+from src.api.github_api import parse_trending_html, scrape_github_trending_async
+from src.storage import page_archive
+from src.storage.backfill import backfill, plan_backfill
+from src.storage.page_archive import PageArchive
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "fixtures", "trending")
+DAY1 = datetime(2024, 11, 1, 12).timestamp()
+DAY2 = datetime(2024, 11, 2, 12).timestamp()
+
+
+def read_fixture(period):
+    with open(os.path.join(FIXTURES, f"{period}.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return PageArchive(str(tmp_path / "raw"))
+
+
+@pytest.fixture
+def enabled_archive(archive):
+    page_archive.set_page_archive(archive)
+    yield archive
+    page_archive.set_page_archive(None)
+
+
+def test_identical_pages_are_stored_once(archive):
+    first = archive.put("daily", "python", "<html>a</html>", fetched_at=DAY1)
+    second = archive.put("weekly", "", "<html>a</html>", fetched_at=DAY1)
+
+    assert first == second
+    assert archive.get(first) == "<html>a</html>"
+    with open(archive.blob_path(first), 'rb') as f:
+        assert gzip.decompress(f.read()) == b"<html>a</html>"
+    assert len(os.listdir(os.path.join(archive.root, "objects"))) == 1
+    assert [(e["period"], e["language"], e["date"]) for e in archive.entries()] == [
+        ("daily", "python", "20241101"), ("weekly", "", "20241101")]
+
+
+def test_refetching_unchanged_page_same_day_adds_no_index_line(archive):
+    archive.put("daily", "python", "<html>a</html>", fetched_at=DAY1)
+    archive.put("daily", "python", "<html>a</html>", fetched_at=DAY1 + 60)
+    archive.put("daily", "python", "<html>b</html>", fetched_at=DAY1 + 120)
+
+    assert len(list(archive.entries())) == 2
+
+
+def test_touch_reindexes_last_page_under_new_day(archive):
+    assert archive.touch("daily", "python", fetched_at=DAY1) is None
+    digest = archive.put("daily", "python", "<html>a</html>", fetched_at=DAY1)
+
+    assert archive.touch("daily", "python", fetched_at=DAY2) == digest
+    # A fresh archive object picks the last entries up from the index.
+    reopened = PageArchive(archive.root)
+    assert reopened.touch("daily", "python", fetched_at=DAY2 + 60) == digest
+    assert sorted(reopened.latest_per_day()) == [("daily", "python", "20241101"), ("daily", "python", "20241102")]
+
+
+def test_torn_index_line_is_skipped(archive):
+    archive.put("daily", "", "<html>a</html>", fetched_at=DAY1)
+    with open(archive.index_path, 'a') as f:
+        f.write('{"period": "dai')
+
+    assert len(list(archive.entries())) == 1
+
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_fetch_archives_raw_page(mock_fetch, enabled_archive):
+    html = read_fixture("daily")
+    mock_fetch.return_value = {"status": 200, "html": html, "etag": None, "last_modified": None}
+
+    await scrape_github_trending_async("python", "daily")
+    await scrape_github_trending_async("python", "daily")  # cache hit, same day
+
+    [entry] = list(enabled_archive.entries())
+    assert (entry["period"], entry["language"]) == ("daily", "python")
+    assert enabled_archive.get(entry["digest"]) == html
+
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_archive_failure_does_not_fail_fetch(mock_fetch, enabled_archive):
+    mock_fetch.return_value = {"status": 200, "html": read_fixture("daily"), "etag": None, "last_modified": None}
+
+    with patch.object(enabled_archive, "put", side_effect=OSError("disk full")):
+        repos = await scrape_github_trending_async("", "daily")
+
+    assert repos
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_backfill_parses_each_page_once(archive, isolated_snapshot_store, workers):
+    daily, weekly = read_fixture("daily"), read_fixture("weekly")
+    archive.put("daily", "", daily, fetched_at=DAY1)
+    archive.put("daily", "", daily, fetched_at=DAY2)
+    archive.put("weekly", "", weekly, fetched_at=DAY2)
+    archive.put("weekly", "", "<html>stale</html>", fetched_at=DAY1)
+    archive.put("weekly", "", weekly, fetched_at=DAY1 + 60)
+
+    assert len(plan_backfill(archive)) == 2
+    report = backfill(archive, isolated_snapshot_store, workers=workers, batch_size=1)
+
+    assert report == {"pages": 2, "snapshots": 4, "failed": []}
+    expected = parse_trending_html(daily)
+    assert isolated_snapshot_store.load_records("daily", None, "20241101") == expected
+    assert isolated_snapshot_store.load_records("daily", None, "20241102") == expected
+    assert isolated_snapshot_store.load_records("weekly", None, "20241101") == parse_trending_html(weekly)
+
+
+def test_backfill_reports_missing_pages(archive, isolated_snapshot_store):
+    digest = archive.put("daily", "", read_fixture("daily"), fetched_at=DAY1)
+    os.remove(archive.blob_path(digest))
+
+    report = backfill(archive, isolated_snapshot_store, workers=1, period="daily")
+
+    assert report["pages"] == 0
+    assert report["failed"][0][0] == digest
+    assert isolated_snapshot_store.count("snapshots") == 0
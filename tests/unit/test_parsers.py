@@ -0,0 +1,71 @@
+import os
+import pytest
+from unittest.mock import patch
+from src.api import parsers
+from src.api.parsers import PARSERS, get_parser, parse_full, parse_strained, iter_strained
+from src.api.github_api import parse_trending_html, iter_trending_repos
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "fixtures", "trending")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r') as f:
+        return f.read()
+
+@pytest.mark.parametrize("page", ["daily.html", "weekly.html", "monthly.html"])
+def test_backends_produce_identical_output(page):
+    html = load_fixture(page)
+    reference = parse_full(html)
+
+    assert len(reference) == parsers.MAX_REPOS
+    for backend, parser in PARSERS.items():
+        assert list(parser(html)) == reference, f"{backend} should match the reference parser"
+
+def test_parse_fields_from_fixture():
+    repos = parse_strained(load_fixture("daily.html"))
+
+    first = repos[0]
+    assert first["full_name"] == "kestra-io/kestra"
+    assert first["author"] == "kestra-io"
+    assert first["name"] == "kestra"
+    assert first["language"] == "Java"
+    assert first["url"] == "https://github.com/kestra-io/kestra"
+    assert all(isinstance(repo[key], int) for repo in repos for key in ("stars", "forks", "stars_today"))
+    assert repos[3]["description"] == "", "Missing <p> should give an empty description"
+    assert repos[5]["language"] == "", "Missing language span should give an empty language"
+
+def test_stars_today_handles_thousands_separator():
+    html = """
+    <article class="Box-row">
+      <h2><a href="/a/b">a / b</a></h2>
+      <span>1,234 stars today</span>
+    </article>
+    """
+    assert [repo["stars_today"] for repo in parse_full(html)] == [1234]
+    assert all(next(parser(html))["stars_today"] == 1234 for parser in PARSERS.values())
+
+def test_get_parser_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown parser backend"):
+        get_parser("nope")
+
+@patch.dict(PARSERS, {}, clear=False)
+def test_default_backend_falls_back_without_lxml():
+    PARSERS.pop("lxml", None)
+    assert get_parser() is iter_strained
+
+def test_parse_trending_html_delegates_to_backend():
+    html = load_fixture("weekly.html")
+    assert parse_trending_html(html, backend="full") == parse_trending_html(html)
+
+@pytest.mark.parametrize("limit, expected", [(3, 3), (10, 10), (None, 25), (0, 0)])
+def test_backends_honour_limit(limit, expected):
+    html = load_fixture("daily.html")
+    reference = parse_full(html, limit=None)[:expected]
+
+    for backend, parser in PARSERS.items():
+        assert list(parser(html, limit)) == reference, f"{backend} should stop after {expected} repos"
+
+def test_iter_trending_repos_is_lazy():
+    repos = iter_trending_repos(load_fixture("daily.html"), limit=None, backend="strainer")
+
+    assert next(repos)["full_name"] == "kestra-io/kestra"
+    assert next(repos)["full_name"] == "paperless-ngx/paperless-ngx"
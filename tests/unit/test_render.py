@@ -0,0 +1,120 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.api.models import TrendingRepo
+from src.bot import render
+from src.bot.render import RenderCache, get_render_cache, render_trending
+
+REPOS = [TrendingRepo("a_b/x.y", "", "Python", 5, 1, 2), TrendingRepo("c/d", "", "C", 7, 0, 0)]
+
+
+def test_plain_format_is_unchanged():
+    assert render_trending("daily", "python", REPOS, fmt="plain") == (
+        "Daily GitHub Trending for python:\n"
+        "a_b - https://github.com/a_b/x.y (Stars: 5)\n"
+        "c - https://github.com/c/d (Stars: 7)")
+    assert render_trending("weekly", None, [], fmt="plain") == "No weekly trending repositories found for all languages."
+
+
+def test_markdown_v2_escapes_text_and_links():
+    text = render_trending("daily", "c++", REPOS[:1], fmt="markdown_v2")
+
+    assert text == ("*Daily GitHub Trending for c\\+\\+:*\n"
+                    "a\\_b \\- [https://github\\.com/a\\_b/x\\.y](https://github.com/a_b/x.y) \\(Stars: 5\\)")
+
+
+def test_html_escapes_text_and_links():
+    text = render_trending("daily", "<c>", REPOS[:1], fmt="html")
+
+    assert text == ("<b>Daily GitHub Trending for &lt;c&gt;:</b>\n"
+                    'a_b - <a href="https://github.com/a_b/x.y">https://github.com/a_b/x.y</a> (Stars: 5)')
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        render_trending("daily", None, REPOS, fmt="bbcode")
+
+
+def test_cache_renders_each_snapshot_once():
+    cache = RenderCache()
+    cache.prerender("daily", "python", REPOS, date="20241102")
+
+    with patch.object(render, "render_trending", side_effect=AssertionError("re-rendered")):
+        for limit in (None, 10, 1):
+            cache.render("daily", "python", list(REPOS), limit, date="20241102")
+
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 0, "entries": 1}
+
+
+def test_prerender_uses_only_the_configured_format(monkeypatch):
+    monkeypatch.setattr(render, "DEFAULT_FORMAT", "html")
+    cache = RenderCache()
+    cache.prerender("daily", "python", REPOS, date="20241102")
+
+    assert list(cache._entries) == [("daily", "python", "20241102", "html")]
+
+
+@pytest.mark.parametrize("fmt", list(render.FORMATS))
+def test_cached_text_is_cut_at_the_limit(fmt):
+    cache = RenderCache()
+    cache.render("daily", "python", REPOS, None, fmt)
+
+    for limit in (1, 2, 5, None):
+        assert cache.render("daily", "python", REPOS, limit, fmt) == render_trending("daily", "python", REPOS, limit, fmt)
+    assert cache.stats()["misses"] == 1
+
+
+def test_changed_records_are_rerendered():
+    cache = RenderCache()
+    first = cache.render("daily", None, REPOS, date="20241102")
+    second = cache.render("daily", None, REPOS[::-1], date="20241102")
+
+    assert first != second
+    assert cache.stats()["entries"] == 1
+
+
+def test_metadata_is_shown_and_rerenders_when_it_arrives():
+    metadata = {"c/d": {"license": "MIT", "topics": ["cli", "db", "sql", "extra"],
+                        "pushed_at": "2024-11-01T10:00:00Z", "open_issues": 4}}
+    cache = RenderCache()
+    bare = cache.render("daily", None, REPOS, date="20241102")
+    enriched = cache.render("daily", None, REPOS, date="20241102", metadata=metadata)
+
+    assert bare.endswith("c - https://github.com/c/d (Stars: 7)")
+    assert enriched.endswith("c - https://github.com/c/d (Stars: 7) [MIT; cli, db, sql; pushed 2024-11-01; 4 open issues]")
+    assert "a_b - https://github.com/a_b/x.y (Stars: 5)\n" in enriched
+    assert cache.stats()["misses"] == 2
+    assert render_trending("daily", None, [{"author": "c", "url": "https://github.com/c/d", "stars": 7}],
+                           fmt="markdown_v2", metadata=metadata).endswith("\\[MIT; cli, db, sql; pushed 2024\\-11\\-01; 4 open issues\\]")
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = RenderCache(max_entries=2)
+    for date in ("20241101", "20241102", "20241103"):
+        cache.render("daily", None, REPOS, date=date)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.make_key("daily", None, "20241101", None) not in cache._entries
+
+
+@pytest.mark.asyncio
+@patch('src.services.fetch_service.stream_github_trending')
+async def test_fetch_prerenders_and_command_reuses_it(mock_stream, monkeypatch, known_languages):
+    from src.bot.telegram_bot import GithubTrendingBot
+    from src.services import fetch_service
+
+    async def stream(*args, **kwargs):
+        for repo in REPOS:
+            yield repo
+
+    mock_stream.side_effect = stream
+    monkeypatch.setattr(fetch_service, "JSON_EXPORT", False)
+    bot = GithubTrendingBot(token='test_token')
+    update = AsyncMock()
+
+    await bot.handle_trending(update, None, "daily")
+    await bot.handle_trending(update, None, "daily", "Pyhton", limit=1)
+
+    assert get_render_cache().stats()["hits"] == 2
+    update.message.reply_text.assert_any_call(render_trending("daily", None, REPOS))
+    update.message.reply_text.assert_any_call("Fetching daily GitHub trending repositories for python...")
+    update.message.reply_text.assert_any_call(render_trending("daily", "python", REPOS, limit=1))
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import patch, AsyncMock
+from src.api import github_api, http_client, resilience
+from src.api.http_client import close_session
+from src.api.github_api import scrape_github_trending_async
+from src.api.resilience import (CircuitBreaker, CircuitOpenError, RetryableHTTPError, backoff_delay,
+                                call_with_retries, call_with_retries_sync, get_breaker, parse_retry_after)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "fixtures", "trending", "daily.html")
+
+
+class FakeGitHub:
+    """
+    Local stand-in for github.com/trending that fails or stalls on demand.
+    """
+
+    def __init__(self, html, fail_first=0, status=503, retry_after=None, delay=0.0):
+        self.html = html
+        self.fail_first = fail_first
+        self.status = status
+        self.retry_after = retry_after
+        self.delay = delay
+        self.requests = 0
+
+    async def trending(self, request):
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            headers = {"Retry-After": self.retry_after} if self.retry_after else {}
+            return web.Response(status=self.status, headers=headers)
+        return web.Response(text=self.html, content_type="text/html", headers={"ETag": '"v1"'})
+
+
+@pytest_asyncio.fixture
+async def fake_github(monkeypatch):
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+
+    async def start(**options):
+        fake = FakeGitHub(html, **options)
+        app = web.Application()
+        app.router.add_get("/trending", fake.trending)
+        app.router.add_get("/trending/{language}", fake.trending)
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        monkeypatch.setattr(github_api, "TRENDING_URL", str(server.make_url("/trending")))
+        return fake
+
+    servers = []
+    yield start
+    for server in servers:
+        await server.close()
+    await close_session()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_backoff_is_jittered_and_honours_retry_after(monkeypatch):
+    monkeypatch.setitem(resilience.RESILIENCE_CONFIG, "base_delay", 1.0)
+    monkeypatch.setitem(resilience.RESILIENCE_CONFIG, "max_delay", 4.0)
+
+    delays = [backoff_delay(5) for _ in range(50)]
+
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+    assert backoff_delay(0, retry_after=2.5) >= 2.5
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    breaker = CircuitBreaker("example.com", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.opened_until = 0.0
+    breaker.before_call()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_opens_breaker_without_waiting(monkeypatch):
+    calls = []
+
+    async def throttled():
+        calls.append(1)
+        raise RetryableHTTPError(429, retry_after=3600)
+
+    with pytest.raises(RetryableHTTPError):
+        await call_with_retries("https://api.example.com/x", throttled)
+
+    assert len(calls) == 1
+    assert get_breaker("api.example.com").state == "open"
+    assert get_breaker("api.example.com").retry_in() > 3000
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_lets_the_next_call_probe():
+    breaker = get_breaker("api.example.com")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_until = 0.0
+    started = asyncio.Event()
+
+    async def stalled():
+        started.set()
+        await asyncio.sleep(60)
+
+    probe = asyncio.create_task(call_with_retries("https://api.example.com/x", stalled))
+    await started.wait()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    async def ok():
+        return "ok"
+
+    assert await call_with_retries("https://api.example.com/x", ok) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_interrupted_sync_probe_lets_the_next_call_probe():
+    breaker = get_breaker("api.example.com")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_until = 0.0
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        call_with_retries_sync("https://api.example.com/x", interrupted)
+
+    assert call_with_retries_sync("https://api.example.com/x", lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_non_network_errors_are_not_retried():
+    calls = []
+
+    async def bad_body():
+        calls.append(1)
+        raise ValueError("bad body")
+
+    with pytest.raises(ValueError):
+        await call_with_retries("https://api.example.com/x", bad_body)
+
+    assert len(calls) == 1
+    assert get_breaker("api.example.com").failures == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_retries_server_errors(fake_github):
+    fake = await fake_github(fail_first=2, status=503, retry_after="0")
+
+    repos = await scrape_github_trending_async("", "daily", use_cache=False)
+
+    assert len(repos) == 10
+    assert fake.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_breaker_stops_hammering_and_serves_stale(fake_github, monkeypatch):
+    monkeypatch.setitem(resilience.RESILIENCE_CONFIG, "max_retries", 1)
+    monkeypatch.setitem(resilience.RESILIENCE_CONFIG, "failure_threshold", 2)
+    fake = await fake_github()
+    good = await scrape_github_trending_async("", "daily")
+
+    fake.fail_first = 100
+    github_api.trending_cache.ttls["daily"] = 0
+    stale = await scrape_github_trending_async("", "daily")
+    requests_when_open = fake.requests
+    again = await scrape_github_trending_async("", "daily")
+
+    assert stale == good and again == good
+    assert get_breaker(github_api.TRENDING_URL).state == "open"
+    assert fake.requests == requests_when_open == 3  # the open breaker short-circuits the last call
+    assert github_api.trending_cache.stats()["stale_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_retried_as_failures(fake_github, monkeypatch):
+    monkeypatch.setitem(resilience.RESILIENCE_CONFIG, "max_retries", 1)
+    monkeypatch.setitem(http_client.HTTP_CONFIG, "total_timeout", 0.05)
+    fake = await fake_github(delay=0.5)
+
+    repos = await scrape_github_trending_async("", "daily")
+
+    assert repos == []
+    assert fake.requests == 2
+    assert get_breaker(github_api.TRENDING_URL).failures == 2
+
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock, return_value=[])
+async def test_bot_reports_open_breaker(mock_fetch):
+    from src.bot.telegram_bot import GithubTrendingBot
+    breaker = get_breaker(github_api.TRENDING_URL)
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_until = time.monotonic() + 60
+    bot = GithubTrendingBot("123:abc")
+    update = AsyncMock()
+
+    await bot.handle_trending(update, None, "daily")
+
+    assert "not responding" in update.message.reply_text.await_args.args[0]
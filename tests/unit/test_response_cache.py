@@ -0,0 +1,142 @@
+import os
+import subprocess
+import sys
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.api import github_api
+from src.api.response_cache import TrendingCache
+from src.api.github_api import scrape_github_trending_async
+
+REPOS = [{"author": "octo", "full_name": "octo/hello", "stars": 10}]
+SAMPLE_HTML = """
+<article class="Box-row">
+  <h2><a href="/octo/hello">octo / hello</a></h2>
+  <a href="/octo/hello/stargazers">10</a>
+</article>
+"""
+
+def test_lookup_counts_hits_and_misses():
+    cache = TrendingCache(ttls={"daily": 60})
+    key = cache.make_key("Python", "daily")
+
+    assert cache.lookup(key) == (None, False)
+    cache.put(key, REPOS)
+    entry, fresh = cache.lookup(cache.make_key("python", "daily"))
+
+    assert fresh and entry.repos == REPOS
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_per_period_ttls():
+    cache = TrendingCache(ttls={"daily": 0, "monthly": 3600})
+    cache.put(("", "daily"), REPOS)
+    cache.put(("", "monthly"), REPOS)
+
+    assert not cache.lookup(("", "daily"))[1], "Expired entry should need revalidation"
+    assert cache.lookup(("", "monthly"))[1]
+
+def test_lru_eviction_respects_memory_bound():
+    cache = TrendingCache()
+    cache.max_bytes = 2 * cache.put(("a", "daily"), REPOS).size
+
+    cache.put(("b", "daily"), REPOS)
+    cache.get(("a", "daily"))  # "a" becomes most recently used
+    cache.put(("c", "daily"), REPOS)
+
+    assert cache.get(("b", "daily")) is None
+    assert cache.get(("a", "daily")) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+def test_disk_tier_survives_restart(tmp_path):
+    TrendingCache(disk_dir=str(tmp_path)).put(("c++", "weekly"), REPOS, etag='"abc"')
+
+    restarted = TrendingCache(disk_dir=str(tmp_path))
+    entry, fresh = restarted.lookup(("c++", "weekly"))
+
+    assert fresh and entry.repos == REPOS
+    assert entry.etag == '"abc"'
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_scrape_serves_fresh_entries_from_cache(mock_fetch):
+    mock_fetch.return_value = {"status": 200, "html": SAMPLE_HTML, "etag": '"v1"', "last_modified": None}
+
+    first = await scrape_github_trending_async("python", "daily")
+    with pytest.raises(TypeError):
+        first[0]["stars"] = -1  # callers must not be able to corrupt the cache
+    second = await scrape_github_trending_async("python", "daily")
+
+    assert mock_fetch.await_count == 1
+    assert second[0]["stars"] == 10
+    assert github_api.trending_cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_scrape_revalidates_expired_entries(mock_fetch):
+    cache = github_api.trending_cache
+    cache.ttls["daily"] = 0
+    cache.put(cache.make_key("python", "daily"), REPOS, etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    mock_fetch.return_value = {"status": 304, "html": "", "etag": None, "last_modified": None}
+
+    repos = await scrape_github_trending_async("python", "daily")
+
+    assert repos == REPOS
+    mock_fetch.assert_awaited_once_with("python", "daily", {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    })
+    assert cache.stats()["revalidations"] == 1
+
+def test_partial_entry_only_covers_smaller_limits():
+    cache = TrendingCache()
+    key = ("", "daily")
+    cache.put(key, REPOS * 3, complete=False)
+
+    assert cache.lookup(key, limit=2)[1]
+    assert cache.lookup(key, limit=10) == (None, False)
+    assert cache.lookup(key, limit=None) == (None, False)
+
+def test_cache_dir_is_read_from_the_environment(tmp_path):
+    env = dict(os.environ, TRENDING_CACHE_DIR=str(tmp_path))
+    out = subprocess.run([sys.executable, "-c", "from src.api import github_api; print(github_api.trending_cache.disk_dir)"],
+                         capture_output=True, text=True, env=env, check=True).stdout
+
+    assert out.strip() == str(tmp_path)
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_scrape_hits_disk_tier_after_restart(mock_fetch, tmp_path, monkeypatch):
+    mock_fetch.return_value = {"status": 200, "html": SAMPLE_HTML, "etag": '"v1"', "last_modified": None}
+    monkeypatch.setattr(github_api, "trending_cache", TrendingCache(disk_dir=str(tmp_path)))
+    await scrape_github_trending_async("python", "daily")
+
+    monkeypatch.setattr(github_api, "trending_cache", TrendingCache(disk_dir=str(tmp_path)))
+    repos = await scrape_github_trending_async("python", "daily")
+
+    assert mock_fetch.await_count == 1
+    assert repos[0]["full_name"] == "octo/hello"
+    assert github_api.trending_cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+@patch('src.api.github_api.fetch_trending_page', new_callable=AsyncMock)
+async def test_disk_tier_is_read_and_written_off_the_event_loop(mock_fetch, tmp_path, monkeypatch):
+    import threading
+    mock_fetch.return_value = {"status": 200, "html": SAMPLE_HTML, "etag": '"v1"', "last_modified": None}
+    cache = TrendingCache(disk_dir=str(tmp_path))
+    monkeypatch.setattr(github_api, "trending_cache", cache)
+    loop_thread, disk_threads = threading.current_thread(), []
+    load, save = cache._load_from_disk, cache._save_to_disk
+
+    def tracked(method):
+        def call(*args):
+            disk_threads.append(threading.current_thread())
+            return method(*args)
+        return call
+
+    monkeypatch.setattr(cache, "_load_from_disk", tracked(load))
+    monkeypatch.setattr(cache, "_save_to_disk", tracked(save))
+    await scrape_github_trending_async("python", "daily")
+
+    assert len(disk_threads) == 2, "One read on the miss, one write of the fetched page"
+    assert loop_thread not in disk_threads
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+from src.bot import scheduler as scheduler_module
+from src.bot.scheduler import start_scheduler, run_scheduled_broadcast, DEFAULT_SCHEDULES
+
+@pytest.fixture
+def jobstore_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'scheduler.db'}"
+
+@pytest.fixture
+def bot():
+    bot = AsyncMock()
+    bot.broadcast.return_value = {"topics": 1, "sent": 1, "failures": []}
+    yield bot
+    scheduler_module._bot = None
+
+@pytest.mark.asyncio
+async def test_start_scheduler_registers_jobs_with_jitter(bot, jobstore_url):
+    scheduler = start_scheduler(bot, jobstore_url=jobstore_url, jitter=30)
+    try:
+        jobs = {job.id: job for job in scheduler.get_jobs()}
+        assert set(jobs) == {"trending:daily:*", "trending:weekly:*", "trending:monthly:*"}
+        assert all(job.trigger.jitter == 30 for job in jobs.values())
+        assert jobs["trending:weekly:*"].args == ("weekly", None)
+        assert all(job.misfire_grace_time == scheduler_module.DEFAULT_MISFIRE_GRACE for job in jobs.values())
+    finally:
+        scheduler.shutdown(wait=False)
+
+@pytest.mark.asyncio
+async def test_restart_keeps_stored_run_times_and_drops_removed_jobs(bot, jobstore_url):
+    schedules = DEFAULT_SCHEDULES + [{"period": "daily", "language": "rust", "cron": {"hour": 8}}]
+    scheduler = start_scheduler(bot, schedules, jobstore_url=jobstore_url)
+    next_run = scheduler.get_job("trending:daily:*").next_run_time
+    scheduler.shutdown(wait=False)
+
+    restarted = start_scheduler(bot, DEFAULT_SCHEDULES, jobstore_url=jobstore_url)
+    try:
+        assert restarted.get_job("trending:daily:rust") is None
+        assert restarted.get_job("trending:daily:*").next_run_time == next_run
+    finally:
+        restarted.shutdown(wait=False)
+
+@pytest.mark.asyncio
+async def test_missed_run_is_caught_up_after_restart(bot, jobstore_url):
+    scheduler = start_scheduler(bot, DEFAULT_SCHEDULES[:1], jobstore_url=jobstore_url, jitter=None)
+    scheduler.pause()
+    scheduler.get_job("trending:daily:*").modify(next_run_time=datetime.now(timezone.utc) - timedelta(minutes=5))
+    scheduler.shutdown(wait=False)
+
+    restarted = start_scheduler(bot, DEFAULT_SCHEDULES[:1], jobstore_url=jobstore_url, jitter=None)
+    try:
+        for _ in range(100):
+            if bot.broadcast.await_count:
+                break
+            await asyncio.sleep(0.02)
+        bot.broadcast.assert_awaited_once_with("daily", None)
+    finally:
+        restarted.shutdown(wait=False)
+
+@pytest.mark.asyncio
+async def test_run_scheduled_broadcast_without_bot(caplog):
+    scheduler_module._bot = None
+    with caplog.at_level(logging.INFO, logger="src.events"):
+        assert await run_scheduled_broadcast("daily") is None
+
+    assert [record.getMessage() for record in caplog.records] == ["broadcast_skipped"]
+
+@pytest.mark.asyncio
+async def test_run_scheduled_broadcast_logs_the_report(caplog):
+    report = {"topics": 2, "sent": 3, "skipped": 1, "failures": [("9", ("daily", ""), "blocked")]}
+    scheduler_module._bot = AsyncMock()
+    scheduler_module._bot.broadcast.return_value = report
+    try:
+        with caplog.at_level(logging.INFO, logger="src.events"):
+            assert await run_scheduled_broadcast("daily", "python") == report
+    finally:
+        scheduler_module._bot = None
+
+    assert [record.getMessage() for record in caplog.records] == ["broadcast_finished"]
+    assert caplog.records[0].fields == {"period": "daily", "language": "python", "sent": 3, "skipped": 1, "failed": 1}
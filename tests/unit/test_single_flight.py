@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from src.services.single_flight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work(value):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [value]
+
+    results = await asyncio.gather(*(flight.do("key", work, "a") for _ in range(5)))
+
+    assert calls == 1
+    assert results == [["a"]] * 5
+    assert results[0] is results[4], "Waiters should share the same result object"
+    assert len(flight) == 0, "Finished keys should be released"
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert await asyncio.gather(flight.do("a", work, 1), flight.do("b", work, 2)) == [1, 2]
+
+@pytest.mark.asyncio
+async def test_exception_is_shared_and_key_released():
+    flight = SingleFlight()
+
+    async def broken():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flight.do("k", broken), flight.do("k", broken), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert "k" not in flight
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_run():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", work))
+    second = asyncio.ensure_future(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
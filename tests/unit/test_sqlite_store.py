@@ -0,0 +1,64 @@
+import json
+import os
+import pytest
+from src.storage.sqlite_store import SnapshotStore
+from src.storage.migrate import import_json_tree
+
+REPOS = [
+    {"author": "octo", "url": "https://github.com/octo/hello", "stars": 100, "forks": 5, "language": "Python"},
+    {"author": "torvalds", "url": "https://github.com/torvalds/linux", "stars": 200, "forks": 50, "language": "C"},
+]
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path / "test.db"))
+    yield store
+    store.close()
+
+def test_store_uses_wal(store):
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_save_and_load_snapshot(store):
+    store.save_snapshot("daily", "", "20241102", REPOS)
+
+    assert store.load_snapshot("daily", None, "20241102") == REPOS
+    assert store.snapshot_dates("daily", "all_languages") == ["20241102"]
+
+def test_repos_are_normalized_across_snapshots(store):
+    store.save_snapshot("daily", "python", "20241101", REPOS)
+    store.save_snapshot("daily", "python", "20241102", REPOS[:1])
+    store.save_snapshot("weekly", "python", "20241102", REPOS)
+
+    assert store.count("repos") == 2
+    assert store.count("snapshots") == 3
+    assert store.count("snapshot_entries") == 5
+
+def test_saving_same_day_replaces_snapshot(store):
+    store.save_snapshot("daily", "python", "20241102", REPOS)
+    store.save_snapshot("daily", "python", "20241102", REPOS[::-1])
+
+    assert store.count("snapshots") == 1
+    assert [repo["author"] for repo in store.load_snapshot("daily", "python", "20241102")] == ["torvalds", "octo"]
+
+def test_failed_save_rolls_back(store):
+    with pytest.raises(KeyError):
+        store.save_snapshot("daily", "python", "20241102", REPOS + [{"author": "broken"}])
+
+    assert store.count("snapshots") == 0
+    assert store.count("repos") == 0
+
+def test_import_json_tree(tmp_path, store):
+    root = tmp_path / "repos"
+    for period, language, date in [("daily", "all_languages", "20241102"), ("weekly", "python", "20241103")]:
+        os.makedirs(root / period / language)
+        with open(root / period / language / f"{date}.json", 'w') as f:
+            json.dump(REPOS, f, indent=4)
+    (root / "daily" / "all_languages" / "20241104.json").write_text("[{\"author\": ")
+
+    report = import_json_tree(store, str(root))
+    import_json_tree(store, str(root))  # idempotent
+
+    assert report["imported"] == 2
+    assert len(report["failed"]) == 1
+    assert store.count("snapshots") == 2
+    assert store.load_snapshot("weekly", "python", "20241103") == REPOS
@@ -1,7 +1,10 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from src.bot.telegram_bot import GithubTrendingBot
-from telegram.ext import CommandHandler
+from telegram.ext import CommandHandler, InlineQueryHandler
+
+pytestmark = pytest.mark.usefixtures("known_languages")
 
 @pytest.fixture
 def bot():
@@ -97,15 +100,170 @@ async def test_run(mock_app_builder, bot):
     await bot.run()
 
     # 檢查是否添加了四個處理器
-    assert app_instance.add_handler.call_count == 4, "應添加四個處理器"
+    assert app_instance.add_handler.call_count == 7, "應添加七個處理器"
 
     # 檢查每個處理器的命令
-    commands = ['daily', 'weekly', 'monthly', 'language']
+    commands = ['daily', 'weekly', 'monthly', 'language', 'subscribe', 'unsubscribe']
     added_handlers = [call[0][0] for call in app_instance.add_handler.call_args_list]
 
     for command, handler in zip(commands, added_handlers):
         assert isinstance(handler, CommandHandler), f"{command} 應為 CommandHandler"
         assert command in handler.commands, f"應添加 '{command}' 命令"
+    assert isinstance(added_handlers[-1], InlineQueryHandler)
 
     # 確認調用了 run_polling
-    app_instance.run_polling.assert_called_once()
\ No newline at end of file
+    app_instance.run_polling.assert_called_once()
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_handle_trending_coalesces_concurrent_requests(mock_fetch, bot):
+    """
+    Concurrent identical commands should trigger one fetch (and one save).
+    """
+    async def slow_fetch(period, language, limit=None):
+        await asyncio.sleep(0.01)
+        return [{"author": "test_author", "url": "http://test.com", "stars": 100}]
+
+    mock_fetch.side_effect = slow_fetch
+    updates = [AsyncMock() for _ in range(5)]
+
+    await asyncio.gather(*(bot.handle_trending(update, AsyncMock(), 'daily', 'Python') for update in updates[:3]),
+                         *(bot.handle_trending(update, AsyncMock(), 'daily', 'python') for update in updates[3:]))
+
+    mock_fetch.assert_awaited_once()
+    for update in updates:
+        assert update.message.reply_text.await_count == 2
+
+def test_limit_from_args():
+    assert GithubTrendingBot.limit_from_args(['3']) == 3
+    assert GithubTrendingBot.limit_from_args(['python', '5']) == 5
+    assert GithubTrendingBot.limit_from_args([]) == 10
+    assert GithubTrendingBot.limit_from_args(None) == 10
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_handle_trending_with_limit(mock_fetch, bot):
+    update = AsyncMock()
+    mock_fetch.return_value = [{"author": f"a{i}", "url": f"http://t{i}.com", "stars": i} for i in range(3)]
+
+    await bot.handle_trending(update, AsyncMock(), 'weekly', limit=2)
+
+    mock_fetch.assert_awaited_once_with('weekly', '', limit=None)
+    message = update.message.reply_text.await_args_list[-1].args[0]
+    assert message.count('\n') == 2, "Header plus two repositories"
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_limit_above_default_returns_the_whole_page(mock_fetch, bot):
+    update = AsyncMock()
+    mock_fetch.return_value = [{"author": f"a{i}", "url": f"http://t{i}.com", "stars": i} for i in range(25)]
+
+    await bot.handle_trending(update, AsyncMock(), 'daily', limit=25)
+
+    message = update.message.reply_text.await_args_list[-1].args[0]
+    assert message.count('\n') == 25, "Header plus all 25 repositories"
+    assert len(await bot.fetch_repos('daily')) == 10, "Scheduled sends keep the default length"
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_send_trending_to_telegram_uses_outbox(mock_fetch, bot):
+    mock_fetch.return_value = [{"author": "test_author", "url": "http://test.com", "stars": 100}]
+    bot.chat_id = "123"
+    bot.outbox.send = AsyncMock()
+
+    await bot.send_trending_to_telegram('daily')
+
+    bot.outbox.send.assert_awaited_once_with(
+        "123", "Daily GitHub Trending for all languages:\ntest_author - http://test.com (Stars: 100)")
+
+def test_prebuilt_application_is_used():
+    app = MagicMock()
+    bot = GithubTrendingBot(token='test_token', application=app)
+
+    bot.register_handlers()
+
+    assert bot.app is app
+    assert app.add_handler.call_count == 7
+
+def test_subscription_from_args():
+    assert GithubTrendingBot.subscription_from_args(['daily', 'Python', 'changes']) == ('daily', 'Python', 'changes')
+    assert GithubTrendingBot.subscription_from_args(['changes', 'weekly']) == ('weekly', None, 'changes')
+    assert GithubTrendingBot.subscription_from_args([]) == (None, None, None)
+    with pytest.raises(ValueError):
+        GithubTrendingBot.subscription_from_args(['daily', 'python', 'go'])
+
+@pytest.mark.asyncio
+async def test_subscribe_and_unsubscribe_commands(bot):
+    update = AsyncMock()
+    update.effective_chat.id = 42
+
+    await bot.handle_subscribe(update, AsyncMock(args=['daily', 'C++', 'changes']))
+    await bot.handle_subscribe(update, AsyncMock(args=['weekly']))
+    await bot.handle_subscribe(update, AsyncMock(args=['weekly', 'full']))
+
+    replies = [call.args[0] for call in update.message.reply_text.await_args_list]
+    assert replies == ["Subscribed to daily GitHub trending for c++ (changes).",
+                       "Subscribed to weekly GitHub trending for all languages (full).",
+                       "Updated subscription to weekly GitHub trending for all languages (full)."]
+    assert bot.subscriptions.subscribers() == {("daily", "c%2B%2B"): [("42", "changes")], ("weekly", ""): [("42", "full")]}
+
+    await bot.handle_unsubscribe(update, AsyncMock(args=['daily', 'c++']))
+    assert update.message.reply_text.await_args.args[0] == "Removed 1 subscription."
+    await bot.handle_unsubscribe(update, AsyncMock(args=[]))
+    assert update.message.reply_text.await_args.args[0] == "Removed 1 subscription."
+    assert bot.subscriptions.for_chat(42) == []
+
+@pytest.mark.asyncio
+async def test_subscribe_rejects_bad_arguments(bot):
+    update = AsyncMock()
+    update.effective_chat.id = 42
+
+    await bot.handle_subscribe(update, AsyncMock(args=['python']))
+    await bot.handle_subscribe(update, AsyncMock(args=['daily', 'Rusy']))
+
+    replies = [call.args[0] for call in update.message.reply_text.await_args_list]
+    assert replies[0].startswith("Usage: /subscribe")
+    assert replies[1] == "Invalid Language: Rusy. Did you mean: Ruby, Rust?"
+    assert bot.subscriptions.for_chat(42) == []
+
+@pytest.mark.asyncio
+async def test_inline_query_suggests_languages(bot, monkeypatch):
+    from src.utils.language_index import LanguageIndex
+    from src.utils.validator import language_registry
+    index = LanguageIndex([{"urlParam": "java", "name": "Java"}, {"urlParam": "javascript", "name": "JavaScript"},
+                           {"urlParam": "python", "name": "Python"}])
+    monkeypatch.setattr(language_registry, "language_index_async", AsyncMock(return_value=index))
+    update = MagicMock()
+    update.inline_query.query = "jav"
+    update.inline_query.answer = AsyncMock()
+
+    await bot.handle_inline_query(update, None)
+
+    results = update.inline_query.answer.await_args.args[0]
+    assert [result.title for result in results] == ["Java", "JavaScript"]
+    assert results[1].input_message_content.message_text == "/language javascript"
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_handle_trending_reports_unknown_language(mock_fetch, bot):
+    update = AsyncMock()
+
+    await bot.handle_trending(update, AsyncMock(), 'daily', 'Rusy')
+
+    mock_fetch.assert_not_awaited()
+    update.message.reply_text.assert_awaited_once_with("Invalid Language: Rusy. Did you mean: Ruby, Rust?")
+
+@pytest.mark.asyncio
+@patch('src.bot.telegram_bot.fetch_and_save_repos', new_callable=AsyncMock)
+async def test_fetch_repos_coalesces_across_limits_and_spellings(mock_fetch, bot):
+    async def slow_fetch(period, language, limit=None):
+        await asyncio.sleep(0.01)
+        return [{"author": f"a{i}", "url": f"http://t{i}.com", "stars": i} for i in range(10)]
+
+    mock_fetch.side_effect = slow_fetch
+
+    full, three, cased = await asyncio.gather(bot.fetch_repos('daily', 'python'), bot.fetch_repos('daily', 'python', 3),
+                                              bot.fetch_repos('daily', 'PYTHON', 5))
+
+    mock_fetch.assert_awaited_once_with('daily', 'python', limit=None)
+    assert (len(full), len(three), len(cased)) == (10, 3, 5)
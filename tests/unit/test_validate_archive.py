@@ -0,0 +1,110 @@
+import gzip
+import io
+import json
+import os
+import pytest
+from src.storage.validate_archive import (
+    CorruptSnapshot, ArchiveSummary, check_snapshot, iter_json_array, repair_record, validate_archive,
+)
+from src.utils.validator import iter_validation_errors
+
+GOOD = {"author": "octo", "url": "https://github.com/octo/hello", "stars": 10, "forks": 2, "language": "Python"}
+
+def write(root, relpath, text):
+    path = os.path.join(root, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'wt') as f:
+        f.write(text)
+    return path
+
+@pytest.fixture
+def archive(tmp_path):
+    root = str(tmp_path / "repos")
+    write(root, "daily/python/20240101.json", json.dumps([GOOD, GOOD]))
+    write(root, "daily/python/20240102.json.gz", json.dumps([GOOD]))
+    write(root, "daily/python/20240103.json", json.dumps([GOOD, GOOD])[:-20])
+    write(root, "weekly/all_languages/20240101.json", json.dumps([dict(GOOD, stars="1,234"), dict(GOOD, forks=None)]))
+    write(root, "monthly/go/20240101.json", "<html>rate limited</html>")
+    return root
+
+def results_by_name(results):
+    return {os.path.relpath(result["path"]).split("repos" + os.sep, 1)[-1]: result for result in results}
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_array_across_chunks(chunk_size):
+    data = [GOOD, {"n": 12345}, [1, 2], "x", 3]
+
+    assert list(iter_json_array(io.StringIO(json.dumps(data, indent=2)), chunk_size)) == data
+
+@pytest.mark.parametrize("text, records, truncated", [
+    (json.dumps([GOOD, GOOD])[:-15], 1, True),
+    ("[", 0, True),
+    ("", 0, True),
+    ('[{"a": 1} {"b": 2}]', 1, False),
+    ('{"a": 1}', 0, False),
+])
+def test_iter_json_array_reports_corruption(text, records, truncated):
+    decoded = []
+    with pytest.raises(CorruptSnapshot) as error:
+        for item in iter_json_array(io.StringIO(text), chunk_size=8):
+            decoded.append(item)
+
+    assert error.value.records == len(decoded) == records
+    assert error.value.truncated is truncated
+
+def test_iter_validation_errors_points_at_record_and_field():
+    errors = list(iter_validation_errors([GOOD, dict(GOOD, stars="10"), "oops"]))
+
+    assert errors == [(1, "stars", "expected int, got str"), (2, None, "expected an object, got str")]
+
+def test_repair_record():
+    fixed, fixes = repair_record({"url": "https://github.com/octo/hello", "stars": "1,234", "forks": 2.0})
+
+    assert fixed["stars"] == 1234 and fixed["forks"] == 2 and fixed["author"] == "octo"
+    assert len(fixes) == 3
+    assert repair_record(dict(GOOD, stars=None))[0] is None
+
+def test_validate_archive_reports(archive):
+    results = results_by_name(validate_archive(archive, workers=1))
+
+    assert results["daily/python/20240101.json"]["status"] == "ok"
+    assert results["daily/python/20240102.json.gz"]["status"] == "ok"
+    truncated = results["daily/python/20240103.json"]
+    assert truncated["status"] == "invalid" and truncated["truncated"] and truncated["records"] == 1
+    weekly = results["weekly/all_languages/20240101.json"]
+    assert [(e["record"], e["field"]) for e in weekly["errors"]] == [(0, "stars"), (1, "forks")]
+    assert results["monthly/go/20240101.json"]["file_error"] == "not a JSON array"
+
+def test_validate_archive_repairs_and_quarantines(archive, tmp_path):
+    quarantine = str(tmp_path / "quarantine")
+    summary = ArchiveSummary()
+    for result in validate_archive(archive, workers=2, repair=True, quarantine_dir=quarantine):
+        summary.record(result)
+
+    assert summary.counts == {"files": 5, "records": 6, "errors": 4, "ok": 2, "invalid": 0,
+                              "repaired": 2, "quarantined": 1}
+    with open(os.path.join(archive, "daily/python/20240103.json")) as f:
+        assert json.load(f) == [GOOD]
+    with open(os.path.join(archive, "weekly/all_languages/20240101.json")) as f:
+        assert json.load(f) == [dict(GOOD, stars=1234)]
+    assert os.path.exists(os.path.join(quarantine, "monthly/go/20240101.json"))
+    assert not os.path.exists(os.path.join(archive, "monthly/go/20240101.json"))
+    assert all(result["status"] == "ok" for result in validate_archive(archive, workers=1))
+
+def test_repair_keeps_gzipped_snapshots_gzipped(tmp_path):
+    from src.utils.file_handler import read_from_file
+    path = write(str(tmp_path), "daily/go/20240101.json.gz", json.dumps([GOOD, dict(GOOD, stars="1,234")]))
+
+    result = check_snapshot(path, root=str(tmp_path), repair=True)
+
+    assert result["status"] == "repaired"
+    assert read_from_file(path) == [GOOD, dict(GOOD, stars=1234)]
+    assert check_snapshot(path, root=str(tmp_path))["status"] == "ok"
+
+def test_check_snapshot_caps_errors(tmp_path):
+    path = write(str(tmp_path), "daily/x/20240101.json", json.dumps([dict(GOOD, stars="bad")] * 20))
+
+    result = check_snapshot(path, root=str(tmp_path), max_errors=5)
+
+    assert result["error_count"] == 20 and len(result["errors"]) == 5
@@ -1,6 +1,6 @@
 import requests
 from unittest.mock import patch, MagicMock
-from src.utils.validator import validate_trending_data, languages_list, is_valid_language
+from src.utils.validator import validate_trending_data, languages_list, is_valid_language, resolve_language
 
 def test_validate_trending_data():
     valid_data = [{"author": "author1", "url": "https://example.com", "stars": 100, "forks": 50, "language": "Python"}]
@@ -48,3 +48,15 @@ def test_is_valid_language(mock_languages_list):
     assert is_valid_language('javascript'), "Case-insensitive match should be valid"
     assert not is_valid_language('invalid_language'), "Should be invalid language"
     assert not is_valid_language(''), "Empty string should be invalid"
+
+@patch('src.utils.validator.languages_list')
+def test_resolve_language(mock_languages_list):
+    mock_languages_list.return_value = [{"urlParam": "python", "name": "Python"},
+                                        {"urlParam": "c%2B%2B", "name": "C++"}]
+
+    assert resolve_language('python') == 'python'
+    assert resolve_language('PyThOn') == 'python', "Every spelling maps to one canonical name"
+    assert resolve_language('C++') == 'c%2B%2B'
+    assert resolve_language('pyhton') == 'python', "A typo resolves to the language's URL name"
+    assert resolve_language('cobol') is None
+    assert resolve_language('') is None